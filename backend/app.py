@@ -20,6 +20,10 @@ bcrypt = Bcrypt(app)
 app.bcrypt = bcrypt
 app.secret_key = os.getenv("SECRET_KEY", "default_secret_key")
 
+# Return pooled DB connections that a handler did not close explicitly
+from config.database import release_request_connections
+app.teardown_appcontext(release_request_connections)
+
 from src.routes.user.auth_routes import auth_routes, ensure_default_admin
 from src.routes.filter_routes import filter_routes
 from src.routes.promotion_routes import promotion_routes
@@ -39,81 +43,39 @@ from src.routes.favorites_routes import favorites_routes
 from src.routes.schedule_status_routes import schedule_status_routes
 from src.routes.partner_revenue_routes import partner_revenue_routes
 from src.routes.tour_review_routes import tour_review_routes
-from src.models.models import ensure_base_tables
+from src.routes.blob_routes import blob_routes
+
+# Apply pending schema migrations (no-op when the ledger is up to date)
+from migration_runner import run_startup_migrations
+run_startup_migrations()
 
 try:
-    # Create foundational tables (cities, users) before other schemas that depend on them
-    ensure_base_tables()
-
-    # Create partner service tables (accommodations, restaurants, transportation)
-    from src.models.partner_services_schema import create_partner_service_tables
-    create_partner_service_tables()
-    
-    # Create tour management tables
-    from src.models.tour_schema import create_tour_tables
-    create_tour_tables()
-
-    # Create all remaining database tables (posts, comments, likes, stories, tags, cities, partner_registrations, bookings, promotions)
-    from src.models.models import create_tables
-    create_tables()
-    print("[OK] Database tables checked/created successfully.")
-    
     # Ensure default admin exists
     ensure_default_admin()
-    
-    # Initialize cities
-    from src.services.city_init import init_cities
-    init_cities()
-
-    # Create tour reviews table
-    from src.models.tour_reviews_schema import create_tour_reviews_table
-    create_tour_reviews_table()
-
-    from migrate_service_reviews import migrate_service_reviews_table
-    migrate_service_reviews_table()
-    
-    # Add soft delete columns to reviews
-    try:
-        from src.routes.add_soft_delete_to_reviews import add_soft_delete_columns
-        add_soft_delete_columns()
-    except Exception as e:
-        print(f"[WARNING] Could not add soft delete columns: {e}")
-    
-    # Create tour highlights table
-    try:
-        from create_tour_highlights import create_tour_highlights_table
-        print("\n[INFO] Checking tour_highlights table...")
-        create_tour_highlights_table()
-    except Exception as e:
-        print(f"[WARNING] Could not create tour_highlights table: {e}")
-    
-    # Create social_hashtag table and update posts table
-    try:
-        from migrate_social_hashtag import create_social_hashtag_table, update_posts_table
-        print("\n[INFO] Checking social_hashtag table...")
-        create_social_hashtag_table()
-        update_posts_table()
-    except Exception as e:
-        print(f"[WARNING] Could not create social_hashtag table: {e}")
-    
-    # Add new columns to posts table
-    try:
-        from migrate_posts_table import add_posts_table_columns
-        print("\n[INFO] Checking posts table columns...")
-        add_posts_table_columns()
-    except Exception as e:
-        print(f"[WARNING] Could not add posts table columns: {e}")
-    
-    # Add soft delete columns to posts and comments
-    try:
-        from migrate_social_soft_delete import add_social_soft_delete_columns
-        print("\n[INFO] Checking soft delete columns for posts and comments...")
-        add_social_soft_delete_columns()
-    except Exception as e:
-        print(f"[WARNING] Could not add soft delete columns: {e}")
+except Exception as e:
+    print(f"[WARNING] Could not ensure default admin: {e}")
+
+# Deliver queued emails in the background
+from src.services.email_outbox import start_email_worker
+start_email_worker()
+
+# Refresh tour listing summaries whose next departure has passed
+from src.services.listing_summary import start_listing_summary_worker
+start_listing_summary_worker()
 
+# Load cities, regions, provinces and tour types into the reference data cache
+try:
+    from src.services.reference_data import reload_reference_data
+    reload_reference_data()
+except Exception as e:
+    print(f"[WARNING] Could not load reference data: {e}")
+
+# Load the hashtag autocomplete index
+try:
+    from src.services.hashtag_index import hashtag_index
+    hashtag_index.reload()
 except Exception as e:
-    print(f"[WARNING] Could not initialize database tables: {e}")
+    print(f"[WARNING] Could not load hashtag index: {e}")
 
 # Đăng ký routes chính
 app.register_blueprint(auth_routes, url_prefix="/api/auth")
@@ -129,6 +91,7 @@ app.register_blueprint(favorites_routes, url_prefix="/api/favorites")
 app.register_blueprint(schedule_status_routes, url_prefix="/api")
 app.register_blueprint(partner_revenue_routes, url_prefix="/api")
 app.register_blueprint(tour_review_routes, url_prefix="/api")
+app.register_blueprint(blob_routes, url_prefix="/api/blobs")
 app.register_blueprint(partner_registration_bp)
 # Partner service management routes
 app.register_blueprint(accommodation_bp)
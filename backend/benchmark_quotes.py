@@ -0,0 +1,147 @@
+"""
+Quote throughput: the old per-quote price calculation against the batched
+src/services/pricing.py path.
+
+The old path (as update_tour / calculate_tour_price did before pricing.py)
+reads one tour's rooms, set meals and transport and parses its duration text
+on every quote. It then issues one SELECT per room, per set meal and per
+transport service. The new path loads the tours' components and a
+PriceCatalog with quote_tours(), which costs at most seven queries for the
+whole batch. Then it does pure arithmetic.
+
+Both paths price the same saved tours from the configured database. The
+script reports quotes per second, queries per quote and how many totals
+differ. Differences are expected only where a tour's legacy duration text
+disagrees with duration_nights. Read-only: everything is rolled back.
+
+Usage:
+    python benchmark_quotes.py [--tours 200] [--rounds 5]
+"""
+
+import argparse
+import re
+import time
+
+from config.database import get_connection
+from src.services.pricing import load_tour_components, people_per_room, quote_tours, round_to_thousands
+
+
+class CountingCursor:
+    """Cursor wrapper counting execute() calls."""
+
+    def __init__(self, cur):
+        self._cur = cur
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+        return self._cur.execute(sql, params)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+
+def legacy_nights(duration):
+    """Nights from the duration column, parsed on every quote as before."""
+    try:
+        days = int(duration)
+        return days - 1 if days > 1 else 1
+    except (TypeError, ValueError):
+        match = re.search(r'(\d+)\s*(?:night|đêm)', str(duration or '').lower())
+        return int(match.group(1)) if match else 1
+
+
+def legacy_quote(cur, duration, components):
+    """One tour priced the old way: a query per room, set meal and transport."""
+    nights = legacy_nights(duration)
+
+    accommodation = 0
+    members = 0
+    for room_id, quantity in components.rooms:
+        cur.execute("SELECT base_price, bed_type FROM accommodation_rooms WHERE id = %s", (room_id,))
+        result = cur.fetchone()
+        if result:
+            members += (quantity or 0) * people_per_room(result[1])
+            if result[0]:
+                accommodation += float(result[0]) * (quantity or 0) * nights
+    members = members or 1
+
+    restaurants = 0
+    for set_meal_id, _, _ in components.set_meals:
+        cur.execute("SELECT total_price FROM restaurant_set_meals WHERE id = %s", (set_meal_id,))
+        result = cur.fetchone()
+        if result and result[0]:
+            restaurants += float(result[0]) * members
+
+    transportation = 0
+    if components.transport_id:
+        cur.execute("SELECT base_price FROM transportation_services WHERE id = %s", (components.transport_id,))
+        result = cur.fetchone()
+        if result and result[0]:
+            transportation = float(result[0]) * members * 2  # Round trip
+
+    return members, round_to_thousands(accommodation + restaurants + transportation)
+
+
+def benchmark(tours, rounds):
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot run the benchmark: Database connection failed.")
+        return
+
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id, duration FROM tours_admin ORDER BY id LIMIT %s", (tours,))
+        durations = dict(cur.fetchall())
+        tour_ids = list(durations)
+        if not tour_ids:
+            print("❌ No tours to price.")
+            return
+
+        counting = CountingCursor(cur)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            legacy = {}
+            for tour_id in tour_ids:
+                components = load_tour_components(counting, [tour_id]).get(tour_id)
+                if components:
+                    legacy[tour_id] = legacy_quote(counting, durations[tour_id], components)
+        legacy_seconds = time.perf_counter() - started
+        legacy_queries = counting.queries
+
+        counting = CountingCursor(cur)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            batched = quote_tours(counting, tour_ids)
+        batched_seconds = time.perf_counter() - started
+        batched_queries = counting.queries
+
+        quotes = len(batched) * rounds
+        mismatches = sum(
+            1 for tour_id, (members, breakdown) in batched.items()
+            if legacy.get(tour_id) != (members, breakdown['total_price'])
+        )
+        print(f"[INFO] {len(batched)} tours x {rounds} rounds")
+        for label, seconds, queries in (
+            ("per-quote", legacy_seconds, legacy_queries),
+            ("batched", batched_seconds, batched_queries),
+        ):
+            print(f"  {label:<10} {quotes / seconds:10.0f} quotes/s  "
+                  f"{queries / quotes:6.2f} queries/quote  {seconds:.3f}s")
+        print(f"  speedup    {legacy_seconds / batched_seconds:10.1f}x")
+        print(f"  totals differing: {mismatches}")
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-quote and batched tour pricing.")
+    parser.add_argument('--tours', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.tours, max(1, args.rounds))
@@ -1,5 +1,9 @@
 import psycopg2
+import psycopg2.extensions
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # Load .env from backend root directory
@@ -7,18 +11,338 @@ backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 dotenv_path = os.path.join(backend_root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    - Keeps between ``minconn`` and ``maxconn`` physical connections
+    - Callers block (up to ``timeout`` seconds) when every connection is in use
+    - Connections idle longer than ``healthcheck_after`` are pinged before reuse
+    - Connections idle longer than ``max_idle`` are closed (down to ``minconn``)
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=10.0, max_idle=300.0,
+                 healthcheck_after=30.0, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.healthcheck_after = healthcheck_after
+        self._connect_kwargs = connect_kwargs
+        self._idle = []  # list of (raw_conn, returned_at), most recently used last
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connects': 0,
+            'connect_errors': 0,
+            'discarded': 0,
+            'reaped': 0,
+            'healthcheck_failures': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _connect(self):
+        try:
+            conn = psycopg2.connect(**self._connect_kwargs)
+        except Exception:
+            with self._cond:
+                self._stats['connect_errors'] += 1
+            raise
+        with self._cond:
+            self._stats['connects'] += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.healthcheck_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap_locked(self, now):
+        """Close connections idle longer than max_idle, keeping minconn. Caller holds the lock."""
+        if self.max_idle is None:
+            return []
+        reaped = []
+        keep = []
+        total = len(self._idle) + self._in_use
+        # Oldest connections are at the front of the list
+        for conn, returned_at in self._idle:
+            if now - returned_at > self.max_idle and total > self.minconn:
+                reaped.append(conn)
+                total -= 1
+            else:
+                keep.append((conn, returned_at))
+        self._idle = keep
+        self._stats['reaped'] += len(reaped)
+        return reaped
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def getconn(self):
+        """Check out a raw connection, waiting up to ``timeout`` seconds."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            candidate = None
+            with self._cond:
+                reaped = self._reap_locked(time.monotonic())
+                while not self._idle and self._in_use >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"(max {self.maxconn} in use)"
+                        )
+                    if not waited:
+                        self._stats['waits'] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                self._in_use += 1
+
+            for conn in reaped:
+                self._close_quietly(conn)
+
+            if candidate is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                conn, returned_at = candidate
+                if not self._is_healthy(conn, time.monotonic() - returned_at):
+                    # Broken connection: drop it and try again
+                    self._close_quietly(conn)
+                    with self._cond:
+                        self._in_use -= 1
+                        self._stats['healthcheck_failures'] += 1
+                        self._stats['discarded'] += 1
+                        self._cond.notify()
+                    continue
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a raw connection to the pool, resetting any open transaction."""
+        if not discard and not conn.closed:
+            try:
+                status = conn.get_transaction_status()
+                if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if conn.closed:
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if discard:
+            self._close_quietly(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle = []
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.minconn,
+                'max_size': self.maxconn,
+            })
+            return data
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled psycopg2 connection.
+
+    Behaves like the underlying connection, except ``close()`` hands the
+    connection back to the pool instead of tearing down the socket, so
+    existing ``conn.close()`` calls in route handlers keep working unchanged.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already closed")
+        return getattr(conn, name)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+
+class SharedConnection:
+    """
+    Proxy handed out by get_connection() while a connection is pinned to the
+    thread (see pinned_connection). ``close()`` does nothing: the owner of the
+    pinned connection closes it.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__['_conn'], name)
+
+    @property
+    def closed(self):
+        return self._conn.closed
+
+    def close(self):
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pinned = threading.local()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    minconn=int(os.getenv("DB_POOL_MIN", 1)),
+                    maxconn=int(os.getenv("DB_POOL_MAX", 20)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                    max_idle=float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+                    healthcheck_after=float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", 30)),
+                    host=os.getenv("DB_HOST"),
+                    database=os.getenv("DB_NAME"),
+                    user=os.getenv("DB_USER"),
+                    password=os.getenv("DB_PASSWORD"),
+                    port=os.getenv("DB_PORT")
+                )
+    return _pool
+
+
+def _track_request_connection(conn):
+    """Remember connections checked out during a Flask request so teardown can return leaks."""
+    try:
+        from flask import g, has_app_context
+    except ImportError:
+        return
+    if has_app_context():
+        if 'db_connections' not in g:
+            g.db_connections = []
+        g.db_connections.append(conn)
+
+
+def release_request_connections(exc=None):
+    """Flask teardown hook: return any connection a handler forgot to close."""
+    from flask import g
+    for conn in g.pop('db_connections', []):
+        if not conn.closed:
+            conn.close()
+
+
 def get_connection():
+    pinned = getattr(_pinned, 'conn', None)
+    if pinned is not None:
+        return SharedConnection(pinned)
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            port=os.getenv("DB_PORT")
-        )
-        print("[OK] Database connected successfully!")
+        pool = get_pool()
+        conn = PooledConnection(pool, pool.getconn())
+        _track_request_connection(conn)
         return conn
     except Exception as e:
         print("[ERROR] Database connection failed:", e)
         return None
 
+
+@contextmanager
+def db_connection():
+    """
+    Context manager yielding a pooled connection that is always returned.
+
+    Usage:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            ...
+    Yields None if the database is unavailable, like get_connection().
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+@contextmanager
+def pinned_connection(conn):
+    """
+    Make get_connection() in this thread return `conn` inside the block, so
+    code written against get_connection() (e.g. the schema functions run by
+    migration_runner) shares one session. Their close() calls become no-ops.
+    """
+    previous = getattr(_pinned, 'conn', None)
+    _pinned.conn = conn
+    try:
+        yield conn
+    finally:
+        _pinned.conn = previous
+
+
+def get_pool_stats():
+    """Snapshot of pool metrics (checkouts, waits, timeouts, sizes)."""
+    return get_pool().stats()
@@ -1,14 +1,21 @@
 """
-Create and populate tour_highlights table.
-This table contains tours with booking counts for highlighting popular tours.
+Create and maintain the tour_highlights table.
+This table keeps the number of confirmed/completed bookings per tour, used to
+highlight popular tours. A trigger on bookings keeps the counts current, so
+the table is never rebuilt.
 """
 
 from config.database import get_connection
 
+# Booking statuses that count towards a tour's popularity
+COUNTED_STATUSES_SQL = "('confirmed', 'completed')"
+
+
 def create_tour_highlights_table():
     """
-    Create tour_highlights table with all columns from tours_admin plus booking_count.
-    Automatically populated with data from tours_admin and booking statistics.
+    Create tour_highlights (tour_id, booking_count) and the bookings trigger
+    that maintains it, then reconcile the counts with existing bookings.
+    Replaces the old CREATE TABLE AS snapshot if it is still present.
     """
     conn = get_connection()
     if conn is None:
@@ -16,83 +23,113 @@ def create_tour_highlights_table():
         return False
 
     cur = conn.cursor()
-    
+
     try:
-        print("[INFO] Creating tour_highlights table...")
-        
-        # Drop existing table if it exists
-        cur.execute("DROP TABLE IF EXISTS tour_highlights CASCADE;")
-        
-        # Create tour_highlights table with same structure as tours_admin + booking_count
-        # Include all published and active tours (even if all schedules are completed)
+        print("[INFO] Checking tour_highlights table...")
+
+        # The old snapshot copied every tours_admin column (keyed by id)
         cur.execute("""
-            CREATE TABLE tour_highlights AS
-            SELECT 
-                t.*,
-                COALESCE(COUNT(DISTINCT b.id), 0) as booking_count
-            FROM tours_admin t
-            LEFT JOIN bookings b ON t.id = b.tour_id 
-                AND b.status IN ('confirmed', 'completed')
-            WHERE t.is_active = TRUE 
-                AND t.is_published = TRUE
-            GROUP BY t.id
-            ORDER BY booking_count DESC;
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'tour_highlights' AND column_name = 'id'
         """)
-        
-        # Add primary key
+        if cur.fetchone():
+            print("[INFO] Replacing tour_highlights snapshot with booking counters...")
+            cur.execute("DROP TABLE tour_highlights CASCADE;")
+
         cur.execute("""
-            ALTER TABLE tour_highlights 
-            ADD PRIMARY KEY (id);
+            CREATE TABLE IF NOT EXISTS tour_highlights (
+                tour_id INTEGER PRIMARY KEY REFERENCES tours_admin(id) ON DELETE CASCADE,
+                booking_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
         """)
-        
-        # Create index on booking_count for faster sorting
         cur.execute("""
-            CREATE INDEX idx_tour_highlights_booking_count 
+            CREATE INDEX IF NOT EXISTS idx_tour_highlights_booking_count
             ON tour_highlights(booking_count DESC);
         """)
-        
-        # Create index on is_published and is_active
+
+        cur.execute(f"""
+            CREATE OR REPLACE FUNCTION tour_highlights_booking_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE'
+                   AND OLD.tour_id IS NOT DISTINCT FROM NEW.tour_id
+                   AND (OLD.status IN {COUNTED_STATUSES_SQL}) IS NOT DISTINCT FROM (NEW.status IN {COUNTED_STATUSES_SQL}) THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tour_id IS NOT NULL
+                   AND OLD.status IN {COUNTED_STATUSES_SQL} THEN
+                    UPDATE tour_highlights
+                    SET booking_count = GREATEST(booking_count - 1, 0), updated_at = NOW()
+                    WHERE tour_id = OLD.tour_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tour_id IS NOT NULL
+                   AND NEW.status IN {COUNTED_STATUSES_SQL} THEN
+                    INSERT INTO tour_highlights (tour_id, booking_count)
+                    VALUES (NEW.tour_id, 1)
+                    ON CONFLICT (tour_id) DO UPDATE
+                    SET booking_count = tour_highlights.booking_count + 1, updated_at = NOW();
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_tour_highlights_booking ON bookings;")
         cur.execute("""
-            CREATE INDEX idx_tour_highlights_published_active 
-            ON tour_highlights(is_published, is_active);
+            CREATE TRIGGER trg_tour_highlights_booking
+            AFTER INSERT OR DELETE OR UPDATE OF status, tour_id ON bookings
+            FOR EACH ROW EXECUTE FUNCTION tour_highlights_booking_trigger();
         """)
-        
+
+        _reconcile_counts(cur)
         conn.commit()
-        
-        # Get count of tours in highlights
-        cur.execute("SELECT COUNT(*) FROM tour_highlights;")
+
+        cur.execute("SELECT COUNT(*) FROM tour_highlights WHERE booking_count > 0;")
         count = cur.fetchone()[0]
-        
-        print(f"[SUCCESS] tour_highlights table created with {count} tours")
-        
-        # Show top 6 tours
-        cur.execute("""
-            SELECT id, name, booking_count 
-            FROM tour_highlights 
-            ORDER BY booking_count DESC 
-            LIMIT 6;
-        """)
-        
-        print("\n[INFO] Top 6 highlighted tours:")
-        for row in cur.fetchall():
-            print(f"  - Tour ID {row[0]}: {row[1]} ({row[2]} bookings)")
-        
+        print(f"[SUCCESS] tour_highlights is ready ({count} tours with bookings)")
         return True
-        
+
     except Exception as e:
         print(f"[ERROR] Failed to create tour_highlights table: {e}")
         conn.rollback()
         return False
-        
+
     finally:
         cur.close()
         conn.close()
 
 
+def _reconcile_counts(cur):
+    """Set every booking_count from the bookings table (only rows that differ are written)."""
+    # Hold off booking writes so no trigger update is lost between the two statements
+    cur.execute("LOCK TABLE bookings IN SHARE MODE;")
+    cur.execute(f"""
+        INSERT INTO tour_highlights (tour_id, booking_count)
+        SELECT b.tour_id, COUNT(*)
+        FROM bookings b
+        WHERE b.tour_id IS NOT NULL AND b.status IN {COUNTED_STATUSES_SQL}
+        GROUP BY b.tour_id
+        ON CONFLICT (tour_id) DO UPDATE
+        SET booking_count = EXCLUDED.booking_count, updated_at = NOW()
+        WHERE tour_highlights.booking_count <> EXCLUDED.booking_count;
+    """)
+    cur.execute(f"""
+        UPDATE tour_highlights th
+        SET booking_count = 0, updated_at = NOW()
+        WHERE th.booking_count <> 0
+          AND NOT EXISTS (
+              SELECT 1 FROM bookings b
+              WHERE b.tour_id = th.tour_id AND b.status IN {COUNTED_STATUSES_SQL}
+          );
+    """)
+
+
 def refresh_tour_highlights():
     """
-    Refresh tour_highlights table with latest booking data.
-    This function should be called periodically or when booking data changes.
+    Recount tour_highlights from the bookings table.
+    The trigger keeps counts current; this only repairs drift (e.g. after
+    bulk edits made with the trigger disabled).
     """
     conn = get_connection()
     if conn is None:
@@ -100,45 +137,19 @@ def refresh_tour_highlights():
         return False
 
     cur = conn.cursor()
-    
+
     try:
-        print("[INFO] Refreshing tour_highlights table...")
-        
-        # Recreate the table with updated data
-        # Include all published and active tours (even if all schedules are completed)
-        cur.execute("DROP TABLE IF EXISTS tour_highlights CASCADE;")
-        
-        cur.execute("""
-            CREATE TABLE tour_highlights AS
-            SELECT 
-                t.*,
-                COALESCE(COUNT(DISTINCT b.id), 0) as booking_count
-            FROM tours_admin t
-            LEFT JOIN bookings b ON t.id = b.tour_id 
-                AND b.status IN ('confirmed', 'completed')
-            WHERE t.is_active = TRUE 
-                AND t.is_published = TRUE
-            GROUP BY t.id
-            ORDER BY booking_count DESC;
-        """)
-        
-        cur.execute("ALTER TABLE tour_highlights ADD PRIMARY KEY (id);")
-        cur.execute("CREATE INDEX idx_tour_highlights_booking_count ON tour_highlights(booking_count DESC);")
-        cur.execute("CREATE INDEX idx_tour_highlights_published_active ON tour_highlights(is_published, is_active);")
-        
+        print("[INFO] Refreshing tour_highlights counts...")
+        _reconcile_counts(cur)
         conn.commit()
-        
-        cur.execute("SELECT COUNT(*) FROM tour_highlights;")
-        count = cur.fetchone()[0]
-        
-        print(f"[SUCCESS] tour_highlights table refreshed with {count} tours")
+        print("[SUCCESS] tour_highlights counts refreshed")
         return True
-        
+
     except Exception as e:
         print(f"[ERROR] Failed to refresh tour_highlights: {e}")
         conn.rollback()
         return False
-        
+
     finally:
         cur.close()
         conn.close()
@@ -148,12 +159,12 @@ if __name__ == "__main__":
     print("=" * 60)
     print("TOUR HIGHLIGHTS TABLE CREATION")
     print("=" * 60)
-    
+
     success = create_tour_highlights_table()
-    
+
     if success:
         print("\n✅ Tour highlights table created successfully!")
     else:
         print("\n❌ Failed to create tour highlights table")
-    
+
     print("=" * 60)
@@ -0,0 +1,260 @@
+"""
+Concurrent oversell check for src/services/slot_reservation.py.
+
+Creates a throwaway (unpublished) tour with one departure of --slots slots,
+then starts --workers threads at the same moment, each on its own connection.
+Depending on --mode, each one takes the slots for --guests guests with:
+
+    reserve  reserve_slots()
+    hold     create_hold()
+    book     the checkout path of POST /api/bookings/create: create_hold(),
+             committed, then confirm_hold(), the bookings insert,
+             attach_booking() and write_booking_items() in one transaction
+
+Each keeps its (last) transaction open for --hold-ms before committing, so the
+others queue on the schedule row and re-check it. A sampler watches
+slots_available meanwhile.
+
+Passes when exactly slots // slots_for_guests(guests) workers succeed, the
+schedule ends with slots_booked equal to what they took, slots_available is
+never seen below zero, and (in book mode) one booking exists per success.
+Prints attempts/s and successful reservations/s. The tour and its bookings
+are deleted afterwards.
+
+The connection pool is sized for the workers (DB_POOL_MAX defaults to
+--workers + 1 here), so Postgres' max_connections must allow that many; with a
+smaller DB_POOL_MAX, workers wait for a connection (DB_POOL_TIMEOUT defaults to
+120s here) and the run measures the pool as well.
+
+Usage (against a development database):
+    python load_test_slot_holds.py [--mode reserve|hold|book] [--workers 200]
+                                   [--slots 100] [--guests 2] [--hold-ms 20]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from config.database import get_connection
+from src.services.booking_items import write_booking_items
+from src.services.slot_reservation import (
+    attach_booking,
+    confirm_hold,
+    create_hold,
+    reserve_slots,
+    slots_for_guests,
+)
+
+
+def create_test_schedule(slots):
+    """Insert an unpublished tour with one future departure. Returns (tour_id, schedule_id)."""
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Database connection failed")
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id FROM cities ORDER BY id LIMIT 2")
+        cities = [row[0] for row in cur.fetchall()]
+        if len(cities) < 2:
+            raise RuntimeError("At least two cities are needed (run the app once to seed them)")
+        cur.execute("""
+            INSERT INTO tours_admin (
+                name, duration, description, destination_city_id, departure_city_id,
+                number_of_members, is_active, is_published
+            ) VALUES ('Slot load test', '1 day', 'Temporary tour for load_test_slot_holds.py',
+                      %s, %s, %s, TRUE, FALSE)
+            RETURNING id
+        """, (cities[0], cities[1], slots))
+        tour_id = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO tour_schedules (tour_id, departure_datetime, return_datetime, max_slots)
+            VALUES (%s, NOW() + INTERVAL '30 days', NOW() + INTERVAL '31 days', %s)
+            RETURNING id
+        """, (tour_id, slots))
+        schedule_id = cur.fetchone()[0]
+        conn.commit()
+        return tour_id, schedule_id
+    finally:
+        cur.close()
+        conn.close()
+
+
+def delete_test_tour(tour_id):
+    conn = get_connection()
+    if conn is None:
+        print(f"[WARNING] Could not delete test tour {tour_id}: Database connection failed.")
+        return
+    cur = conn.cursor()
+    try:
+        # Bookings would only lose their tour_id; schedules and holds cascade
+        cur.execute("DELETE FROM bookings WHERE tour_id = %s", (tour_id,))
+        cur.execute("DELETE FROM tours_admin WHERE id = %s", (tour_id,))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def book(conn, cur, schedule_id, tour_id, guests, need, hold_ms):
+    """Hold, then confirm the hold into a booking as create_booking does. Returns True if booked."""
+    hold = create_hold(cur, schedule_id, tour_id, need)
+    conn.commit()
+    if hold is None:
+        return False
+
+    if not confirm_hold(cur, hold['hold_token'], schedule_id, tour_id, need):
+        conn.rollback()
+        return False
+    cur.execute("""
+        INSERT INTO bookings (
+            tour_id, tour_schedule_id, full_name, email, phone,
+            departure_date, number_of_guests, number_of_adults, number_of_children,
+            total_price, payment_method, status, created_at
+        ) VALUES (%s, %s, 'Load Test', 'load-test@example.com', '0000000000',
+                  CURRENT_DATE + 30, %s, %s, 0, 1000000, 'cash', 'confirmed', NOW())
+        RETURNING id
+    """, (tour_id, schedule_id, guests, guests))
+    booking_id = cur.fetchone()[0]
+    attach_booking(cur, hold['hold_token'], booking_id)
+    write_booking_items(cur, [(booking_id, tour_id, guests, None)])
+    time.sleep(hold_ms / 1000)
+    conn.commit()
+    return True
+
+
+def count_bookings(conn, tour_id):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM bookings WHERE tour_id = %s", (tour_id,))
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.rollback()
+
+
+def read_schedule(conn, schedule_id):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT slots_booked, slots_available FROM tour_schedules WHERE id = %s", (schedule_id,))
+        return cur.fetchone()
+    finally:
+        cur.close()
+        conn.rollback()
+
+
+def run(mode, workers, slots, guests, hold_ms):
+    need = slots_for_guests(guests)
+    expected = slots // need
+    tour_id, schedule_id = create_test_schedule(slots)
+    print(f"[INFO] Tour {tour_id}, schedule {schedule_id}: {slots} slots, "
+          f"{workers} x {mode} of {need} slots, expecting {expected} to succeed")
+
+    start = threading.Barrier(workers)
+    results = []
+    errors = []
+    lock = threading.Lock()
+    done = threading.Event()
+    lowest = [slots]
+
+    def worker():
+        start.wait()
+        conn = get_connection()
+        if conn is None:
+            with lock:
+                errors.append(RuntimeError("Database connection failed"))
+            return
+        cur = conn.cursor()
+        try:
+            if mode == 'book':
+                ok = book(conn, cur, schedule_id, tour_id, guests, need, hold_ms)
+            else:
+                if mode == 'hold':
+                    ok = create_hold(cur, schedule_id, tour_id, need) is not None
+                else:
+                    ok = reserve_slots(cur, schedule_id, tour_id, need) is not None
+                # Keep the row locked so competing workers have to wait and re-check
+                time.sleep(hold_ms / 1000)
+                conn.commit()
+            with lock:
+                results.append(ok)
+        except Exception as e:
+            conn.rollback()
+            with lock:
+                errors.append(e)
+        finally:
+            cur.close()
+            conn.close()
+
+    def sampler():
+        while not done.is_set():
+            _, available = read_schedule(sample_conn, schedule_id)
+            lowest[0] = min(lowest[0], available)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    watcher = threading.Thread(target=sampler)
+    sample_conn = get_connection()
+    try:
+        if sample_conn is None:
+            raise RuntimeError("Database connection failed")
+        watcher.start()
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        done.set()
+        watcher.join()
+
+        booked, available = read_schedule(sample_conn, schedule_id)
+        lowest[0] = min(lowest[0], available)
+        succeeded = sum(results)
+        print(f"[INFO] {succeeded} succeeded, {len(results) - succeeded} refused, "
+              f"{len(errors)} errors in {elapsed:.2f}s")
+        print(f"[INFO] {workers / elapsed:.1f} attempts/s, "
+              f"{succeeded / elapsed:.1f} successful reservations/s")
+        print(f"[INFO] slots_booked={booked}, slots_available={available}, lowest seen={lowest[0]}")
+
+        failures = []
+        if errors:
+            failures.append(f"worker errors: {errors[0]!r}")
+        if succeeded != expected:
+            failures.append(f"{succeeded} reservations succeeded, expected {expected}")
+        if booked != succeeded * need:
+            failures.append(f"slots_booked is {booked}, expected {succeeded * need}")
+        if lowest[0] < 0:
+            failures.append(f"slots_available went negative ({lowest[0]})")
+        if mode == 'book':
+            bookings = count_bookings(sample_conn, tour_id)
+            if bookings != succeeded:
+                failures.append(f"{bookings} bookings were created, expected {succeeded}")
+        return failures
+    finally:
+        done.set()
+        if sample_conn is not None:
+            sample_conn.close()
+        delete_test_tour(tour_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=('reserve', 'hold', 'book'), default='reserve')
+    parser.add_argument('--workers', type=int, default=200)
+    parser.add_argument('--slots', type=int, default=100)
+    parser.add_argument('--guests', type=int, default=2)
+    parser.add_argument('--hold-ms', type=int, default=20)
+    args = parser.parse_args()
+
+    # One connection per worker plus the sampler; read when the pool is created
+    os.environ.setdefault("DB_POOL_MAX", str(args.workers + 1))
+    os.environ.setdefault("DB_POOL_TIMEOUT", "120")
+
+    failures = run(args.mode, args.workers, args.slots, args.guests, args.hold_ms)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ No oversell.")
@@ -0,0 +1,89 @@
+"""
+Move Base64 data URI images out of the database into the blob store.
+
+Rows whose image column holds a "data:<mime>;base64,..." URI are rewritten to
+the short /api/blobs/<sha256><ext> URL of the extracted file. Safe to re-run:
+only rows that still contain data URIs are touched.
+
+Usage:
+    python migrate_blob_images.py
+"""
+
+from config.database import get_connection
+from src.services.blob_store import store_data_uri
+
+# (table, column) pairs that may contain data URIs
+DATA_URI_COLUMNS = [
+    ('tour_images', 'image_url'),
+    ('service_images', 'image_url'),
+    ('posts', 'image_url'),
+    ('users', 'avatar_url'),
+]
+
+BATCH_SIZE = 50
+
+
+def extract_data_uri_images(batch_size=BATCH_SIZE):
+    """
+    Extract data URIs from DATA_URI_COLUMNS into the blob store, committing
+    after every batch so progress survives interruption.
+    Returns the number of rows rewritten.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot extract images: Database connection failed.")
+        return 0
+
+    cur = conn.cursor()
+    total = 0
+    try:
+        for table, column in DATA_URI_COLUMNS:
+            print(f"[INFO] Extracting data URIs from {table}.{column}...")
+            migrated = 0
+            failed = 0
+            last_id = 0
+            while True:
+                # Page by id so only one batch of payloads is in memory at a time
+                cur.execute(f"""
+                    SELECT id, {column} FROM {table}
+                    WHERE {column} LIKE 'data:%%' AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+
+                updates = []
+                for row_id, value in rows:
+                    try:
+                        updates.append((store_data_uri(value), row_id))
+                    except ValueError as e:
+                        failed += 1
+                        print(f"[WARNING] {table} #{row_id}: {e}")
+                last_id = rows[-1][0]
+
+                if updates:
+                    cur.executemany(
+                        f"UPDATE {table} SET {column} = %s WHERE id = %s",
+                        updates
+                    )
+                conn.commit()
+                migrated += len(updates)
+
+            print(f"✅ {table}.{column}: {migrated} rows moved to blob store, {failed} skipped")
+            total += migrated
+
+        return total
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error extracting data URI images: {e}")
+        return total
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    extract_data_uri_images()
@@ -0,0 +1,69 @@
+"""
+Create the booking_items table (normalized rooms, meals and transport legs of
+each booking) and backfill it from bookings.customizations.
+"""
+
+from config.database import get_connection
+from src.services.booking_items import backfill_booking_items
+
+def create_booking_items_table():
+    """
+    Create booking_items with its partner/booking indexes and write items for
+    every existing booking that has none.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create booking_items table: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking booking_items table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS booking_items (
+                id SERIAL PRIMARY KEY,
+                booking_id INTEGER NOT NULL REFERENCES bookings(id) ON DELETE CASCADE,
+                item_type VARCHAR(20) NOT NULL CHECK (item_type IN ('room', 'meal', 'transport')),
+                partner_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                service_id INTEGER,
+                day_number INTEGER,
+                meal_session VARCHAR(20),
+                leg VARCHAR(10) CHECK (leg IN ('outbound', 'return')),
+                quantity INTEGER NOT NULL DEFAULT 1,
+                unit_price DECIMAL(12, 2) NOT NULL DEFAULT 0,
+                amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Per-partner counts and revenue
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_booking_items_partner
+            ON booking_items(partner_id, item_type, booking_id);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_booking_items_booking
+            ON booking_items(booking_id);
+        """)
+        conn.commit()
+
+        examined = backfill_booking_items(cur)
+        conn.commit()
+        if examined:
+            print(f"[INFO] Wrote booking items for {examined} existing bookings.")
+
+        print("✅ booking_items is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating booking_items table: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_booking_items_table()
@@ -0,0 +1,67 @@
+"""
+Create the email_outbox table used for asynchronous email delivery.
+"""
+
+from config.database import get_connection
+
+def create_email_outbox_table():
+    """
+    Create email_outbox. Request handlers insert rows (status 'pending') and
+    the outbox worker in src/services/email_outbox.py delivers them.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create email_outbox: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking email_outbox table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id BIGSERIAL PRIMARY KEY,
+                to_email VARCHAR(255) NOT NULL,
+                subject TEXT NOT NULL,
+                html_content TEXT NOT NULL,
+                text_content TEXT,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending'
+                    CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                locked_at TIMESTAMP,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                sent_at TIMESTAMP
+            );
+        """)
+
+        # The worker only ever scans due pending rows
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+            ON email_outbox(next_attempt_at, id)
+            WHERE status = 'pending';
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_email_outbox_sending
+            ON email_outbox(locked_at)
+            WHERE status = 'sending';
+        """)
+
+        conn.commit()
+        print("✅ email_outbox is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating email_outbox: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_email_outbox_table()
@@ -0,0 +1,370 @@
+"""
+Create the partner dashboard rollups and the triggers keeping them current.
+
+- partner_revenue_daily / partner_revenue_monthly: pending and paid revenue
+  (partner_revenue_pending, by the day/month the row was created) and
+  non-cancelled bookings using the partner's services (booking_items, by
+  booking day).
+- partner_dashboard_summary: the partner's service count (rooms for
+  accommodation partners, set meals for restaurants, vehicles for
+  transportation), recounted when those services change.
+
+The triggers apply deltas, so the dashboard reads a handful of rows per
+partner instead of aggregating revenue and services on every request.
+"""
+
+from config.database import get_connection
+
+def create_partner_rollups():
+    """
+    Create the rollup tables, their maintenance triggers, and rebuild them
+    from partner_revenue_pending, booking_items and the partner services.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create partner rollups: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking partner rollup tables...")
+
+        for table, period in (("partner_revenue_daily", "day"), ("partner_revenue_monthly", "month")):
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    partner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    {period} DATE NOT NULL,
+                    revenue_pending DECIMAL(16, 2) NOT NULL DEFAULT 0,
+                    revenue_paid DECIMAL(16, 2) NOT NULL DEFAULT 0,
+                    bookings INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (partner_id, {period})
+                );
+            """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS partner_dashboard_summary (
+                partner_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+                services_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Add a delta to the partner's day and month
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_rollup_add(
+                p_partner_id INTEGER, p_at TIMESTAMP,
+                p_pending NUMERIC, p_paid NUMERIC, p_bookings INTEGER
+            ) RETURNS VOID AS $$
+            BEGIN
+                -- Skip partners being deleted (their rollups cascade away)
+                IF p_partner_id IS NULL OR p_at IS NULL
+                   OR NOT EXISTS (SELECT 1 FROM users WHERE id = p_partner_id) THEN
+                    RETURN;
+                END IF;
+                INSERT INTO partner_revenue_daily AS d (partner_id, day, revenue_pending, revenue_paid, bookings)
+                VALUES (p_partner_id, p_at::DATE, p_pending, p_paid, p_bookings)
+                ON CONFLICT (partner_id, day) DO UPDATE SET
+                    revenue_pending = d.revenue_pending + EXCLUDED.revenue_pending,
+                    revenue_paid = d.revenue_paid + EXCLUDED.revenue_paid,
+                    bookings = d.bookings + EXCLUDED.bookings;
+                INSERT INTO partner_revenue_monthly AS m (partner_id, month, revenue_pending, revenue_paid, bookings)
+                VALUES (p_partner_id, date_trunc('month', p_at)::DATE, p_pending, p_paid, p_bookings)
+                ON CONFLICT (partner_id, month) DO UPDATE SET
+                    revenue_pending = m.revenue_pending + EXCLUDED.revenue_pending,
+                    revenue_paid = m.revenue_paid + EXCLUDED.revenue_paid,
+                    bookings = m.bookings + EXCLUDED.bookings;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        # Revenue rows: take back the old contribution, add the new one
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_revenue_rollup_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM partner_rollup_add(
+                        OLD.partner_id, OLD.created_at,
+                        CASE WHEN OLD.status = 'pending' THEN -OLD.amount ELSE 0 END,
+                        CASE WHEN OLD.status = 'paid' THEN -OLD.amount ELSE 0 END,
+                        0);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM partner_rollup_add(
+                        NEW.partner_id, NEW.created_at,
+                        CASE WHEN NEW.status = 'pending' THEN NEW.amount ELSE 0 END,
+                        CASE WHEN NEW.status = 'paid' THEN NEW.amount ELSE 0 END,
+                        0);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_partner_revenue_rollup ON partner_revenue_pending;")
+        cur.execute("""
+            CREATE TRIGGER trg_partner_revenue_rollup
+            AFTER INSERT OR DELETE OR UPDATE OF amount, status, partner_id, created_at
+            ON partner_revenue_pending
+            FOR EACH ROW EXECUTE FUNCTION partner_revenue_rollup_trigger();
+        """)
+
+        # Bookings: a non-cancelled booking counts once per partner however
+        # many items it has, so the first/last item of a (booking, partner)
+        # pair moves the count
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_booking_items_insert_rollup()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                PERFORM partner_rollup_add(n.partner_id, n.day, 0, 0, n.bookings)
+                FROM (
+                    SELECT ni.partner_id, MIN(ni.created_at) AS day, COUNT(DISTINCT ni.booking_id)::INTEGER AS bookings
+                    FROM new_items ni
+                    JOIN bookings b ON b.id = ni.booking_id
+                    WHERE ni.partner_id IS NOT NULL
+                      AND b.status IS DISTINCT FROM 'cancelled'
+                      AND NOT EXISTS (
+                          SELECT 1 FROM booking_items bi
+                          WHERE bi.booking_id = ni.booking_id AND bi.partner_id = ni.partner_id
+                            AND bi.id NOT IN (SELECT id FROM new_items)
+                      )
+                    GROUP BY ni.partner_id, ni.created_at::DATE
+                ) n;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_booking_items_delete_rollup()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                PERFORM partner_rollup_add(o.partner_id, o.day, 0, 0, -o.bookings)
+                FROM (
+                    SELECT pairs.partner_id, pairs.day, COUNT(*)::INTEGER AS bookings
+                    FROM (
+                        -- Items of deleted bookings were counted off by the bookings trigger
+                        SELECT oi.booking_id, oi.partner_id, MIN(oi.created_at) AS day
+                        FROM old_items oi
+                        JOIN bookings b ON b.id = oi.booking_id
+                        WHERE oi.partner_id IS NOT NULL
+                          AND b.status IS DISTINCT FROM 'cancelled'
+                          AND NOT EXISTS (
+                              SELECT 1 FROM booking_items bi
+                              WHERE bi.booking_id = oi.booking_id AND bi.partner_id = oi.partner_id
+                          )
+                        GROUP BY oi.booking_id, oi.partner_id
+                    ) pairs
+                    GROUP BY pairs.partner_id, pairs.day
+                ) o;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_booking_items_rollup_insert ON booking_items;")
+        cur.execute("""
+            CREATE TRIGGER trg_booking_items_rollup_insert
+            AFTER INSERT ON booking_items
+            REFERENCING NEW TABLE AS new_items
+            FOR EACH STATEMENT EXECUTE FUNCTION partner_booking_items_insert_rollup();
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_booking_items_rollup_delete ON booking_items;")
+        cur.execute("""
+            CREATE TRIGGER trg_booking_items_rollup_delete
+            AFTER DELETE ON booking_items
+            REFERENCING OLD TABLE AS old_items
+            FOR EACH STATEMENT EXECUTE FUNCTION partner_booking_items_delete_rollup();
+        """)
+
+        # Booking status: cancelling takes the booking off each of its
+        # partners, un-cancelling puts it back. Deleting a live booking takes
+        # it off before its items cascade away (the items trigger then no
+        # longer finds the booking).
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_booking_status_rollup()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                was_cancelled BOOLEAN := OLD.status IS NOT DISTINCT FROM 'cancelled';
+                delta INTEGER;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    IF NOT was_cancelled THEN
+                        delta := -1;
+                    END IF;
+                ELSIF was_cancelled <> (NEW.status IS NOT DISTINCT FROM 'cancelled') THEN
+                    delta := CASE WHEN was_cancelled THEN 1 ELSE -1 END;
+                END IF;
+
+                IF delta IS NOT NULL THEN
+                    PERFORM partner_rollup_add(p.partner_id, p.day, 0, 0, delta)
+                    FROM (
+                        SELECT partner_id, MIN(created_at) AS day
+                        FROM booking_items
+                        WHERE booking_id = OLD.id AND partner_id IS NOT NULL
+                        GROUP BY partner_id
+                    ) p;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_bookings_rollup_status ON bookings;")
+        cur.execute("""
+            CREATE TRIGGER trg_bookings_rollup_status
+            AFTER UPDATE OF status ON bookings
+            FOR EACH ROW EXECUTE FUNCTION partner_booking_status_rollup();
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_bookings_rollup_delete ON bookings;")
+        cur.execute("""
+            CREATE TRIGGER trg_bookings_rollup_delete
+            BEFORE DELETE ON bookings
+            FOR EACH ROW EXECUTE FUNCTION partner_booking_status_rollup();
+        """)
+
+        # Services: recount the affected partners (rooms x total_rooms,
+        # set meals or vehicles depending on partner_type)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION refresh_partner_services_count(p_partner_id INTEGER)
+            RETURNS VOID AS $$
+            BEGIN
+                INSERT INTO partner_dashboard_summary AS s (partner_id, services_count, updated_at)
+                SELECT u.id,
+                       CASE u.partner_type
+                           WHEN 'accommodation' THEN (
+                               SELECT COALESCE(SUM(ar.total_rooms), 0)
+                               FROM accommodation_services acs
+                               JOIN accommodation_rooms ar ON ar.accommodation_id = acs.id
+                               WHERE acs.partner_id = u.id)
+                           WHEN 'restaurant' THEN (
+                               SELECT COUNT(*)
+                               FROM restaurant_services rs
+                               JOIN restaurant_set_meals rsm ON rsm.restaurant_id = rs.id
+                               WHERE rs.partner_id = u.id)
+                           WHEN 'transportation' THEN (
+                               SELECT COUNT(*) FROM transportation_services WHERE partner_id = u.id)
+                           ELSE 0
+                       END,
+                       CURRENT_TIMESTAMP
+                FROM users u
+                WHERE u.id = p_partner_id
+                ON CONFLICT (partner_id) DO UPDATE SET
+                    services_count = EXCLUDED.services_count,
+                    updated_at = EXCLUDED.updated_at;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_services_count_trigger()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                partner_ids INTEGER[] := '{}';
+            BEGIN
+                IF TG_TABLE_NAME = 'accommodation_rooms' THEN
+                    IF TG_OP <> 'INSERT' THEN
+                        partner_ids := partner_ids || (SELECT partner_id FROM accommodation_services WHERE id = OLD.accommodation_id);
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        partner_ids := partner_ids || (SELECT partner_id FROM accommodation_services WHERE id = NEW.accommodation_id);
+                    END IF;
+                ELSIF TG_TABLE_NAME = 'restaurant_set_meals' THEN
+                    IF TG_OP <> 'INSERT' THEN
+                        partner_ids := partner_ids || (SELECT partner_id FROM restaurant_services WHERE id = OLD.restaurant_id);
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        partner_ids := partner_ids || (SELECT partner_id FROM restaurant_services WHERE id = NEW.restaurant_id);
+                    END IF;
+                ELSE
+                    -- accommodation_services, restaurant_services, transportation_services
+                    IF TG_OP <> 'INSERT' THEN
+                        partner_ids := partner_ids || OLD.partner_id;
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        partner_ids := partner_ids || NEW.partner_id;
+                    END IF;
+                END IF;
+
+                PERFORM refresh_partner_services_count(p.id)
+                FROM (SELECT DISTINCT unnest(partner_ids) AS id) p
+                WHERE p.id IS NOT NULL;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        service_triggers = (
+            ("accommodation_rooms", "INSERT OR DELETE OR UPDATE OF total_rooms, accommodation_id"),
+            ("restaurant_set_meals", "INSERT OR DELETE OR UPDATE OF restaurant_id"),
+            ("transportation_services", "INSERT OR DELETE OR UPDATE OF partner_id"),
+            # Parents: moving or deleting a whole accommodation/restaurant
+            ("accommodation_services", "DELETE OR UPDATE OF partner_id"),
+            ("restaurant_services", "DELETE OR UPDATE OF partner_id"),
+        )
+        for table, events in service_triggers:
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_partner_services ON {table};")
+            cur.execute(f"""
+                CREATE TRIGGER trg_{table}_partner_services
+                AFTER {events} ON {table}
+                FOR EACH ROW EXECUTE FUNCTION partner_services_count_trigger();
+            """)
+
+        # Rebuild; block concurrent writers so no delta is counted twice
+        cur.execute("LOCK TABLE partner_revenue_pending, booking_items, bookings IN SHARE MODE;")
+
+        # Items backfilled by migration 0022 carry the migration time; date
+        # them by their booking like items written at booking time
+        cur.execute("""
+            UPDATE booking_items bi
+            SET created_at = b.created_at
+            FROM bookings b
+            WHERE b.id = bi.booking_id
+              AND b.created_at IS NOT NULL
+              AND bi.created_at::DATE IS DISTINCT FROM b.created_at::DATE;
+        """)
+
+        cur.execute("DELETE FROM partner_revenue_daily;")
+        cur.execute("DELETE FROM partner_revenue_monthly;")
+        cur.execute("""
+            INSERT INTO partner_revenue_daily (partner_id, day, revenue_pending, revenue_paid, bookings)
+            SELECT partner_id, day, SUM(pending), SUM(paid), SUM(bookings)
+            FROM (
+                SELECT partner_id, created_at::DATE AS day,
+                       CASE WHEN status = 'pending' THEN amount ELSE 0 END AS pending,
+                       CASE WHEN status = 'paid' THEN amount ELSE 0 END AS paid,
+                       0 AS bookings
+                FROM partner_revenue_pending
+                WHERE partner_id IS NOT NULL AND created_at IS NOT NULL
+                UNION ALL
+                SELECT bi.partner_id, MIN(bi.created_at)::DATE, 0, 0, 1
+                FROM booking_items bi
+                JOIN bookings b ON b.id = bi.booking_id
+                WHERE bi.partner_id IS NOT NULL AND bi.created_at IS NOT NULL
+                  AND b.status IS DISTINCT FROM 'cancelled'
+                GROUP BY bi.booking_id, bi.partner_id
+            ) deltas
+            GROUP BY partner_id, day;
+        """)
+        cur.execute("""
+            INSERT INTO partner_revenue_monthly (partner_id, month, revenue_pending, revenue_paid, bookings)
+            SELECT partner_id, date_trunc('month', day)::DATE, SUM(revenue_pending), SUM(revenue_paid), SUM(bookings)
+            FROM partner_revenue_daily
+            GROUP BY partner_id, date_trunc('month', day);
+        """)
+        cur.execute("SELECT refresh_partner_services_count(id) FROM users WHERE role = 'partner';")
+        print(f"[INFO] Counted services of {cur.rowcount} partners.")
+
+        conn.commit()
+        print("✅ Partner rollups are ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating partner rollups: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_partner_rollups()
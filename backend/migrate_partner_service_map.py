@@ -0,0 +1,225 @@
+"""
+Create partner_service_map and partner_tours, and the per-partner tour count
+on partner_dashboard_summary.
+
+- partner_service_map: (service_type, service_id) -> partner_id for
+  accommodation, restaurant and transportation services.
+- partner_tours: tours using at least one of the partner's services, with
+  the number of tour_services links behind each pair.
+- partner_dashboard_summary.support_tours: number of partner_tours rows.
+
+Triggers on the service tables and tour_services keep them current, so the
+admin partners summary is a plain join instead of OR-ed IN subqueries per
+partner over every tour_services row.
+"""
+
+from config.database import get_connection
+
+SERVICE_TABLES = (
+    ("accommodation", "accommodation_services"),
+    ("restaurant", "restaurant_services"),
+    ("transportation", "transportation_services"),
+)
+
+def create_partner_service_map():
+    """
+    Create the map and partner_tours with their triggers, add
+    support_tours, and rebuild everything from the current services.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create partner_service_map: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking partner_service_map table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS partner_service_map (
+                service_type VARCHAR(20) NOT NULL CHECK (service_type IN ('accommodation', 'restaurant', 'transportation')),
+                service_id INTEGER NOT NULL,
+                partner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                PRIMARY KEY (service_type, service_id)
+            );
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_partner_service_map_partner
+            ON partner_service_map(partner_id);
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS partner_tours (
+                partner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                tour_id INTEGER NOT NULL REFERENCES tours_admin(id) ON DELETE CASCADE,
+                service_links INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (partner_id, tour_id)
+            );
+        """)
+        cur.execute("""
+            ALTER TABLE partner_dashboard_summary
+            ADD COLUMN IF NOT EXISTS support_tours INTEGER NOT NULL DEFAULT 0;
+        """)
+
+        # Recompute one partner's tours from tour_services (equi-joins only)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION rebuild_partner_tours(p_partner_id INTEGER)
+            RETURNS VOID AS $$
+            BEGIN
+                -- Partners being deleted lose their rows by cascade
+                IF NOT EXISTS (SELECT 1 FROM users WHERE id = p_partner_id) THEN
+                    RETURN;
+                END IF;
+                DELETE FROM partner_tours WHERE partner_id = p_partner_id;
+                INSERT INTO partner_tours (partner_id, tour_id, service_links)
+                SELECT p_partner_id, links.tour_id, COUNT(*)
+                FROM (
+                    SELECT ts.tour_id FROM tour_services ts
+                    JOIN partner_service_map m
+                      ON m.service_type = 'accommodation' AND m.service_id = ts.accommodation_id
+                    WHERE m.partner_id = p_partner_id
+                    UNION ALL
+                    SELECT ts.tour_id FROM tour_services ts
+                    JOIN partner_service_map m
+                      ON m.service_type = 'restaurant' AND m.service_id = ts.restaurant_id
+                    WHERE m.partner_id = p_partner_id
+                    UNION ALL
+                    SELECT ts.tour_id FROM tour_services ts
+                    JOIN partner_service_map m
+                      ON m.service_type = 'transportation' AND m.service_id = ts.transportation_id
+                    WHERE m.partner_id = p_partner_id
+                ) links
+                GROUP BY links.tour_id;
+
+                INSERT INTO partner_dashboard_summary AS s (partner_id, support_tours)
+                SELECT p_partner_id, COUNT(*) FROM partner_tours WHERE partner_id = p_partner_id
+                ON CONFLICT (partner_id) DO UPDATE SET support_tours = EXCLUDED.support_tours;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        # Service rows: keep the map and recount partners gaining/losing a service
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_service_map_trigger()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                kind VARCHAR(20) := TG_ARGV[0];
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    DELETE FROM partner_service_map WHERE service_type = kind AND service_id = OLD.id;
+                END IF;
+                IF TG_OP <> 'DELETE' AND NEW.partner_id IS NOT NULL THEN
+                    INSERT INTO partner_service_map (service_type, service_id, partner_id)
+                    VALUES (kind, NEW.id, NEW.partner_id)
+                    ON CONFLICT (service_type, service_id) DO UPDATE SET partner_id = EXCLUDED.partner_id;
+                END IF;
+                IF TG_OP <> 'INSERT' AND OLD.partner_id IS NOT NULL THEN
+                    PERFORM rebuild_partner_tours(OLD.partner_id);
+                END IF;
+                IF TG_OP = 'UPDATE' AND NEW.partner_id IS NOT NULL
+                   AND NEW.partner_id IS DISTINCT FROM OLD.partner_id THEN
+                    PERFORM rebuild_partner_tours(NEW.partner_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        for service_type, table in SERVICE_TABLES:
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_service_map ON {table};")
+            cur.execute(f"""
+                CREATE TRIGGER trg_{table}_service_map
+                AFTER INSERT OR DELETE OR UPDATE OF partner_id ON {table}
+                FOR EACH ROW EXECUTE FUNCTION partner_service_map_trigger('{service_type}');
+            """)
+
+        # Tour links: +1/-1 per (partner, tour); the first/last link moves support_tours
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION partner_tours_adjust(
+                p_partner_id INTEGER, p_tour_id INTEGER, p_delta INTEGER
+            ) RETURNS VOID AS $$
+            DECLARE
+                remaining INTEGER;
+            BEGIN
+                IF p_partner_id IS NULL OR p_tour_id IS NULL THEN
+                    RETURN;
+                END IF;
+                UPDATE partner_tours SET service_links = service_links + p_delta
+                WHERE partner_id = p_partner_id AND tour_id = p_tour_id
+                RETURNING service_links INTO remaining;
+
+                IF NOT FOUND THEN
+                    IF p_delta > 0 THEN
+                        INSERT INTO partner_tours (partner_id, tour_id, service_links)
+                        VALUES (p_partner_id, p_tour_id, p_delta);
+                        INSERT INTO partner_dashboard_summary AS s (partner_id, support_tours)
+                        VALUES (p_partner_id, 1)
+                        ON CONFLICT (partner_id) DO UPDATE SET support_tours = s.support_tours + 1;
+                    END IF;
+                ELSIF remaining <= 0 THEN
+                    DELETE FROM partner_tours WHERE partner_id = p_partner_id AND tour_id = p_tour_id;
+                    UPDATE partner_dashboard_summary SET support_tours = GREATEST(support_tours - 1, 0)
+                    WHERE partner_id = p_partner_id;
+                END IF;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION tour_services_partner_tours_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    PERFORM partner_tours_adjust(m.partner_id, OLD.tour_id, -1)
+                    FROM partner_service_map m
+                    WHERE (m.service_type = 'accommodation' AND m.service_id = OLD.accommodation_id)
+                       OR (m.service_type = 'restaurant' AND m.service_id = OLD.restaurant_id)
+                       OR (m.service_type = 'transportation' AND m.service_id = OLD.transportation_id);
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    PERFORM partner_tours_adjust(m.partner_id, NEW.tour_id, 1)
+                    FROM partner_service_map m
+                    WHERE (m.service_type = 'accommodation' AND m.service_id = NEW.accommodation_id)
+                       OR (m.service_type = 'restaurant' AND m.service_id = NEW.restaurant_id)
+                       OR (m.service_type = 'transportation' AND m.service_id = NEW.transportation_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_tour_services_partner_tours ON tour_services;")
+        cur.execute("""
+            CREATE TRIGGER trg_tour_services_partner_tours
+            AFTER INSERT OR DELETE OR UPDATE OF tour_id, accommodation_id, restaurant_id, transportation_id
+            ON tour_services
+            FOR EACH ROW EXECUTE FUNCTION tour_services_partner_tours_trigger();
+        """)
+
+        # Rebuild; block concurrent writers so no link is counted twice
+        cur.execute("""
+            LOCK TABLE tour_services, accommodation_services, restaurant_services,
+                       transportation_services IN SHARE MODE;
+        """)
+        cur.execute("DELETE FROM partner_service_map;")
+        for service_type, table in SERVICE_TABLES:
+            cur.execute(f"""
+                INSERT INTO partner_service_map (service_type, service_id, partner_id)
+                SELECT %s, id, partner_id FROM {table} WHERE partner_id IS NOT NULL;
+            """, (service_type,))
+        cur.execute("""
+            SELECT rebuild_partner_tours(id) FROM users WHERE role = 'partner';
+        """)
+        print(f"[INFO] Counted tours of {cur.rowcount} partners.")
+
+        conn.commit()
+        print("✅ partner_service_map is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating partner_service_map: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_partner_service_map()
@@ -0,0 +1,120 @@
+"""
+Add denormalized like_count / comment_count columns to posts for the social feed.
+
+The counters are maintained by triggers on likes and comments (a comment
+stops counting once it is soft deleted), so the feed no longer runs
+COUNT(*) subqueries per post.
+"""
+
+from config.database import get_connection
+
+def add_post_counter_columns():
+    """
+    Add posts.like_count and posts.comment_count, their maintenance triggers,
+    the indexes used by the keyset-paginated feed, and backfill the counters.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot add post counters: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking posts.like_count / comment_count columns...")
+
+        cur.execute("""
+            ALTER TABLE posts
+            ADD COLUMN IF NOT EXISTS like_count INTEGER NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS comment_count INTEGER NOT NULL DEFAULT 0;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION posts_like_count_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    UPDATE posts SET like_count = like_count + 1 WHERE id = NEW.post_id;
+                ELSIF TG_OP = 'DELETE' THEN
+                    UPDATE posts SET like_count = GREATEST(like_count - 1, 0) WHERE id = OLD.post_id;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION posts_comment_count_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+                    UPDATE posts SET comment_count = GREATEST(comment_count - 1, 0) WHERE id = OLD.post_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+                    UPDATE posts SET comment_count = comment_count + 1 WHERE id = NEW.post_id;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_posts_like_count ON likes;")
+        cur.execute("""
+            CREATE TRIGGER trg_posts_like_count
+            AFTER INSERT OR DELETE ON likes
+            FOR EACH ROW EXECUTE FUNCTION posts_like_count_trigger();
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_posts_comment_count ON comments;")
+        cur.execute("""
+            CREATE TRIGGER trg_posts_comment_count
+            AFTER INSERT OR DELETE OR UPDATE OF deleted_at, post_id ON comments
+            FOR EACH ROW EXECUTE FUNCTION posts_comment_count_trigger();
+        """)
+
+        # Feed pages walk visible posts newest first by (created_at, id)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_feed
+            ON posts(created_at DESC, id DESC)
+            WHERE deleted_at IS NULL
+              AND deleted_at_tour_reviews IS NULL
+              AND deleted_at_service_reviews IS NULL;
+        """)
+
+        # Latest-comments preview per post
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_comments_post_recent
+            ON comments(post_id, created_at DESC, id DESC)
+            WHERE deleted_at IS NULL;
+        """)
+
+        # Backfill (also repairs any drift from before the triggers existed)
+        cur.execute("""
+            UPDATE posts p
+            SET like_count = c.like_count,
+                comment_count = c.comment_count
+            FROM (
+                SELECT p2.id,
+                       (SELECT COUNT(*) FROM likes l WHERE l.post_id = p2.id) AS like_count,
+                       (SELECT COUNT(*) FROM comments c2
+                        WHERE c2.post_id = p2.id AND c2.deleted_at IS NULL) AS comment_count
+                FROM posts p2
+            ) c
+            WHERE p.id = c.id
+              AND (p.like_count <> c.like_count OR p.comment_count <> c.comment_count);
+        """)
+
+        conn.commit()
+        print("✅ posts counters are ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error adding post counters: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    add_post_counter_columns()
@@ -0,0 +1,142 @@
+"""
+Create the indexed search columns used by social post search.
+
+posts.search_vector is a weighted tsvector (hashtags 'A', content 'B') built
+with the accent-insensitive `vietnamese_unaccent` text search configuration,
+so "da nang" finds "Đà Nẵng". posts.search_text / posts.search_tags hold the
+lowercased, unaccented text for pg_trgm substring matching. All three are
+filled by a trigger whenever content or hashtags change.
+
+Requires the unaccent and pg_trgm extensions (shipped with PostgreSQL contrib).
+"""
+
+from config.database import get_connection
+
+def create_search_extensions(cur):
+    """
+    Create the unaccent/pg_trgm extensions, the immutable f_unaccent() wrapper
+    and the `vietnamese_unaccent` text search configuration (idempotent).
+    """
+    cur.execute("CREATE EXTENSION IF NOT EXISTS unaccent;")
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+    # unaccent() is only STABLE; index expressions and triggers need an immutable wrapper
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text)
+        RETURNS text AS $$
+            SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+    """)
+
+    cur.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'vietnamese_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION vietnamese_unaccent (COPY = simple);
+                ALTER TEXT SEARCH CONFIGURATION vietnamese_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word
+                    WITH unaccent, simple;
+            END IF;
+        END;
+        $$;
+    """)
+
+
+def create_post_search_index(batch_size=1000):
+    """
+    Create the posts search columns, trigger and indexes, and backfill
+    existing posts in batches.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create post search index: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking post search index...")
+
+        create_search_extensions(cur)
+
+        cur.execute("""
+            ALTER TABLE posts
+            ADD COLUMN IF NOT EXISTS search_vector tsvector,
+            ADD COLUMN IF NOT EXISTS search_text TEXT,
+            ADD COLUMN IF NOT EXISTS search_tags TEXT;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION posts_search_trigger()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                tag_text TEXT := COALESCE(array_to_string(NEW.hashtags, ' '), '');
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('vietnamese_unaccent', tag_text), 'A') ||
+                    setweight(to_tsvector('vietnamese_unaccent', COALESCE(NEW.content, '')), 'B');
+                NEW.search_text := lower(f_unaccent(COALESCE(NEW.content, '') || ' ' || tag_text));
+                NEW.search_tags := lower(f_unaccent(tag_text));
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_posts_search ON posts;")
+        cur.execute("""
+            CREATE TRIGGER trg_posts_search
+            BEFORE INSERT OR UPDATE OF content, hashtags ON posts
+            FOR EACH ROW EXECUTE FUNCTION posts_search_trigger();
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_search_vector
+            ON posts USING GIN (search_vector);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_search_text_trgm
+            ON posts USING GIN (search_text gin_trgm_ops);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posts_search_tags_trgm
+            ON posts USING GIN (search_tags gin_trgm_ops);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tags_name_trgm
+            ON tags USING GIN (lower(f_unaccent(name)) gin_trgm_ops);
+        """)
+        conn.commit()
+
+        # Backfill posts written before the trigger existed (touching content fires it)
+        total = 0
+        while True:
+            cur.execute("""
+                UPDATE posts SET content = content
+                WHERE id IN (
+                    SELECT id FROM posts
+                    WHERE search_vector IS NULL
+                    ORDER BY id
+                    LIMIT %s
+                )
+            """, (batch_size,))
+            updated = cur.rowcount
+            conn.commit()
+            total += updated
+            if updated < batch_size:
+                break
+
+        if total:
+            print(f"[INFO] Indexed {total} existing posts for search.")
+        print("✅ Post search index is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating post search index: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_post_search_index()
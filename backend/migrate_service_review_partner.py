@@ -0,0 +1,80 @@
+"""
+Add service_reviews.partner_id (the partner owning the reviewed service) and
+the index behind the partner review inbox.
+
+The partner is resolved once when a service review is written, so listing a
+partner's reviews is an index range scan instead of matching every review
+against the partner's accommodation/restaurant/transportation ids.
+"""
+
+from config.database import get_connection
+
+def add_service_review_partner_column():
+    """
+    Add service_reviews.partner_id with its (partner_id, tour_review_id)
+    index and backfill it through tour_services and partner_service_map.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot add service_reviews.partner_id: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking service_reviews.partner_id column...")
+
+        cur.execute("""
+            ALTER TABLE service_reviews
+            ADD COLUMN IF NOT EXISTS partner_id INTEGER REFERENCES users(id) ON DELETE SET NULL;
+        """)
+
+        # Inbox and partner detail: a partner's reviews by tour review, covering
+        # the rating and soft-delete filter
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_service_reviews_partner
+            ON service_reviews(partner_id, tour_review_id) INCLUDE (rating, deleted_at);
+        """)
+
+        # Reviews written through a tour are resolved via their tour service,
+        # older ones via the service they reference directly
+        cur.execute("""
+            UPDATE service_reviews sr
+            SET partner_id = m.partner_id
+            FROM tour_services ts, partner_service_map m
+            WHERE ts.id = sr.tour_service_id
+              AND m.service_type = ts.service_type
+              AND m.service_id = CASE ts.service_type
+                                     WHEN 'accommodation' THEN ts.accommodation_id
+                                     WHEN 'restaurant' THEN ts.restaurant_id
+                                     WHEN 'transportation' THEN ts.transportation_id
+                                 END
+              AND sr.partner_id IS NULL;
+        """)
+        backfilled = cur.rowcount
+        cur.execute("""
+            UPDATE service_reviews sr
+            SET partner_id = m.partner_id
+            FROM partner_service_map m
+            WHERE m.service_type = sr.service_type
+              AND m.service_id = sr.service_id
+              AND sr.partner_id IS NULL;
+        """)
+        backfilled += cur.rowcount
+        if backfilled:
+            print(f"[INFO] Set the partner of {backfilled} service reviews.")
+
+        conn.commit()
+        print("✅ service_reviews.partner_id is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error adding service_reviews.partner_id: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    add_service_review_partner_column()
@@ -0,0 +1,57 @@
+"""
+Create the slot_holds table used to reserve tour schedule slots during checkout.
+"""
+
+from config.database import get_connection
+
+def create_slot_holds_table():
+    """
+    Create slot_holds. A 'held' row has already been added to
+    tour_schedules.slots_booked; it is either confirmed by a booking or
+    released/expired, which gives the slots back.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create slot_holds: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking slot_holds table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS slot_holds (
+                id SERIAL PRIMARY KEY,
+                hold_token VARCHAR(64) NOT NULL UNIQUE,
+                tour_schedule_id INTEGER NOT NULL REFERENCES tour_schedules(id) ON DELETE CASCADE,
+                slots INTEGER NOT NULL CHECK (slots > 0),
+                status VARCHAR(20) NOT NULL DEFAULT 'held'
+                    CHECK (status IN ('held', 'confirmed', 'released', 'expired')),
+                expires_at TIMESTAMP NOT NULL,
+                booking_id INTEGER REFERENCES bookings(id) ON DELETE SET NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Expiry sweeps only look at live holds
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_slot_holds_expiry
+            ON slot_holds(expires_at)
+            WHERE status = 'held';
+        """)
+
+        conn.commit()
+        print("✅ slot_holds is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating slot_holds: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_slot_holds_table()
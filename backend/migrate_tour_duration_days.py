@@ -0,0 +1,61 @@
+"""
+Add a normalized integer duration column to tours_admin for SQL-side filtering.
+"""
+
+from config.database import get_connection
+
+def add_tour_duration_days_column():
+    """
+    Add tours_admin.duration_days (number of days as INTEGER), backfill it from
+    the legacy duration string and index the public listing access paths:
+    - keyset pagination on (created_at, id) for published tours
+    - range filtering on duration_days
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot add duration_days column: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking tours_admin.duration_days column...")
+
+        cur.execute("""
+            ALTER TABLE tours_admin
+            ADD COLUMN IF NOT EXISTS duration_days INTEGER;
+        """)
+
+        # Backfill rows written before the column existed (e.g. "3", "3 days 2 nights")
+        cur.execute("""
+            UPDATE tours_admin
+            SET duration_days = substring(duration from '[0-9]+')::INTEGER
+            WHERE duration_days IS NULL
+              AND duration ~ '[0-9]+';
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tours_admin_listing
+            ON tours_admin(created_at DESC, id DESC)
+            WHERE is_published = TRUE AND is_active = TRUE;
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tours_admin_duration_days
+            ON tours_admin(duration_days);
+        """)
+
+        conn.commit()
+        print("✅ tours_admin.duration_days is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error adding duration_days column: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    add_tour_duration_days_column()
@@ -0,0 +1,83 @@
+"""
+Keep tours_admin.duration_days / duration_nights derived from the duration text.
+
+duration is free text ("3", "3 days 2 nights", "3 ngày 2 đêm"). A trigger
+parses it once per write into the integer columns, so listings, filters,
+scheduling and pricing read integers instead of parsing strings per row.
+"""
+
+from config.database import get_connection
+
+def add_tour_duration_nights_column():
+    """
+    Add tours_admin.duration_nights, the trigger maintaining duration_days and
+    duration_nights on every insert/update of duration, and backfill them.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot add duration_nights column: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking tours_admin.duration_nights column...")
+
+        cur.execute("""
+            ALTER TABLE tours_admin
+            ADD COLUMN IF NOT EXISTS duration_days INTEGER,
+            ADD COLUMN IF NOT EXISTS duration_nights INTEGER;
+        """)
+
+        # Days: first number in the text. Nights: "<n> nights/đêm" if given,
+        # otherwise days - 1. An explicit duration_days is kept when the text
+        # has no number.
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION tours_admin_duration_trigger()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                days_text TEXT;
+                nights_text TEXT;
+            BEGIN
+                IF TG_OP = 'INSERT' OR NEW.duration IS DISTINCT FROM OLD.duration THEN
+                    days_text := substring(NEW.duration from '[0-9]+');
+                    IF days_text IS NOT NULL THEN
+                        NEW.duration_days := days_text::INTEGER;
+                    END IF;
+                END IF;
+                nights_text := substring(lower(NEW.duration) from '([0-9]+)\\s*(?:night|đêm)');
+                NEW.duration_nights := COALESCE(nights_text::INTEGER, GREATEST(NEW.duration_days - 1, 0));
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_tours_admin_duration ON tours_admin;")
+        cur.execute("""
+            CREATE TRIGGER trg_tours_admin_duration
+            BEFORE INSERT OR UPDATE OF duration, duration_days ON tours_admin
+            FOR EACH ROW EXECUTE FUNCTION tours_admin_duration_trigger();
+        """)
+
+        # Backfill (touching duration fires the trigger)
+        cur.execute("""
+            UPDATE tours_admin SET duration = duration
+            WHERE duration_nights IS NULL OR duration_days IS NULL;
+        """)
+        if cur.rowcount:
+            print(f"[INFO] Parsed durations of {cur.rowcount} tours.")
+
+        conn.commit()
+        print("✅ tours_admin.duration_nights is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error adding duration_nights column: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    add_tour_duration_nights_column()
@@ -0,0 +1,160 @@
+"""
+Create the tour_listing_summary table used by tour list endpoints.
+
+Each row holds per-tour values that list queries used to compute with
+correlated subqueries (primary image, image count, next departure,
+available schedule count, rating). Rows are refreshed by triggers on
+tours_admin, tour_images, tour_schedules and tour_reviews, so bookings
+(which update tour_schedules.slots_booked) keep the counts current too.
+"""
+
+from config.database import get_connection
+
+def create_tour_listing_summary():
+    """
+    Create tour_listing_summary, its refresh function and triggers, and
+    backfill rows for tours that do not have one yet.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create tour_listing_summary: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking tour_listing_summary table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS tour_listing_summary (
+                tour_id INTEGER PRIMARY KEY REFERENCES tours_admin(id) ON DELETE CASCADE,
+                primary_image TEXT,
+                image_count INTEGER NOT NULL DEFAULT 0,
+                next_departure TIMESTAMP,
+                available_schedules_count INTEGER NOT NULL DEFAULT 0,
+                avg_rating NUMERIC(3, 2) NOT NULL DEFAULT 0,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Lets the listing find rows whose next departure has passed cheaply
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tour_listing_summary_next_departure
+            ON tour_listing_summary(next_departure);
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION refresh_tour_listing_summary(p_tour_id INTEGER)
+            RETURNS VOID AS $$
+            BEGIN
+                IF p_tour_id IS NULL THEN
+                    RETURN;
+                END IF;
+
+                IF NOT EXISTS (SELECT 1 FROM tours_admin WHERE id = p_tour_id) THEN
+                    DELETE FROM tour_listing_summary WHERE tour_id = p_tour_id;
+                    RETURN;
+                END IF;
+
+                INSERT INTO tour_listing_summary (
+                    tour_id, primary_image, image_count,
+                    next_departure, available_schedules_count,
+                    avg_rating, review_count, updated_at
+                )
+                SELECT
+                    p_tour_id,
+                    (SELECT image_url FROM tour_images
+                     WHERE tour_id = p_tour_id AND is_primary = TRUE
+                     ORDER BY display_order, id
+                     LIMIT 1),
+                    (SELECT COUNT(*) FROM tour_images WHERE tour_id = p_tour_id),
+                    sched.next_departure,
+                    sched.available_count,
+                    rev.avg_rating,
+                    rev.review_count,
+                    CURRENT_TIMESTAMP
+                FROM (
+                    SELECT MIN(departure_datetime) AS next_departure, COUNT(*) AS available_count
+                    FROM tour_schedules
+                    WHERE tour_id = p_tour_id
+                      AND is_active = TRUE
+                      AND departure_datetime > NOW()
+                      AND slots_available > 0
+                      AND status NOT IN ('completed', 'cancelled')
+                ) sched,
+                (
+                    SELECT COALESCE(ROUND(AVG(rating), 2), 0) AS avg_rating, COUNT(*) AS review_count
+                    FROM tour_reviews
+                    WHERE tour_id = p_tour_id AND deleted_at IS NULL
+                ) rev
+                ON CONFLICT (tour_id) DO UPDATE SET
+                    primary_image = EXCLUDED.primary_image,
+                    image_count = EXCLUDED.image_count,
+                    next_departure = EXCLUDED.next_departure,
+                    available_schedules_count = EXCLUDED.available_schedules_count,
+                    avg_rating = EXCLUDED.avg_rating,
+                    review_count = EXCLUDED.review_count,
+                    updated_at = EXCLUDED.updated_at;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION trigger_refresh_tour_listing_summary()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_TABLE_NAME = 'tours_admin' THEN
+                    PERFORM refresh_tour_listing_summary(NEW.id);
+                    RETURN NEW;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM refresh_tour_listing_summary(NEW.tour_id);
+                END IF;
+                IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.tour_id IS DISTINCT FROM NEW.tour_id) THEN
+                    PERFORM refresh_tour_listing_summary(OLD.tour_id);
+                END IF;
+                RETURN COALESCE(NEW, OLD);
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("""
+            DROP TRIGGER IF EXISTS trigger_tour_listing_summary_tours ON tours_admin;
+            CREATE TRIGGER trigger_tour_listing_summary_tours
+            AFTER INSERT ON tours_admin
+            FOR EACH ROW
+            EXECUTE FUNCTION trigger_refresh_tour_listing_summary();
+        """)
+
+        for table in ('tour_images', 'tour_schedules', 'tour_reviews'):
+            cur.execute(f"""
+                DROP TRIGGER IF EXISTS trigger_tour_listing_summary ON {table};
+                CREATE TRIGGER trigger_tour_listing_summary
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH ROW
+                EXECUTE FUNCTION trigger_refresh_tour_listing_summary();
+            """)
+
+        # Backfill tours created before the table existed
+        cur.execute("""
+            SELECT refresh_tour_listing_summary(t.id)
+            FROM tours_admin t
+            WHERE NOT EXISTS (SELECT 1 FROM tour_listing_summary s WHERE s.tour_id = t.id);
+        """)
+
+        conn.commit()
+        print("✅ tour_listing_summary is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating tour_listing_summary: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_tour_listing_summary()
@@ -0,0 +1,223 @@
+"""
+Create tour_rating_stats, the per-tour rating aggregates of live (not
+soft-deleted) tour reviews: review count, rating sum, 1-5 star histogram and
+the date of the latest review.
+
+A trigger on tour_reviews applies each review insert, rating change,
+soft delete/restore and delete as a delta in the same transaction, and
+copies the average and count into tour_listing_summary, so list, detail and
+highlight responses read ratings without aggregating tour_reviews.
+"""
+
+from config.database import get_connection
+
+def create_tour_rating_stats():
+    """
+    Create tour_rating_stats and its trigger, make tour_listing_summary read
+    its rating columns from it, and rebuild both from tour_reviews.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create tour_rating_stats: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking tour_rating_stats table...")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS tour_rating_stats (
+                tour_id INTEGER PRIMARY KEY REFERENCES tours_admin(id) ON DELETE CASCADE,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                rating_sum INTEGER NOT NULL DEFAULT 0,
+                rating_1 INTEGER NOT NULL DEFAULT 0,
+                rating_2 INTEGER NOT NULL DEFAULT 0,
+                rating_3 INTEGER NOT NULL DEFAULT 0,
+                rating_4 INTEGER NOT NULL DEFAULT 0,
+                rating_5 INTEGER NOT NULL DEFAULT 0,
+                last_review_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Add (p_sign = 1) or remove (p_sign = -1) one live review
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION apply_tour_rating(
+                p_tour_id INTEGER, p_rating INTEGER, p_created_at TIMESTAMP, p_sign INTEGER
+            ) RETURNS VOID AS $$
+            BEGIN
+                IF p_tour_id IS NULL THEN
+                    RETURN;
+                END IF;
+
+                IF p_sign > 0 THEN
+                    INSERT INTO tour_rating_stats AS s (
+                        tour_id, review_count, rating_sum,
+                        rating_1, rating_2, rating_3, rating_4, rating_5, last_review_at
+                    ) VALUES (
+                        p_tour_id, 1, COALESCE(p_rating, 0),
+                        (p_rating = 1)::INTEGER, (p_rating = 2)::INTEGER, (p_rating = 3)::INTEGER,
+                        (p_rating = 4)::INTEGER, (p_rating = 5)::INTEGER, p_created_at
+                    )
+                    ON CONFLICT (tour_id) DO UPDATE SET
+                        review_count = s.review_count + 1,
+                        rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+                        rating_1 = s.rating_1 + EXCLUDED.rating_1,
+                        rating_2 = s.rating_2 + EXCLUDED.rating_2,
+                        rating_3 = s.rating_3 + EXCLUDED.rating_3,
+                        rating_4 = s.rating_4 + EXCLUDED.rating_4,
+                        rating_5 = s.rating_5 + EXCLUDED.rating_5,
+                        last_review_at = GREATEST(s.last_review_at, EXCLUDED.last_review_at),
+                        updated_at = CURRENT_TIMESTAMP;
+                ELSE
+                    -- UPDATE only: the tour may be being deleted
+                    UPDATE tour_rating_stats SET
+                        review_count = GREATEST(review_count - 1, 0),
+                        rating_sum = rating_sum - COALESCE(p_rating, 0),
+                        rating_1 = rating_1 - (p_rating = 1)::INTEGER,
+                        rating_2 = rating_2 - (p_rating = 2)::INTEGER,
+                        rating_3 = rating_3 - (p_rating = 3)::INTEGER,
+                        rating_4 = rating_4 - (p_rating = 4)::INTEGER,
+                        rating_5 = rating_5 - (p_rating = 5)::INTEGER,
+                        last_review_at = CASE
+                            WHEN p_created_at IS NOT NULL AND p_created_at < last_review_at THEN last_review_at
+                            ELSE (SELECT MAX(created_at) FROM tour_reviews
+                                  WHERE tour_id = p_tour_id AND deleted_at IS NULL)
+                        END,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE tour_id = p_tour_id;
+                END IF;
+
+                UPDATE tour_listing_summary tls SET
+                    avg_rating = COALESCE(ROUND(s.rating_sum::NUMERIC / NULLIF(s.review_count, 0), 2), 0),
+                    review_count = s.review_count,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM tour_rating_stats s
+                WHERE s.tour_id = p_tour_id AND tls.tour_id = p_tour_id;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION tour_rating_stats_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+                    PERFORM apply_tour_rating(OLD.tour_id, OLD.rating, OLD.created_at, -1);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+                    PERFORM apply_tour_rating(NEW.tour_id, NEW.rating, NEW.created_at, 1);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_tour_rating_stats ON tour_reviews;")
+        cur.execute("""
+            CREATE TRIGGER trg_tour_rating_stats
+            AFTER INSERT OR DELETE OR UPDATE OF tour_id, rating, deleted_at, created_at
+            ON tour_reviews
+            FOR EACH ROW EXECUTE FUNCTION tour_rating_stats_trigger();
+        """)
+
+        # tour_listing_summary no longer re-aggregates tour_reviews: its rating
+        # columns are copied from tour_rating_stats by the trigger above
+        cur.execute("DROP TRIGGER IF EXISTS trigger_tour_listing_summary ON tour_reviews;")
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION refresh_tour_listing_summary(p_tour_id INTEGER)
+            RETURNS VOID AS $$
+            BEGIN
+                IF p_tour_id IS NULL THEN
+                    RETURN;
+                END IF;
+
+                IF NOT EXISTS (SELECT 1 FROM tours_admin WHERE id = p_tour_id) THEN
+                    DELETE FROM tour_listing_summary WHERE tour_id = p_tour_id;
+                    RETURN;
+                END IF;
+
+                INSERT INTO tour_listing_summary (
+                    tour_id, primary_image, image_count,
+                    next_departure, available_schedules_count,
+                    avg_rating, review_count, updated_at
+                )
+                SELECT
+                    p_tour_id,
+                    (SELECT image_url FROM tour_images
+                     WHERE tour_id = p_tour_id AND is_primary = TRUE
+                     ORDER BY display_order, id
+                     LIMIT 1),
+                    (SELECT COUNT(*) FROM tour_images WHERE tour_id = p_tour_id),
+                    sched.next_departure,
+                    sched.available_count,
+                    COALESCE(ROUND(rev.rating_sum::NUMERIC / NULLIF(rev.review_count, 0), 2), 0),
+                    COALESCE(rev.review_count, 0),
+                    CURRENT_TIMESTAMP
+                FROM (
+                    SELECT MIN(departure_datetime) AS next_departure, COUNT(*) AS available_count
+                    FROM tour_schedules
+                    WHERE tour_id = p_tour_id
+                      AND is_active = TRUE
+                      AND departure_datetime > NOW()
+                      AND slots_available > 0
+                      AND status NOT IN ('completed', 'cancelled')
+                ) sched
+                LEFT JOIN tour_rating_stats rev ON rev.tour_id = p_tour_id
+                ON CONFLICT (tour_id) DO UPDATE SET
+                    primary_image = EXCLUDED.primary_image,
+                    image_count = EXCLUDED.image_count,
+                    next_departure = EXCLUDED.next_departure,
+                    available_schedules_count = EXCLUDED.available_schedules_count,
+                    avg_rating = EXCLUDED.avg_rating,
+                    review_count = EXCLUDED.review_count,
+                    updated_at = EXCLUDED.updated_at;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        # Rebuild; block concurrent review writes so no delta is counted twice
+        cur.execute("LOCK TABLE tour_reviews IN SHARE MODE;")
+        cur.execute("DELETE FROM tour_rating_stats;")
+        cur.execute("""
+            INSERT INTO tour_rating_stats (
+                tour_id, review_count, rating_sum,
+                rating_1, rating_2, rating_3, rating_4, rating_5, last_review_at
+            )
+            SELECT
+                tr.tour_id, COUNT(*), COALESCE(SUM(tr.rating), 0),
+                COUNT(*) FILTER (WHERE tr.rating = 1),
+                COUNT(*) FILTER (WHERE tr.rating = 2),
+                COUNT(*) FILTER (WHERE tr.rating = 3),
+                COUNT(*) FILTER (WHERE tr.rating = 4),
+                COUNT(*) FILTER (WHERE tr.rating = 5),
+                MAX(tr.created_at)
+            FROM tour_reviews tr
+            JOIN tours_admin t ON t.id = tr.tour_id
+            WHERE tr.deleted_at IS NULL
+            GROUP BY tr.tour_id;
+        """)
+        print(f"[INFO] Rating stats for {cur.rowcount} tours.")
+        cur.execute("""
+            UPDATE tour_listing_summary tls SET
+                avg_rating = COALESCE(ROUND(s.rating_sum::NUMERIC / NULLIF(s.review_count, 0), 2), 0),
+                review_count = COALESCE(s.review_count, 0)
+            FROM tours_admin t
+            LEFT JOIN tour_rating_stats s ON s.tour_id = t.id
+            WHERE tls.tour_id = t.id;
+        """)
+
+        conn.commit()
+        print("✅ tour_rating_stats is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating tour_rating_stats: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_tour_rating_stats()
@@ -0,0 +1,112 @@
+"""
+Create the indexed search columns used by tour search.
+
+tours_admin.search_vector weights the tour name 'A', the destination and
+departure city names 'B' and the description 'C', using the accent-insensitive
+`vietnamese_unaccent` configuration, so "Ha Noi" matches "Hà Nội".
+tours_admin.search_text (unaccented, lowercased name + city names) has a
+trigram index for substring and typo-tolerant matching.
+"""
+
+from config.database import get_connection
+from migrate_post_search import create_search_extensions
+
+def create_tour_search_index():
+    """
+    Create the tours_admin search columns, the triggers keeping them current
+    (including when a city is renamed), their indexes, and backfill.
+    """
+    conn = get_connection()
+    if conn is None:
+        print("❌ Cannot create tour search index: Database connection failed.")
+        return False
+
+    cur = conn.cursor()
+    try:
+        print("[INFO] Checking tour search index...")
+
+        create_search_extensions(cur)
+
+        cur.execute("""
+            ALTER TABLE tours_admin
+            ADD COLUMN IF NOT EXISTS search_vector tsvector,
+            ADD COLUMN IF NOT EXISTS search_text TEXT;
+        """)
+
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION tours_admin_search_trigger()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                city_text TEXT;
+            BEGIN
+                SELECT COALESCE(string_agg(name, ' '), '') INTO city_text
+                FROM cities
+                WHERE id IN (NEW.destination_city_id, NEW.departure_city_id);
+
+                NEW.search_vector :=
+                    setweight(to_tsvector('vietnamese_unaccent', COALESCE(NEW.name, '')), 'A') ||
+                    setweight(to_tsvector('vietnamese_unaccent', city_text), 'B') ||
+                    setweight(to_tsvector('vietnamese_unaccent', COALESCE(NEW.description, '')), 'C');
+                NEW.search_text := lower(f_unaccent(COALESCE(NEW.name, '') || ' ' || city_text));
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+
+        cur.execute("DROP TRIGGER IF EXISTS trg_tours_admin_search ON tours_admin;")
+        cur.execute("""
+            CREATE TRIGGER trg_tours_admin_search
+            BEFORE INSERT OR UPDATE OF name, description, destination_city_id, departure_city_id
+            ON tours_admin
+            FOR EACH ROW EXECUTE FUNCTION tours_admin_search_trigger();
+        """)
+
+        # Re-index tours of a renamed city
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION cities_tour_search_trigger()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                UPDATE tours_admin SET name = name
+                WHERE destination_city_id = NEW.id OR departure_city_id = NEW.id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_cities_tour_search ON cities;")
+        cur.execute("""
+            CREATE TRIGGER trg_cities_tour_search
+            AFTER UPDATE OF name ON cities
+            FOR EACH ROW
+            WHEN (OLD.name IS DISTINCT FROM NEW.name)
+            EXECUTE FUNCTION cities_tour_search_trigger();
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tours_admin_search_vector
+            ON tours_admin USING GIN (search_vector);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tours_admin_search_text_trgm
+            ON tours_admin USING GIN (search_text gin_trgm_ops);
+        """)
+
+        # Backfill tours written before the trigger existed (touching name fires it)
+        cur.execute("UPDATE tours_admin SET name = name WHERE search_vector IS NULL;")
+        if cur.rowcount:
+            print(f"[INFO] Indexed {cur.rowcount} existing tours for search.")
+
+        conn.commit()
+        print("✅ Tour search index is ready.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error creating tour search index: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    create_tour_search_index()
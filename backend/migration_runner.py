@@ -0,0 +1,206 @@
+"""
+Versioned schema migrations.
+
+Every schema/migration function the app used to call on each boot is a
+numbered step below. Applied steps are recorded in the schema_migrations
+ledger, so a normal start only reads the ledger and skips straight to
+serving. When steps are pending they run in order on a single connection
+while holding a Postgres advisory lock, so several workers booting at once
+never race each other's DDL: the first applies the steps, the others wait and
+then find nothing left to do.
+
+The step functions open their connections with get_connection(); inside the
+runner that returns the runner's connection (config.database.pinned_connection).
+A step fails if it raises or returns False; it is then left unrecorded and
+the run stops there, since later steps may depend on it. The next run retries
+it and continues.
+
+Usage:
+    python migration_runner.py            apply pending steps
+    python migration_runner.py --status   list applied and pending steps
+
+Set RUN_MIGRATIONS_ON_STARTUP=false to skip the check in app.py (e.g. when
+deployments run this script before starting workers).
+"""
+
+import importlib
+import os
+import sys
+import time
+
+import psycopg2.extensions
+
+from config.database import get_pool, pinned_connection
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 72_410_016
+
+# (version, description, ["module:function", ...]) in application order.
+# Append new steps at the end; never renumber or reorder applied ones.
+MIGRATIONS = [
+    ("0001", "Base tables (cities, users)", ["src.models.models:ensure_base_tables"]),
+    ("0002", "Partner service tables", ["src.models.partner_services_schema:create_partner_service_tables"]),
+    ("0003", "Tour management tables", ["src.models.tour_schema:create_tour_tables"]),
+    ("0004", "Core tables (social, bookings, promotions, default admin)", ["src.models.models:create_tables"]),
+    ("0005", "Vietnam cities", ["src.services.city_init:init_cities"]),
+    ("0006", "Tour reviews table", ["src.models.tour_reviews_schema:create_tour_reviews_table"]),
+    ("0007", "Service reviews table", ["migrate_service_reviews:migrate_service_reviews_table"]),
+    ("0008", "Review soft delete columns", ["src.routes.add_soft_delete_to_reviews:add_soft_delete_columns"]),
+    ("0009", "tour_highlights table", ["create_tour_highlights:create_tour_highlights_table"]),
+    ("0010", "social_hashtag table and posts.hashtags", [
+        "migrate_social_hashtag:create_social_hashtag_table",
+        "migrate_social_hashtag:update_posts_table",
+    ]),
+    ("0011", "Posts review link columns", ["migrate_posts_table:add_posts_table_columns"]),
+    ("0012", "Posts/comments soft delete columns", ["migrate_social_soft_delete:add_social_soft_delete_columns"]),
+    ("0013", "tours_admin.duration_days", ["migrate_tour_duration_days:add_tour_duration_days_column"]),
+    ("0014", "tour_listing_summary", ["migrate_tour_listing_summary:create_tour_listing_summary"]),
+    ("0015", "email_outbox", ["migrate_email_outbox:create_email_outbox_table"]),
+    ("0016", "slot_holds", ["migrate_slot_holds:create_slot_holds_table"]),
+    ("0017", "posts like/comment counters", ["migrate_post_counters:add_post_counter_columns"]),
+    ("0018", "Post search index", ["migrate_post_search:create_post_search_index"]),
+    ("0019", "Tour search index", ["migrate_tour_search:create_tour_search_index"]),
+    ("0020", "tour_highlights booking counters", ["create_tour_highlights:create_tour_highlights_table"]),
+    ("0021", "tours_admin.duration_nights and duration trigger", ["migrate_tour_duration_nights:add_tour_duration_nights_column"]),
+    ("0022", "booking_items", ["migrate_booking_items:create_booking_items_table"]),
+    ("0023", "Partner dashboard rollups", ["migrate_partner_rollups:create_partner_rollups"]),
+    ("0024", "partner_service_map and partner tour counts", ["migrate_partner_service_map:create_partner_service_map"]),
+    ("0025", "service_reviews.partner_id", ["migrate_service_review_partner:add_service_review_partner_column"]),
+    ("0026", "tour_rating_stats", ["migrate_tour_rating_stats:create_tour_rating_stats"]),
+    ("0027", "Partner rollups skip cancelled bookings", ["migrate_partner_rollups:create_partner_rollups"]),
+]
+
+
+class MigrationError(Exception):
+    """Raised by a step that could not be applied."""
+
+
+def _ensure_ledger(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INTEGER
+        );
+    """)
+
+
+def _applied_versions(cur):
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def _pending(applied):
+    return [step for step in MIGRATIONS if step[0] not in applied]
+
+
+def _run_step(conn, functions):
+    for path in functions:
+        module_name, function_name = path.split(':')
+        function = getattr(importlib.import_module(module_name), function_name)
+        if function() is False:
+            raise MigrationError(f"{path} reported failure")
+        if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            raise MigrationError(f"{path} left the transaction aborted")
+        # Steps commit their own work; close anything they left open
+        conn.commit()
+
+
+def run_migrations():
+    """
+    Apply pending steps in order, stopping at the first failure.
+    Returns (applied, failed) version lists; failed holds at most that step.
+    Raises if the database is unreachable.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        cur = conn.cursor()
+
+        # Fast path: nothing pending means no lock and no DDL at all
+        try:
+            if not _pending(_applied_versions(cur)):
+                conn.rollback()
+                return [], []
+        except psycopg2.Error:
+            conn.rollback()  # ledger does not exist yet
+
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            _ensure_ledger(cur)
+            conn.commit()
+            # Another worker may have applied steps while we waited for the lock
+            pending = _pending(_applied_versions(cur))
+            conn.commit()
+
+            applied, failed = [], []
+            with pinned_connection(conn):
+                for version, description, functions in pending:
+                    print(f"[INFO] Migration {version}: {description}...")
+                    started = time.monotonic()
+                    try:
+                        _run_step(conn, functions)
+                    except Exception as e:
+                        conn.rollback()
+                        failed.append(version)
+                        print(f"[WARNING] Migration {version} failed: {e}")
+                        break
+                    cur.execute("""
+                        INSERT INTO schema_migrations (version, description, duration_ms)
+                        VALUES (%s, %s, %s)
+                        ON CONFLICT (version) DO NOTHING
+                    """, (version, description, int((time.monotonic() - started) * 1000)))
+                    conn.commit()
+                    applied.append(version)
+            return applied, failed
+        finally:
+            conn.rollback()
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+    finally:
+        pool.putconn(conn)
+
+
+def migration_status():
+    """[(version, description, applied_at or None)] for every known step."""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT version, applied_at FROM schema_migrations")
+            applied = dict(cur.fetchall())
+        except psycopg2.Error:
+            applied = {}
+        return [(version, description, applied.get(version)) for version, description, _ in MIGRATIONS]
+    finally:
+        pool.putconn(conn)
+
+
+def run_startup_migrations():
+    """Called by app.py: apply pending steps unless RUN_MIGRATIONS_ON_STARTUP is false."""
+    if os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() in ("0", "false", "no"):
+        return
+    try:
+        applied, failed = run_migrations()
+    except Exception as e:
+        print(f"[WARNING] Could not run database migrations: {e}")
+        return
+    if applied:
+        print(f"[OK] Applied {len(applied)} database migration(s).")
+    if failed:
+        print(f"[WARNING] Pending migrations failed and will be retried: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        for version, description, applied_at in migration_status():
+            state = applied_at.isoformat(sep=' ', timespec='seconds') if applied_at else "pending"
+            print(f"{version}  {state:<19}  {description}")
+    else:
+        applied, failed = run_migrations()
+        print(f"✅ Applied {len(applied)} migration(s).")
+        if failed:
+            print(f"❌ Failed: {', '.join(failed)}")
+            sys.exit(1)
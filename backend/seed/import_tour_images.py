@@ -3,9 +3,9 @@ Script to import tour images from a folder into the database.
 
 This script:
 1. Scans the 'tour_images' folder for image files
-2. Converts images to Base64 data URIs
-3. Matches images to tours by filename (tour ID or tour name)
-4. Inserts images into the tour_images table
+2. Matches images to tours by filename (tour ID or tour name)
+3. Copies images into the content-addressed blob store
+4. Inserts the blob URLs into the tour_images table
 
 Image Naming Convention:
 - Option 1: tour_{tour_id}_{image_number}.jpg (e.g., tour_1_1.jpg, tour_1_2.jpg)
@@ -18,7 +18,6 @@ Usage:
 
 import os
 import sys
-import base64
 import re
 from pathlib import Path
 
@@ -28,6 +27,7 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 from config.database import get_connection
+from src.services.blob_store import blob_url, store_file
 
 # Supported image formats
 SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
@@ -45,14 +45,10 @@ def get_image_mime_type(file_path):
     }
     return mime_types.get(ext, 'image/jpeg')
 
-def image_to_base64_data_uri(image_path):
-    """Convert an image file to a Base64 data URI."""
+def store_image_blob(image_path):
+    """Copy an image file into the blob store and return its URL."""
     try:
-        with open(image_path, 'rb') as image_file:
-            image_data = image_file.read()
-            base64_data = base64.b64encode(image_data).decode('utf-8')
-            mime_type = get_image_mime_type(image_path)
-            return f"data:{mime_type};base64,{base64_data}"
+        return blob_url(store_file(image_path, get_image_mime_type(image_path)))
     except Exception as e:
         print(f"❌ Error reading image {image_path}: {e}")
         return None
@@ -186,9 +182,9 @@ def import_tour_images(folder_path='tour_images', clear_existing=False):
             
             tour_name = tours[tour_id]
             
-            # Convert image to Base64 data URI
-            data_uri = image_to_base64_data_uri(image_path)
-            if not data_uri:
+            # Store image file in the blob store
+            image_url = store_image_blob(image_path)
+            if not image_url:
                 errors.append(f"{filename}: Failed to read image")
                 skipped_count += 1
                 continue
@@ -219,7 +215,7 @@ def import_tour_images(folder_path='tour_images', clear_existing=False):
                     VALUES (%s, %s, %s, %s, %s)
                 """, (
                     tour_id,
-                    data_uri,
+                    image_url,
                     None,  # No caption by default
                     image_num - 1,  # display_order (0-indexed)
                     is_primary
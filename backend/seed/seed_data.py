@@ -25,17 +25,8 @@ sys.path.insert(0, backend_dir)
 
 from config.database import get_connection
 from seed.import_tour_images import import_tour_images
-from src.models.models import ensure_base_tables, create_tables
-from src.models.partner_services_schema import create_partner_service_tables
-from src.models.tour_schema import create_tour_tables
-from src.models.tour_reviews_schema import create_tour_reviews_table
-from src.services.city_init import init_cities
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from migrate_social_hashtag import create_social_hashtag_table, update_posts_table
-from migrate_posts_table import add_posts_table_columns
-from migrate_social_soft_delete import add_social_soft_delete_columns
+from migration_runner import run_migrations
+from src.services.pricing import PriceCatalog, TourComponents, load_tour_components, quote_tour
 
 bcrypt = Bcrypt()
 
@@ -2485,62 +2476,11 @@ def _validate_tour_services(cur, destination_city_id, departure_city_id, num_day
     return (accommodation_id, restaurant_ids, transportation_id)
 
 def _calculate_tour_price(cur, tour_id, num_days, number_of_members):
-    """Calculate tour price based on actual services"""
-    accommodation_cost = 0
-    restaurant_cost = 0
-    transportation_cost = 0
-    
-    # Calculate number of nights (days - 1, minimum 1)
-    num_nights = max(1, num_days - 1)
-    
-    # Get accommodation cost from room bookings
-    cur.execute("""
-        SELECT ar.base_price, ar.bed_type, trb.quantity
-        FROM tour_room_bookings trb
-        JOIN accommodation_rooms ar ON trb.room_id = ar.id
-        WHERE trb.tour_id = %s
-    """, (tour_id,))
-    room_bookings = cur.fetchall()
-    
-    for base_price, bed_type, quantity in room_bookings:
-        if base_price:
-            # Cost = base_price × quantity × num_nights
-            accommodation_cost += float(base_price) * quantity * num_nights
-    
-    # Get restaurant cost from selected set meals
-    cur.execute("""
-        SELECT rsm.total_price
-        FROM tour_selected_set_meals tssm
-        JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-        WHERE tssm.tour_id = %s
-    """, (tour_id,))
-    set_meal_prices = cur.fetchall()
-    
-    # Each set meal is for 2 people, multiply by number of meals needed
-    meals_needed = (number_of_members + 1) // 2  # Ceiling division
-    for price_tuple in set_meal_prices:
-        if price_tuple[0]:
-            restaurant_cost += float(price_tuple[0]) * meals_needed
-    
-    # Get transportation cost
-    cur.execute("""
-        SELECT ts.base_price
-        FROM tour_services tsv
-        JOIN transportation_services ts ON tsv.transportation_id = ts.id
-        WHERE tsv.tour_id = %s AND tsv.service_type = 'transportation'
-    """, (tour_id,))
-    trans_result = cur.fetchone()
-    
-    if trans_result and trans_result[0]:
-        # Transportation cost per person, multiply by members, round trip
-        price_per_person = float(trans_result[0])
-        transportation_cost = price_per_person * number_of_members * 2
-    
-    # Calculate total and round to nearest 10,000
-    total_price = accommodation_cost + restaurant_cost + transportation_cost
-    total_price = round(total_price / 10000) * 10000
-    
-    return max(total_price, 100000)  # Minimum 100,000 VND
+    """Calculate tour price based on actual services (same rules as the admin sync)"""
+    components = load_tour_components(cur, [tour_id]).get(tour_id) or TourComponents(tour_id, num_days - 1)
+    catalog = PriceCatalog.for_tours(cur, [components])
+    _, breakdown = quote_tour(components, catalog, number_of_members)
+    return breakdown['total_price']
 
 def _create_tour_itinerary_and_services(cur, tour_id, num_days, destination_city_id, departure_city_id, number_of_members):
     """Create daily itinerary, time checkpoints, and link services for a tour"""
@@ -3227,11 +3167,11 @@ def create_tours(user_ids):
             try:
                 cur.execute("""
                     INSERT INTO tours_admin
-                    (name, duration, description, departure_city_id, destination_city_id, 
+                    (name, duration, duration_days, description, departure_city_id, destination_city_id, 
                      number_of_members, total_price, is_active, is_published, created_by)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE, TRUE, %s)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, TRUE, TRUE, %s)
                     RETURNING id
-                """, (tour['name'], tour['duration'], tour['description'], dep_city_id, dest_city_id,
+                """, (tour['name'], tour['duration'], num_days, tour['description'], dep_city_id, dest_city_id,
                       tour['number_of_members'], tour['total_price'], admin_id))
                 
                 tour_id = cur.fetchone()[0]
@@ -3575,7 +3515,7 @@ def create_tour_schedules():
     
     try:
         # Get all tours
-        cur.execute("SELECT id, number_of_members, duration FROM tours_admin WHERE is_active = TRUE")
+        cur.execute("SELECT id, number_of_members, COALESCE(duration_days, 1) FROM tours_admin WHERE is_active = TRUE")
         tours = cur.fetchall()
         
         if not tours:
@@ -3584,13 +3524,7 @@ def create_tour_schedules():
         
         schedules_created = 0
         
-        for tour_id, max_slots, duration in tours:
-            # Parse duration
-            try:
-                duration_int = int(duration) if isinstance(duration, str) else duration
-            except:
-                duration_int = int(''.join(filter(str.isdigit, str(duration))))
-            
+        for tour_id, max_slots, duration_int in tours:
             # Create 3 schedules for each tour (weekly departures)
             for week in range(3):
                 departure = datetime.now() + timedelta(days=7 * week + 3)  # Start 3 days from now
@@ -3741,47 +3675,13 @@ def create_sample_bookings(user_ids):
         conn.close()
 
 def ensure_tables_for_seed():
-    """Create all required tables so seed_data can run standalone."""
+    """Apply pending schema migrations so seed_data can run standalone."""
     print("📦 Creating database tables (standalone seed)...")
     try:
-        # Base tables first (cities, users)
-        ensure_base_tables()
-            
-        # Partner services tables (needed by tours)
-        create_partner_service_tables()
-            
-        # Tour tables (depend on cities/users and partner services)
-        create_tour_tables()
-            
-        # Remaining core tables (bookings, favorites, social, etc.)
-        create_tables()
-            
-        # Tour reviews table (depends on bookings)
-        create_tour_reviews_table()
-            
-        # Initialize cities data if missing
-        init_cities()
-        
-        # Create social_hashtag table and update posts table
-        try:
-            create_social_hashtag_table()
-            update_posts_table()
-        except Exception as e:
-            print(f"⚠️  Warning: Could not create social_hashtag table: {e}")
-        
-        # Add new columns to posts table
-        try:
-            add_posts_table_columns()
-        except Exception as e:
-            print(f"⚠️  Warning: Could not add posts table columns: {e}")
-        
-        # Add soft delete columns to posts and comments
-        try:
-            add_social_soft_delete_columns()
-        except Exception as e:
-            print(f"⚠️  Warning: Could not add soft delete columns: {e}")
-
-        print("✅ All tables created/verified for seed run.")
+        applied, failed = run_migrations()
+        if failed:
+            raise RuntimeError(f"Migrations failed: {', '.join(failed)}")
+        print(f"✅ All tables created/verified for seed run ({len(applied)} migrations applied).")
     except Exception as e:
         print(f"❌ Error ensuring tables for seed: {e}")
         import traceback
@@ -7,7 +7,7 @@ def ensure_base_tables():
     conn = get_connection()
     if conn is None:
         print("❌ Cannot create base tables: Database connection failed.")
-        return
+        return False
 
     cur = conn.cursor()
     try:
@@ -39,9 +39,11 @@ def ensure_base_tables():
 
         conn.commit()
         print("✅ Base tables created/verified.")
+        return True
     except Exception as e:
         conn.rollback()
         print(f"❌ Error creating base tables: {e}")
+        return False
     finally:
         cur.close()
         conn.close()
@@ -158,7 +160,7 @@ def create_tables():
     conn = get_connection()
     if conn is None:
         print("❌ Cannot create tables: Database connection failed.")
-        return
+        return False
 
     cur = conn.cursor()
 
@@ -426,13 +428,13 @@ def create_tables():
     print("✅ Tables checked/created successfully.")
     
     # Create default admin user if none exists
-    _create_default_admin()
+    return _create_default_admin()
 
 
 def _create_default_admin():
     """
     Ensure at least one admin user exists in the system.
-    Creates a default admin if none exists.
+    Creates a default admin if none exists. Returns False on failure.
     """
     import os
     from flask import current_app
@@ -440,7 +442,7 @@ def _create_default_admin():
     conn = get_connection()
     if not conn:
         print("❌ Cannot check for admin user: Database connection failed.")
-        return
+        return False
     
     cur = conn.cursor()
     
@@ -476,10 +478,12 @@ def _create_default_admin():
             print(f"⚠️  Please change the default admin password immediately!")
         else:
             print(f"✅ Admin user(s) already exist ({admin_count} admin(s) found)")
+        return True
     
     except Exception as e:
         conn.rollback()
         print(f"❌ Error ensuring default admin: {e}")
+        return False
     finally:
         cur.close()
         conn.close()
@@ -3,8 +3,10 @@ Admin routes for Dashboard Statistics.
 """
 
 from flask import Blueprint, request, jsonify
-from config.database import get_connection
+from config.database import get_connection, get_pool_stats
 from src.routes.user.auth_routes import admin_required
+from src.services.email_outbox import get_outbox_stats
+from src.services.reference_data import get_reference_status, reload_reference_data
 from datetime import datetime
 
 stats_bp = Blueprint('admin_stats', __name__, url_prefix='/api/admin/stats')
@@ -61,3 +63,54 @@ def get_dashboard_stats():
         cur.close()
         conn.close()
 
+
+
+@stats_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool_stats():
+    """
+    Get database connection pool metrics for monitoring.
+    Returns checkouts, waits, timeouts, connects, discarded/reaped counts
+    and the current in-use/idle sizes.
+    """
+    return jsonify(get_pool_stats()), 200
+
+
+@stats_bp.route('/email-outbox', methods=['GET'])
+@admin_required
+def get_email_outbox_stats():
+    """
+    Get email outbox metrics: row counts per status (pending/sending/sent/failed)
+    and the age in seconds of the oldest pending email.
+    """
+    stats = get_outbox_stats()
+    if stats is None:
+        return jsonify({"error": "Database connection failed"}), 500
+    return jsonify(stats), 200
+
+
+@stats_bp.route('/reference-data', methods=['GET'])
+@admin_required
+def get_reference_data_status():
+    """
+    Get the reference data cache (cities, regions, provinces, tour types):
+    snapshot version, load time and row counts.
+    """
+    try:
+        return jsonify(get_reference_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@stats_bp.route('/reference-data/reload', methods=['POST'])
+@admin_required
+def reload_reference_data_cache():
+    """
+    Reload the reference data cache after cities, regions, provinces or tour
+    types were changed directly in the database.
+    """
+    try:
+        reload_reference_data()
+        return jsonify(get_reference_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
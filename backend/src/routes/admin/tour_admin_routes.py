@@ -7,10 +7,16 @@ All endpoints require admin authentication.
 
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from psycopg2.extras import execute_values
 from src.routes.user.auth_routes import admin_required
+from src.services.tour_cache import invalidate_tour, invalidate_all_tours
+from src.services.blob_store import externalize_image_url
+from src.services.pricing import (
+    PriceCatalog, TourComponents, billable_nights, load_tour_components,
+    nights_from_duration, quote, quote_tour, quote_tours,
+)
 from decimal import Decimal
 import json
-import re
 
 tour_admin_bp = Blueprint('tour_admin', __name__, url_prefix='/api/admin/tours')
 
@@ -19,11 +25,6 @@ tour_admin_bp = Blueprint('tour_admin', __name__, url_prefix='/api/admin/tours')
 # HELPER FUNCTIONS
 # =====================================================================
 
-def round_to_thousands(price):
-    """Round price to nearest thousand (e.g., 649,000 -> 650,000, 911,900 -> 912,000)"""
-    import math
-    return math.ceil(price / 1000) * 1000
-
 def get_service_price(service_type, service_id):
     """Get the price of a service for tour cost calculation."""
     conn = get_connection()
@@ -115,8 +116,9 @@ def get_all_tours():
                 t.departure_city_id, dpc.name as departure_city_name,
                 t.total_price, t.currency, t.is_active, t.is_published,
                 t.created_at, t.updated_at, t.number_of_members,
-                (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as primary_image
+                tls.primary_image as primary_image
             FROM tours_admin t
+            LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
             LEFT JOIN cities dc ON t.destination_city_id = dc.id
             LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
             {where_clause}
@@ -399,7 +401,7 @@ def create_tour():
                 created_by, is_active, is_published
             )
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
+            RETURNING id, duration_nights
         """, (
             data['name'], data['duration'], data['description'],
             data['destination_city_id'], data['departure_city_id'],
@@ -407,7 +409,8 @@ def create_tour():
             user_id, data.get('is_active', True), data.get('is_published', False)
         ))
         
-        tour_id = cur.fetchone()[0]
+        # duration_days / duration_nights are parsed from duration by a trigger
+        tour_id, duration_nights = cur.fetchone()
         
         # Add images if provided
         if 'images' in data and data['images']:
@@ -418,7 +421,7 @@ def create_tour():
                     )
                     VALUES (%s, %s, %s, %s, %s)
                 """, (
-                    tour_id, image['url'], image.get('caption'),
+                    tour_id, externalize_image_url(image['url']), image.get('caption'),
                     image.get('display_order', idx), image.get('is_primary', idx == 0)
                 ))
         
@@ -512,35 +515,28 @@ def create_tour():
                     ON CONFLICT (tour_id, set_meal_id, day_number, meal_session) DO NOTHING
                 """, (tour_id, set_meal_data['set_meal_id'], set_meal_data['day_number'], set_meal_data['meal_session']))
         
-        # Calculate and set total_price based on new logic
-        total_price = 0
-        
-        # Extract number of nights from duration (duration is number of days, nights = days - 1)
-        duration_value = data.get('duration', 1)
-        # Handle both integer and string formats
-        if isinstance(duration_value, (int, float)):
-            num_days = int(duration_value)
-        else:
-            # If it's a string, try to extract number from it (e.g., "3 days 2 nights" -> 3)
-            import re
-            duration_str = str(duration_value)
-            days_match = re.search(r'(\d+)', duration_str)
-            num_days = int(days_match.group(1)) if days_match else 1
-        num_nights = max(1, num_days - 1)  # Nights = Days - 1, minimum 1
+        # Calculate and set total_price from the submitted rooms, set meals and transport
+        num_nights = billable_nights(duration_nights)
+        rooms = [(booking['room_id'], booking['quantity']) for booking in data.get('roomBookings') or []]
+        set_meal_ids = [set_meal_data['set_meal_id'] for set_meal_data in data.get('selectedSetMeals') or []]
+        transport_id = None
+        if 'services' in data and 'transportation' in data['services'] and data['services']['transportation']:
+            transport_id = data['services']['transportation']['service_id']
+        catalog = PriceCatalog.load(
+            cur,
+            room_ids=[room_id for room_id, _ in rooms],
+            set_meal_ids=set_meal_ids,
+            transport_ids=[transport_id],
+        )
         
         # Calculate number of people from room bookings
         # Standard rooms = 2 people per room, Standard Quad = 4 people per room
         number_of_people = 0
-        if 'roomBookings' in data and data['roomBookings']:
-            for booking in data['roomBookings']:
-                cur.execute("""
-                    SELECT room_type FROM accommodation_rooms WHERE id = %s
-                """, (booking['room_id'],))
-                result = cur.fetchone()
-                if result:
-                    room_type = result[0]
-                    people_per_room = 4 if room_type == 'Standard Quad' else 2
-                    number_of_people += people_per_room * booking['quantity']
+        for room_id, quantity in rooms:
+            room = catalog.rooms.get(room_id)
+            if room:
+                people_per_room = 4 if room[2] == 'Standard Quad' else 2
+                number_of_people += people_per_room * quantity
         
         # If no room bookings, use provided number_of_members
         if number_of_people == 0:
@@ -551,49 +547,7 @@ def create_tour():
             UPDATE tours_admin SET number_of_members = %s WHERE id = %s
         """, (number_of_people, tour_id))
         
-        # Calculate accommodation cost from selected rooms (only Standard rooms, multiply by quantity and nights)
-        accommodation_cost = 0
-        if 'roomBookings' in data and data['roomBookings']:
-            for booking in data['roomBookings']:
-                cur.execute("""
-                    SELECT base_price, room_type FROM accommodation_rooms WHERE id = %s
-                """, (booking['room_id'],))
-                result = cur.fetchone()
-                if result and result[0]:
-                    base_price = float(result[0])
-                    quantity = booking['quantity']
-                    accommodation_cost += base_price * quantity * num_nights
-        
-        # Calculate restaurant costs from selected set meals
-        # Each set meal price is now per person
-        restaurant_cost = 0
-        if 'selectedSetMeals' in data and data['selectedSetMeals']:
-            for set_meal_data in data['selectedSetMeals']:
-                cur.execute("""
-                    SELECT total_price FROM restaurant_set_meals WHERE id = %s
-                """, (set_meal_data['set_meal_id'],))
-                result = cur.fetchone()
-                if result and result[0]:
-                    price_per_person = float(result[0])  # Price per person
-                    # Multiply by number of people
-                    restaurant_cost += price_per_person * number_of_people
-        
-        # Add transportation cost (per person, multiply by number of people, double for round trip)
-        transportation_cost = 0
-        if 'services' in data and 'transportation' in data['services'] and data['services']['transportation']:
-            cur.execute("""
-                SELECT base_price FROM transportation_services WHERE id = %s
-            """, (data['services']['transportation']['service_id'],))
-            result = cur.fetchone()
-            if result and result[0]:
-                price_per_person = float(result[0])
-                transportation_cost = price_per_person * number_of_people * 2  # Round trip
-        
-        # Calculate total price
-        total_price = accommodation_cost + restaurant_cost + transportation_cost
-        
-        # Round to nearest thousand
-        total_price = round_to_thousands(total_price)
+        total_price = quote(catalog, num_nights, number_of_people, rooms, set_meal_ids, transport_id)['total_price']
         
         # Update total_price directly
         cur.execute("""
@@ -687,7 +641,7 @@ def update_tour(tour_id):
                     )
                     VALUES (%s, %s, %s, %s, %s)
                 """, (
-                    tour_id, image['url'], image.get('caption'),
+                    tour_id, externalize_image_url(image['url']), image.get('caption'),
                     image.get('display_order', idx), image.get('is_primary', idx == 0)
                 ))
         
@@ -782,27 +736,10 @@ def update_tour(tour_id):
                     ON CONFLICT (tour_id, room_id) DO UPDATE SET quantity = EXCLUDED.quantity
                 """, (tour_id, booking['room_id'], booking['quantity']))
             
-            # Recalculate number of members from room bookings and update schedules
-            cur.execute("""
-                SELECT ar.bed_type, trb.quantity
-                FROM tour_room_bookings trb
-                JOIN accommodation_rooms ar ON trb.room_id = ar.id
-                WHERE trb.tour_id = %s
-            """, (tour_id,))
-            room_bookings = cur.fetchall()
-            
-            # Calculate number of members from room bookings
-            # Formula: quantity × people_per_room
-            # Double bed = 2 people, Queen bed = 2 people, King bed = 3 people
-            calculated_members = 0
-            if room_bookings:
-                for bed_type, quantity in room_bookings:
-                    people_per_room = 3 if bed_type == 'King' else 2
-                    calculated_members += quantity * people_per_room
-            
-            # Default to 1 if no rooms selected
-            if calculated_members == 0:
-                calculated_members = 1
+            # Recalculate number of members from the saved rooms (later rows win, as in the upsert)
+            rooms = {int(booking['room_id']): booking['quantity'] for booking in data['roomBookings']}
+            catalog = PriceCatalog.load(cur, room_ids=rooms)
+            calculated_members = catalog.members_for_rooms(rooms.items()) or 1
             
             # Update number of members in tours table
             cur.execute("""
@@ -828,74 +765,14 @@ def update_tour(tour_id):
                     ON CONFLICT (tour_id, set_meal_id, day_number, meal_session) DO NOTHING
                 """, (tour_id, set_meal['set_meal_id'], set_meal['day_number'], set_meal['meal_session']))
         
-        # Calculate and set total_price based on room bookings and set meals
-        total_price = 0
-        
-        # Get tour duration and number of members to calculate price
-        cur.execute("SELECT duration, number_of_members FROM tours_admin WHERE id = %s", (tour_id,))
+        # Recalculate total_price from the saved rooms, set meals and transport
+        cur.execute("SELECT number_of_members FROM tours_admin WHERE id = %s", (tour_id,))
         tour_result = cur.fetchone()
-        duration = tour_result[0] if tour_result else 1
-        number_of_members = tour_result[1] if tour_result and tour_result[1] else 1
-        
-        # Calculate nights from days (duration is number of days, nights = days - 1, minimum 1)
-        # Ensure duration is integer
-        try:
-            duration_int = int(duration) if duration else 1
-        except (ValueError, TypeError):
-            duration_int = 1
-        num_nights = max(1, duration_int - 1)
-        
-        # Calculate accommodation cost from room bookings (quantity × base_price × nights)
-        accommodation_cost = 0
-        cur.execute("""
-            SELECT ar.base_price, trb.quantity
-            FROM tour_room_bookings trb
-            JOIN accommodation_rooms ar ON trb.room_id = ar.id
-            WHERE trb.tour_id = %s
-        """, (tour_id,))
-        room_bookings = cur.fetchall()
+        number_of_members = tour_result[0] if tour_result and tour_result[0] else 1
         
-        for base_price, quantity in room_bookings:
-            if base_price:
-                accommodation_cost += float(base_price) * quantity * num_nights
-        
-        # Calculate restaurant costs from selected set meals
-        restaurant_cost = 0
-        cur.execute("""
-            SELECT rsm.total_price
-            FROM tour_selected_set_meals tssm
-            JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-            WHERE tssm.tour_id = %s
-        """, (tour_id,))
-        set_meal_prices = cur.fetchall()
-        
-        if set_meal_prices:
-            # Each set meal price is per person
-            for price_tuple in set_meal_prices:
-                if price_tuple[0]:
-                    restaurant_cost += float(price_tuple[0]) * number_of_members
-        
-        # Add transportation cost (per person, multiply by number of members, double for round trip)
-        transportation_cost = 0
-        cur.execute("""
-            SELECT transportation_id FROM tour_services 
-            WHERE tour_id = %s AND service_type = 'transportation'
-        """, (tour_id,))
-        trans_result = cur.fetchone()
-        if trans_result and trans_result[0]:
-            cur.execute("""
-                SELECT base_price FROM transportation_services WHERE id = %s
-            """, (trans_result[0],))
-            price_result = cur.fetchone()
-            if price_result and price_result[0]:
-                price_per_person = float(price_result[0])
-                transportation_cost = price_per_person * number_of_members * 2  # Round trip
-        
-        # Calculate total price
-        total_price = accommodation_cost + restaurant_cost + transportation_cost
-        
-        # Round to nearest ten thousand
-        total_price = round_to_thousands(total_price)
+        components = load_tour_components(cur, [tour_id]).get(tour_id) or TourComponents(tour_id)
+        catalog = PriceCatalog.for_tours(cur, [components])
+        total_price = quote_tour(components, catalog, number_of_members)[1]['total_price']
         
         # Update total_price directly
         cur.execute("""
@@ -903,6 +780,7 @@ def update_tour(tour_id):
         """, (total_price, tour_id))
         
         conn.commit()
+        invalidate_tour(tour_id)
         
         return jsonify({"message": "Tour updated successfully"}), 200
         
@@ -939,6 +817,7 @@ def delete_tour(tour_id):
         cur.execute("DELETE FROM tours_admin WHERE id = %s", (tour_id,))
         
         conn.commit()
+        invalidate_tour(tour_id)
         
         return jsonify({"message": "Tour deleted successfully"}), 200
         
@@ -1168,106 +1047,35 @@ def calculate_tour_price():
     
     try:
         cur = conn.cursor()
-        total_price = 0
-        breakdown = {
-            'restaurants': 0,
-            'accommodation': 0,
-            'transportation': 0
-        }
         
         services = data['services']
         room_bookings = data.get('roomBookings', [])  # [{room_id, quantity}]
         selected_set_meals = data.get('selectedSetMeals', [])  # [{set_meal_id, day_number, meal_session}]
         number_of_members = data.get('number_of_members', 1)
         
-        print(f"Calculating price - Room bookings: {room_bookings}")
-        print(f"Calculating price - Selected set meals: {selected_set_meals}")
-        print(f"Calculating price - Number of members: {number_of_members}")
-        
-        # Extract number of nights from duration if provided
         # Duration is number of days (2 = 2 days 1 night, 3 = 3 days 2 nights)
-        num_nights = 1  # Default to 1 night
-        if 'duration' in data and data['duration']:
-            duration = data['duration']
-            # If duration is a number, calculate nights
-            if isinstance(duration, (int, float)):
-                num_nights = int(duration) - 1 if duration > 1 else 1
-            else:
-                # If it's a string, try to parse it
-                try:
-                    duration_int = int(duration)
-                    num_nights = duration_int - 1 if duration_int > 1 else 1
-                except ValueError:
-                    # Fallback to regex for old format
-                    night_match = re.search(r'(\d+)\s*(?:night|đêm)', str(duration).lower())
-                    if night_match:
-                        num_nights = int(night_match.group(1))
-        
-        # Calculate accommodation cost based on room bookings (quantity × base_price × nights)
-        if 'accommodation' in services and services['accommodation'] and room_bookings:
-            print(f"Processing {len(room_bookings)} room booking(s) for {num_nights} nights...")
-            for booking in room_bookings:
-                room_id = booking.get('room_id')
-                quantity = booking.get('quantity', 1)
-                
-                cur.execute("""
-                    SELECT base_price, bed_type FROM accommodation_rooms WHERE id = %s
-                """, (room_id,))
-                result = cur.fetchone()
-                if result and result[0]:
-                    base_price = float(result[0])
-                    bed_type = result[1]
-                    room_cost = base_price * quantity * num_nights
-                    breakdown['accommodation'] += room_cost
-                    print(f"Room {room_id} ({bed_type}): {base_price} VND x {quantity} room(s) x {num_nights} night(s) = {room_cost} VND")
-                else:
-                    print(f"Room {room_id}: No price found")
-        
-        # Calculate restaurant costs based on selected set meals
-        if selected_set_meals:
-            print(f"Processing {len(selected_set_meals)} set meal(s)...")
-            # Each set meal price is now per person
-            
-            for set_meal in selected_set_meals:
-                set_meal_id = set_meal.get('set_meal_id')
-                
-                cur.execute("""
-                    SELECT total_price, name, meal_session FROM restaurant_set_meals WHERE id = %s
-                """, (set_meal_id,))
-                result = cur.fetchone()
-                if result and result[0]:
-                    set_meal_price_per_person = float(result[0])
-                    set_meal_name = result[1]
-                    meal_session = result[2]
-                    # Multiply by number of members (price is per person)
-                    total_set_meal_cost = set_meal_price_per_person * number_of_members
-                    breakdown['restaurants'] += total_set_meal_cost
-                    print(f"Set meal {set_meal_id} ({set_meal_name} - {meal_session}): {set_meal_price_per_person} VND/person x {number_of_members} members = {total_set_meal_cost} VND")
-                else:
-                    print(f"Set meal {set_meal_id}: No price found")
-        
-        # Calculate transportation cost (per person, multiply by number of members, double for round trip)
-        if 'transportation' in services and services['transportation']:
-            cur.execute("""
-                SELECT base_price FROM transportation_services WHERE id = %s
-            """, (services['transportation']['service_id'],))
-            result = cur.fetchone()
-            if result and result[0]:
-                price_per_person = float(result[0])
-                # Price is per person, multiply by number of members, then by 2 for round trip
-                breakdown['transportation'] = price_per_person * number_of_members * 2
-                print(f"Transportation: {price_per_person} VND/person x {number_of_members} members x 2 (round trip) = {breakdown['transportation']} VND")
-            else:
-                print("Transportation: No price found")
+        num_nights = nights_from_duration(data.get('duration'))
         
-        # Calculate total price
-        total_price = breakdown['accommodation'] + breakdown['restaurants'] + breakdown['transportation']
+        # Rooms only count when an accommodation is selected
+        rooms = []
+        if 'accommodation' in services and services['accommodation']:
+            rooms = [(booking.get('room_id'), booking.get('quantity', 1)) for booking in room_bookings]
+        set_meal_ids = [set_meal.get('set_meal_id') for set_meal in selected_set_meals]
+        transport_id = None
+        if 'transportation' in services and services['transportation']:
+            transport_id = services['transportation']['service_id']
         
-        # Round to nearest ten thousand
-        total_price = round_to_thousands(total_price)
+        catalog = PriceCatalog.load(
+            cur,
+            room_ids=[room_id for room_id, _ in rooms],
+            set_meal_ids=set_meal_ids,
+            transport_ids=[transport_id],
+        )
+        breakdown = quote(catalog, num_nights, number_of_members, rooms, set_meal_ids, transport_id)
+        total_price = breakdown.pop('total_price')
         
-        print(f"Total price (rounded): {total_price} VND")
-        print(f"Breakdown: {breakdown}")
+        print(f"Calculated price for {len(rooms)} room booking(s), {len(set_meal_ids)} set meal(s), "
+              f"{number_of_members} members, {num_nights} night(s): {total_price} VND {breakdown}")
         
         return jsonify({
             'total_price': total_price,
@@ -1431,10 +1239,62 @@ def get_restaurant_menu(restaurant_id):
 # SYNC ALL TOURS (Update all tour information including members and prices)
 # =====================================================================
 
+SYNC_TOURS_BATCH_SIZE = 500
+
+
+def _sync_tour_batch(cur, tour_ids):
+    """
+    Recalculate number_of_members, schedule max_slots and total_price for a
+    batch of tours with batched price lookups (src.services.pricing) and
+    three bulk UPDATEs. Only rows whose values change are written.
+    """
+    cur.execute("""
+        SELECT id, number_of_members, total_price FROM tours_admin WHERE id = ANY(%s)
+    """, (tour_ids,))
+    current = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+    
+    members_updates = []
+    price_updates = []
+    for tour_id, (number_of_members, breakdown) in quote_tours(cur, tour_ids).items():
+        old_members, old_price = current.get(tour_id, (None, None))
+        total_price = breakdown['total_price']
+        if old_members != number_of_members:
+            members_updates.append((tour_id, number_of_members))
+        if old_price is None or float(old_price) != total_price:
+            price_updates.append((tour_id, total_price))
+    
+    if members_updates:
+        execute_values(cur, """
+            UPDATE tours_admin t
+            SET number_of_members = v.number_of_members
+            FROM (VALUES %s) AS v(tour_id, number_of_members)
+            WHERE t.id = v.tour_id
+        """, members_updates)
+    # max_slots follows number_of_members for every schedule of the tour
+    cur.execute("""
+        UPDATE tour_schedules ts
+        SET max_slots = t.number_of_members
+        FROM tours_admin t
+        WHERE ts.tour_id = t.id AND t.id = ANY(%s)
+          AND ts.max_slots IS DISTINCT FROM t.number_of_members
+    """, (tour_ids,))
+    if price_updates:
+        execute_values(cur, """
+            UPDATE tours_admin t
+            SET total_price = v.total_price
+            FROM (VALUES %s) AS v(tour_id, total_price)
+            WHERE t.id = v.tour_id
+        """, price_updates)
+
+
 @tour_admin_bp.route('/sync-all-tours', methods=['POST'])
 @admin_required
 def sync_all_tours():
-    """Sync all tours by recalculating number of members and prices based on current data."""
+    """
+    Sync all tours by recalculating number of members and prices based on current data.
+    Tours are processed in id order, SYNC_TOURS_BATCH_SIZE per transaction, so
+    locks on tours_admin are held only for one batch at a time.
+    """
     conn = get_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -1442,131 +1302,42 @@ def sync_all_tours():
     try:
         cur = conn.cursor()
         
-        # Get all tours
-        cur.execute("""
-            SELECT id, duration FROM tours_admin
-        """)
-        tours = cur.fetchall()
+        cur.execute("SELECT COUNT(*) FROM tours_admin")
+        total_tours = cur.fetchone()[0]
+        conn.commit()
         
         updated_count = 0
+        processed = 0
         errors = []
+        after_id = 0
         
-        for tour_id, duration in tours:
+        while True:
+            cur.execute("""
+                SELECT id FROM tours_admin WHERE id > %s ORDER BY id LIMIT %s
+            """, (after_id, SYNC_TOURS_BATCH_SIZE))
+            tour_ids = [row[0] for row in cur.fetchall()]
+            if not tour_ids:
+                break
+            
             try:
-                # Get room bookings to calculate number of members
-                cur.execute("""
-                    SELECT ar.bed_type, trb.quantity
-                    FROM tour_room_bookings trb
-                    JOIN accommodation_rooms ar ON trb.room_id = ar.id
-                    WHERE trb.tour_id = %s
-                """, (tour_id,))
-                room_bookings = cur.fetchall()
-                
-                # Calculate number of members from room bookings
-                # Formula: quantity × people_per_room
-                # Double bed = 2 people, Queen bed = 2 people, King bed = 3 people
-                number_of_members = 0
-                if room_bookings:
-                    for bed_type, quantity in room_bookings:
-                        people_per_room = 3 if bed_type == 'King' else 2
-                        number_of_members += quantity * people_per_room
-                
-                # Default to 1 if no rooms selected
-                if number_of_members == 0:
-                    number_of_members = 1
-                
-                # Update number of members
-                cur.execute("""
-                    UPDATE tours_admin SET number_of_members = %s WHERE id = %s
-                """, (number_of_members, tour_id))
-                
-                # Update max_slots in all schedules for this tour
-                cur.execute("""
-                    UPDATE tour_schedules 
-                    SET max_slots = %s 
-                    WHERE tour_id = %s
-                """, (number_of_members, tour_id))
-                
-                # Now calculate prices
-                accommodation_cost = 0
-                restaurant_cost = 0
-                transportation_cost = 0
-                
-                # Calculate number of nights from duration (duration is number of days)
-                # Example: duration=2 means 2 days 1 night, duration=3 means 3 days 2 nights
-                # Ensure duration is integer
-                try:
-                    duration_int = int(duration) if duration else 1
-                except (ValueError, TypeError):
-                    duration_int = 1
-                num_nights = max(1, duration_int - 1)
-                
-                # Calculate accommodation cost from room bookings (quantity × base_price × nights)
-                cur.execute("""
-                    SELECT ar.base_price, trb.quantity
-                    FROM tour_room_bookings trb
-                    JOIN accommodation_rooms ar ON trb.room_id = ar.id
-                    WHERE trb.tour_id = %s
-                """, (tour_id,))
-                room_booking_prices = cur.fetchall()
-                
-                for base_price, quantity in room_booking_prices:
-                    if base_price:
-                        accommodation_cost += float(base_price) * quantity * num_nights
-                
-                # Calculate restaurant costs from selected set meals
-                cur.execute("""
-                    SELECT rsm.total_price
-                    FROM tour_selected_set_meals tssm
-                    JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-                    WHERE tssm.tour_id = %s
-                """, (tour_id,))
-                set_meal_prices = cur.fetchall()
-                
-                if set_meal_prices:
-                    # Each set meal price is per person
-                    for price_tuple in set_meal_prices:
-                        if price_tuple[0]:
-                            restaurant_cost += float(price_tuple[0]) * number_of_members
-                
-                # Add transportation cost (per person, multiply by number of members, round trip)
-                cur.execute("""
-                    SELECT transportation_id FROM tour_services 
-                    WHERE tour_id = %s AND service_type = 'transportation'
-                """, (tour_id,))
-                trans_result = cur.fetchone()
-                if trans_result and trans_result[0]:
-                    cur.execute("""
-                        SELECT base_price FROM transportation_services WHERE id = %s
-                    """, (trans_result[0],))
-                    price_result = cur.fetchone()
-                    if price_result and price_result[0]:
-                        price_per_person = float(price_result[0])
-                        transportation_cost = price_per_person * number_of_members * 2  # Round trip
-                
-                # Calculate total price
-                total_price = accommodation_cost + restaurant_cost + transportation_cost
-                
-                # Round to nearest ten thousand
-                total_price = round_to_thousands(total_price)
-                
-                # Update total_price
-                cur.execute("""
-                    UPDATE tours_admin SET total_price = %s WHERE id = %s
-                """, (total_price, tour_id))
-                
-                updated_count += 1
-                
+                _sync_tour_batch(cur, tour_ids)
+                updated_count += len(tour_ids)
+                conn.commit()
             except Exception as e:
-                errors.append(f"Tour {tour_id}: {str(e)}")
-                print(f"Error syncing tour {tour_id}: {e}")
+                conn.rollback()
+                errors.append(f"Tours {tour_ids[0]}-{tour_ids[-1]}: {str(e)}")
+                print(f"Error syncing tours {tour_ids[0]}-{tour_ids[-1]}: {e}")
+            
+            processed += len(tour_ids)
+            after_id = tour_ids[-1]
+            print(f"[INFO] Synced {processed}/{total_tours} tours")
         
-        conn.commit()
+        invalidate_all_tours()
         
         return jsonify({
             "message": f"Successfully synced {updated_count} tours",
             "updated_count": updated_count,
-            "total_tours": len(tours),
+            "total_tours": total_tours,
             "errors": errors if errors else None
         }), 200
         
@@ -1650,7 +1421,7 @@ def create_tour_schedule(tour_id):
         
         # Get tour details (duration and max_slots)
         cur.execute("""
-            SELECT duration, number_of_members
+            SELECT duration_days, number_of_members
             FROM tours_admin
             WHERE id = %s
         """, (tour_id,))
@@ -1659,11 +1430,9 @@ def create_tour_schedule(tour_id):
         if not tour_data:
             return jsonify({"error": "Tour not found"}), 404
         
-        duration_str = tour_data[0]
+        duration_days = tour_data[0]
         max_slots = tour_data[1]
         
-        # Extract days from duration (expecting format like "3 days 2 nights" or just a number)
-        duration_days = extract_days_from_duration(duration_str)
         if not duration_days:
             return jsonify({"error": "Invalid tour duration format"}), 400
         
@@ -1735,9 +1504,8 @@ def update_tour_schedule(tour_id, schedule_id):
             departure_dt = datetime.fromisoformat(data['departure_datetime'].replace('Z', '+00:00'))
             
             # Get tour duration
-            cur.execute("SELECT duration FROM tours_admin WHERE id = %s", (tour_id,))
-            duration_str = cur.fetchone()[0]
-            duration_days = extract_days_from_duration(duration_str)
+            cur.execute("SELECT COALESCE(duration_days, 1) FROM tours_admin WHERE id = %s", (tour_id,))
+            duration_days = cur.fetchone()[0]
             
             # Calculate return datetime (departure + duration - 1 days)
             return_dt = departure_dt + timedelta(days=duration_days - 1)
@@ -1833,22 +1601,3 @@ def delete_tour_schedule(tour_id, schedule_id):
     finally:
         cur.close()
         conn.close()
-
-
-def extract_days_from_duration(duration):
-    """Extract number of days from duration string."""
-    if not duration:
-        return None
-    
-    # If duration is already a number, return it
-    if isinstance(duration, (int, float)):
-        return int(duration)
-    
-    # Try to parse as integer
-    try:
-        return int(duration)
-    except (ValueError, TypeError):
-        # Try to extract from string format "3 days 2 nights"
-        match = re.search(r'(\d+)', str(duration))
-        return int(match.group(1)) if match else None
-
@@ -0,0 +1,55 @@
+from flask import Blueprint, jsonify, send_file
+import os
+from src.services.blob_store import BLOB_NAME_RE, RASTER_IMAGE_TYPES, blob_path, find_original, mime_type_for
+from src.services.image_derivatives import schedule_derivatives
+
+blob_routes = Blueprint('blob_routes', __name__)
+
+# Blobs are content-addressed, so a URL always refers to the same bytes
+BLOB_MAX_AGE = 365 * 24 * 3600
+
+
+def _protect(response, name):
+    """
+    Stop browsers from sniffing blobs, and from rendering anything that is not
+    a raster image (e.g. SVG stored by older uploads) as a same-origin page.
+    """
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if mime_type_for(name) not in RASTER_IMAGE_TYPES:
+        response.headers['Content-Disposition'] = 'attachment'
+        response.headers['Content-Security-Policy'] = "default-src 'none'; sandbox"
+    return response
+
+
+@blob_routes.route('/<name>', methods=['GET'])
+def get_blob(name):
+    """
+    API GET /api/blobs/<sha256>[_<variant>]<ext> to serve a stored image.
+    Supports If-None-Match and Range requests.
+
+    A derivative (e.g. _thumbnail.webp) that has not been generated yet is
+    answered with the original, uncached, and its generation is queued.
+    """
+    path = blob_path(name)
+    if not path:
+        return jsonify({"error": "Blob not found"}), 404
+
+    if not os.path.isfile(path):
+        match = BLOB_NAME_RE.match(name)
+        original = find_original(match.group(1)) if match.group(2) else None
+        if not original:
+            return jsonify({"error": "Blob not found"}), 404
+        schedule_derivatives(original)
+        response = send_file(blob_path(original), mimetype=mime_type_for(original), conditional=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return _protect(response, original)
+
+    response = send_file(
+        path,
+        mimetype=mime_type_for(name),
+        conditional=True,
+        etag=os.path.splitext(name)[0],
+        max_age=BLOB_MAX_AGE,
+    )
+    response.headers['Cache-Control'] = f'public, max-age={BLOB_MAX_AGE}, immutable'
+    return _protect(response, name)
@@ -9,6 +9,20 @@ from src.services.email_service import (
     send_tour_schedule_cancelled_email,
     send_payment_success_email
 )
+from src.services.email_outbox import collect_emails, notify_worker
+from src.services.pricing import billable_nights, booking_partner_revenue
+from src.services.booking_items import write_booking_items
+from src.services.tour_highlights import invalidate_highlights
+from src.services.slot_reservation import (
+    attach_booking,
+    confirm_hold,
+    create_hold,
+    describe_unavailable,
+    release_expired_holds,
+    release_hold,
+    reserve_slots,
+    slots_for_guests
+)
 
 booking_routes = Blueprint('bookings', __name__)
 
@@ -36,6 +50,7 @@ def create_booking():
         notes = data.get('notes', '')
         promotion_code = data.get('promotion_code')  # Optional promotion code
         customizations = data.get('customizations', {})  # Room upgrades, meal selections, etc.
+        hold_token = data.get('hold_token')  # Optional: from POST /api/bookings/holds
         
         # Debug: Print customizations
         print(f"DEBUG: Booking customizations received: {customizations}")
@@ -61,44 +76,27 @@ def create_booking():
         try:
             cur = conn.cursor()
             
-            # Validate schedule and check availability
-            # Exclude completed and cancelled schedules
-            cur.execute("""
-                SELECT slots_available, max_slots, slots_booked, status
-                FROM tour_schedules
-                WHERE id = %s AND tour_id = %s AND is_active = TRUE
-                    AND status NOT IN ('completed', 'cancelled')
-                    AND departure_datetime > NOW()
-            """, (tour_schedule_id, tour_id))
-            
-            schedule = cur.fetchone()
-            if not schedule:
-                return jsonify({
-                    'success': False,
-                    'message': 'Invalid, inactive, completed, or cancelled tour schedule'
-                }), 400
-            
-            slots_available = schedule[0]
-            schedule_status = schedule[3] if len(schedule) > 3 else None
-            
-            # Double-check status
-            if schedule_status in ('completed', 'cancelled'):
-                return jsonify({
-                    'success': False,
-                    'message': 'This tour schedule is no longer available for booking'
-                }), 400
-            
-            # Calculate total slots needed based on rooms
-            # Each room holds 2 people, so slots = rooms × 2
-            # Even 1 person needs 1 room = 2 slots
-            rooms_needed = (number_of_guests + 1) // 2  # Ceiling division
-            slots_needed = rooms_needed * 2
-            
-            if slots_needed > slots_available:
-                return jsonify({
-                    'success': False,
-                    'message': f'Not enough slots available. Requested: {slots_needed}, Available: {slots_available}'
-                }), 400
+            # Reserve slots atomically: either confirm the checkout hold taken
+            # before payment, or take the slots directly.
+            # Each room holds 2 people, so slots = rooms × 2 (even 1 person needs 1 room = 2 slots)
+            slots_needed = slots_for_guests(number_of_guests)
+            
+            if hold_token:
+                if not confirm_hold(cur, hold_token, tour_schedule_id, tour_id, slots_needed):
+                    conn.rollback()
+                    return jsonify({
+                        'success': False,
+                        'message': 'Your slot reservation has expired or is no longer available. Please try again.'
+                    }), 409
+            else:
+                release_expired_holds(cur)
+                if reserve_slots(cur, tour_schedule_id, tour_id, slots_needed) is None:
+                    message = describe_unavailable(cur, tour_schedule_id, tour_id, slots_needed)
+                    conn.rollback()
+                    return jsonify({
+                        'success': False,
+                        'message': message
+                    }), 400
             
             # Insert booking
             cur.execute("""
@@ -134,13 +132,11 @@ def create_booking():
             
             booking_id = cur.fetchone()[0]
             
-            # Update schedule slots
-            cur.execute("""
-                UPDATE tour_schedules
-                SET slots_booked = slots_booked + %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (slots_needed, tour_schedule_id))
+            if hold_token:
+                attach_booking(cur, hold_token, booking_id)
+            
+            # Normalized rooms / meals / transport legs for partner queries
+            write_booking_items(cur, [(booking_id, tour_id, number_of_guests, customizations)])
             
             # ===== REVENUE VERIFICATION =====
             # Verify that partner revenues sum to 90% of total booking price
@@ -152,152 +148,16 @@ def create_booking():
             
             # Get tour details for revenue calculation
             cur.execute("""
-                SELECT duration FROM tours_admin WHERE id = %s
+                SELECT name, duration_nights FROM tours_admin WHERE id = %s
             """, (tour_id,))
             tour_result = cur.fetchone()
-            tour_duration = tour_result[0] if tour_result else 2
-            
-            print(f"DEBUG: Tour duration from DB: {tour_duration} (type: {type(tour_duration)})")
-            
-            # Parse nights from duration
-            import re
-            nights = 1
-            
-            # Try to convert to int if it's a numeric string
-            if isinstance(tour_duration, str) and tour_duration.isdigit():
-                tour_duration = int(tour_duration)
+            tour_name = tour_result[0] if tour_result else "Tour"
+            nights = billable_nights(tour_result[1] if tour_result else None)
             
-            if isinstance(tour_duration, (int, float)):
-                nights = int(tour_duration) - 1 if tour_duration > 1 else 1
-            else:
-                # Try regex for "X nights" or "X đêm" format
-                night_match = re.search(r'(\d+)\s*(?:night|đêm)', str(tour_duration).lower())
-                if night_match:
-                    nights = int(night_match.group(1))
-                else:
-                    # Try regex for "X days" format and convert to nights
-                    day_match = re.search(r'(\d+)\s*(?:day|ngày)', str(tour_duration).lower())
-                    if day_match:
-                        nights = int(day_match.group(1)) - 1
-            
-            print(f"DEBUG: Calculated nights: {nights}")
-            
-            # Calculate accommodation revenue
-            accommodation_revenue = 0
-            
-            # Check if user selected a room upgrade in customizations
-            room_upgrade_info = customizations.get('room_upgrade') if customizations else None
-            default_room_info = customizations.get('default_room') if customizations else None
-            
-            if room_upgrade_info and room_upgrade_info.get('room_price'):
-                # User selected a room upgrade - use that room's price
-                print(f"  Using upgraded room: room_id = {room_upgrade_info.get('room_id')}")
-                room_price = float(room_upgrade_info.get('room_price'))
-                rooms_booked = (number_of_guests + 1) // 2
-                accommodation_revenue = room_price * rooms_booked * nights
-                print(f"  Upgraded room: {room_price:,.0f} VND/night × {rooms_booked} rooms × {nights} nights = {accommodation_revenue:,.0f} VND")
-            elif default_room_info and default_room_info.get('room_price'):
-                # User used default room - use that room's price from frontend
-                print(f"  Using default room from booking data: room_id = {default_room_info.get('room_id')}")
-                room_price = float(default_room_info.get('room_price'))
-                rooms_booked = (number_of_guests + 1) // 2
-                accommodation_revenue = room_price * rooms_booked * nights
-                print(f"  Default room: {room_price:,.0f} VND/night × {rooms_booked} rooms × {nights} nights = {accommodation_revenue:,.0f} VND")
-            else:
-                # No custom room - use tour default
-                # First try to get from tour_selected_rooms (detailed room bookings)
-                cur.execute("""
-                    SELECT ar.base_price, COUNT(DISTINCT tsr.room_id) as room_count
-                    FROM tour_selected_rooms tsr
-                    INNER JOIN accommodation_rooms ar ON tsr.room_id = ar.id
-                    WHERE tsr.tour_id = %s
-                    GROUP BY ar.base_price
-                """, (tour_id,))
-                room_prices = cur.fetchall()
-                
-                if room_prices:
-                    # Use detailed room booking data
-                    print(f"  Using tour_selected_rooms data: {len(room_prices)} room types found")
-                    total_room_price = sum(float(row[0]) * row[1] for row in room_prices if row[0])
-                    room_count = sum(row[1] for row in room_prices)
-                    avg_room_price = total_room_price / room_count if room_count > 0 else 0
-                    rooms_booked = (number_of_guests + 1) // 2
-                    accommodation_revenue = avg_room_price * rooms_booked * nights
-                else:
-                    # Fallback: Get accommodation cost from tour_services
-                    print(f"  No rooms in tour_selected_rooms, using tour_services fallback")
-                    cur.execute("""
-                        SELECT ts.service_cost
-                        FROM tour_services ts
-                        WHERE ts.tour_id = %s AND ts.service_type = 'accommodation'
-                        LIMIT 1
-                    """, (tour_id,))
-                    result = cur.fetchone()
-                    if result and result[0]:
-                        # service_cost is average room price per night
-                        avg_room_price = float(result[0])
-                        rooms_booked = (number_of_guests + 1) // 2
-                        accommodation_revenue = avg_room_price * rooms_booked * nights
-                        print(f"  Fallback found: {avg_room_price} VND/night × {rooms_booked} rooms × {nights} nights = {accommodation_revenue} VND")
-                    else:
-                        print(f"  WARNING: No accommodation data found in tour_services either!")
-            
-            # Calculate restaurant revenue (from set meals)
-            restaurant_revenue = 0
-            selected_meals = customizations.get('selected_meals', []) if customizations else []
-            
-            if selected_meals:
-                # User selected specific meals - only count those
-                print(f"  Calculating restaurant revenue for {len(selected_meals)} selected meals")
-                for meal in selected_meals:
-                    cur.execute("""
-                        SELECT rsm.total_price
-                        FROM tour_selected_set_meals tssm
-                        INNER JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-                        WHERE tssm.tour_id = %s 
-                          AND tssm.day_number = %s 
-                          AND tssm.meal_session = %s
-                    """, (tour_id, meal['day_number'], meal['meal_session']))
-                    result = cur.fetchone()
-                    if result and result[0]:
-                        meal_price = float(result[0])
-                        restaurant_revenue += meal_price * number_of_guests
-                        print(f"    Day {meal['day_number']} {meal['meal_session']}: {meal_price:,.0f} × {number_of_guests} guests = {meal_price * number_of_guests:,.0f} VND")
-            else:
-                # No meal selection info - use all meals (fallback for old bookings)
-                print(f"  No meal selection data, using all tour meals")
-                cur.execute("""
-                    SELECT SUM(rsm.total_price)
-                    FROM tour_selected_set_meals tssm
-                    INNER JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-                    WHERE tssm.tour_id = %s
-                """, (tour_id,))
-                result = cur.fetchone()
-                if result and result[0]:
-                    restaurant_revenue = float(result[0]) * number_of_guests
-            
-            # Calculate transportation revenue (round trip)
-            transportation_revenue = 0
-            transport_options = customizations.get('transport_options', {}) if customizations else {}
-            
-            # Check which trips the user selected (outbound and/or return)
-            outbound_selected = transport_options.get('outbound', True)  # Default to True if not specified
-            return_selected = transport_options.get('return', True)
-            trips_selected = (1 if outbound_selected else 0) + (1 if return_selected else 0)
-            
-            if trips_selected > 0:
-                cur.execute("""
-                    SELECT SUM(ts.service_cost)
-                    FROM tour_services ts
-                    WHERE ts.tour_id = %s AND ts.service_type = 'transportation'
-                """, (tour_id,))
-                result = cur.fetchone()
-                if result and result[0]:
-                    transport_cost_per_person = float(result[0])  # One-way price
-                    transportation_revenue = transport_cost_per_person * number_of_guests * trips_selected
-                    print(f"  Transportation: {transport_cost_per_person:,.0f} VND/person × {number_of_guests} guests × {trips_selected} trip(s) = {transportation_revenue:,.0f} VND")
-            else:
-                print(f"  Transportation: Not selected (0 trips)")
+            revenue = booking_partner_revenue(cur, tour_id, nights, number_of_guests, customizations)
+            accommodation_revenue = revenue['accommodation']
+            restaurant_revenue = revenue['restaurants']
+            transportation_revenue = revenue['transportation']
             
             # Calculate total partner revenue
             total_partner_revenue = accommodation_revenue + restaurant_revenue + transportation_revenue
@@ -332,13 +192,6 @@ def create_booking():
                 print(f"  Total: {total_price:,.0f} VND | Partner Pool: {expected_partner_pool:,.0f} VND")
                 print(f"  Breakdown: Accommodation={accommodation_revenue:,.0f}, Restaurant={restaurant_revenue:,.0f}, Transportation={transportation_revenue:,.0f}")
             
-            conn.commit()
-            
-            # Get tour name for email
-            cur.execute("SELECT name FROM tours_admin WHERE id = %s", (tour_id,))
-            tour_result = cur.fetchone()
-            tour_name = tour_result[0] if tour_result else "Tour"
-            
             # Prepare booking data for email
             booking_data = {
                 'booking_id': booking_id,
@@ -352,26 +205,28 @@ def create_booking():
                 'contact_email': os.getenv('FROM_EMAIL', 'support@tourism-website.com')
             }
             
-            # Send booking confirmation email
-            try:
-                send_booking_confirmation_email(email, booking_data)
-                print(f"✅ Booking confirmation email sent to {email}")
-            except Exception as e:
-                print(f"⚠️ Failed to send booking confirmation email: {e}")
-            
-            # Send payment success email
-            try:
-                payment_data = {
-                    'customer_name': full_name,
-                    'transaction_id': payment_intent_id or f"BOOKING-{booking_id}",
-                    'amount': float(total_price),
-                    'payment_method': payment_method,
-                    'payment_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                send_payment_success_email(email, payment_data)
-                print(f"✅ Payment success email sent to {email}")
-            except Exception as e:
-                print(f"⚠️ Failed to send payment success email: {e}")
+            # Queue confirmation emails in the booking transaction; the outbox worker sends them
+            with collect_emails(cur):
+                try:
+                    send_booking_confirmation_email(email, booking_data)
+                except Exception as e:
+                    print(f"⚠️ Failed to queue booking confirmation email: {e}")
+                
+                try:
+                    payment_data = {
+                        'customer_name': full_name,
+                        'transaction_id': payment_intent_id or f"BOOKING-{booking_id}",
+                        'amount': float(total_price),
+                        'payment_method': payment_method,
+                        'payment_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    }
+                    send_payment_success_email(email, payment_data)
+                except Exception as e:
+                    print(f"⚠️ Failed to queue payment success email: {e}")
+            
+            conn.commit()
+            notify_worker()
+            invalidate_highlights()
             
             return jsonify({
                 'success': True,
@@ -395,6 +250,111 @@ def create_booking():
             'message': f'Error: {str(e)}'
         }), 500
 
+@booking_routes.route('/holds', methods=['POST'])
+def create_slot_hold():
+    """
+    Reserve slots on a schedule for the duration of checkout.
+    Body: tour_id, tour_schedule_id, number_of_guests.
+    Pass the returned hold_token to /create; unconfirmed holds expire after
+    BOOKING_HOLD_TTL_SECONDS and their slots become available again.
+    """
+    try:
+        data = request.get_json() or {}
+        tour_id = data.get('tour_id')
+        tour_schedule_id = data.get('tour_schedule_id')
+        number_of_guests = data.get('number_of_guests', 1)
+        
+        if not tour_id or not tour_schedule_id:
+            return jsonify({
+                'success': False,
+                'message': 'Missing required fields'
+            }), 400
+        
+        conn = get_connection()
+        if not conn:
+            return jsonify({
+                'success': False,
+                'message': 'Database connection failed'
+            }), 500
+        
+        try:
+            cur = conn.cursor()
+            slots_needed = slots_for_guests(number_of_guests)
+            hold = create_hold(cur, tour_schedule_id, tour_id, slots_needed)
+            if not hold:
+                message = describe_unavailable(cur, tour_schedule_id, tour_id, slots_needed)
+                conn.rollback()
+                return jsonify({
+                    'success': False,
+                    'message': message
+                }), 409
+            
+            conn.commit()
+            hold['expires_at'] = hold['expires_at'].isoformat()
+            return jsonify({
+                'success': True,
+                'hold': hold
+            }), 201
+            
+        except Exception as e:
+            conn.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Error reserving slots: {str(e)}'
+            }), 500
+        finally:
+            cur.close()
+            conn.close()
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+
+@booking_routes.route('/holds/<hold_token>', methods=['DELETE'])
+def release_slot_hold(hold_token):
+    """Release a checkout hold early (e.g. payment cancelled)."""
+    try:
+        conn = get_connection()
+        if not conn:
+            return jsonify({
+                'success': False,
+                'message': 'Database connection failed'
+            }), 500
+        
+        try:
+            cur = conn.cursor()
+            released = release_hold(cur, hold_token)
+            conn.commit()
+            if not released:
+                return jsonify({
+                    'success': False,
+                    'message': 'Hold not found or no longer active'
+                }), 404
+            return jsonify({
+                'success': True,
+                'message': 'Hold released'
+            }), 200
+            
+        except Exception as e:
+            conn.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Error releasing hold: {str(e)}'
+            }), 500
+        finally:
+            cur.close()
+            conn.close()
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
+
 @booking_routes.route('/admin/all', methods=['GET'])
 def get_all_bookings():
     """Get all bookings for admin dashboard with revenue calculations"""
@@ -416,9 +376,10 @@ def get_all_bookings():
                     b.notes, b.status, b.created_at, b.promotion_code,
                     t.name as tour_name, t.duration, t.destination_city_id,
                     dc.name as destination_city_name,
-                    (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image
+                    tls.primary_image as tour_image
                 FROM bookings b
                 LEFT JOIN tours_admin t ON b.tour_id = t.id
+                LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                 LEFT JOIN cities dc ON t.destination_city_id = dc.id
                 ORDER BY b.created_at DESC
             """)
@@ -506,10 +467,11 @@ def get_user_bookings(user_id):
                     b.notes, b.status, b.created_at, b.promotion_code,
                     t.name as tour_name, t.duration, t.destination_city_id,
                     dc.name as destination_city_name,
-                    (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image,
+                    tls.primary_image as tour_image,
                     ts.status as tour_schedule_status
                 FROM bookings b
                 LEFT JOIN tours_admin t ON b.tour_id = t.id
+                LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                 LEFT JOIN cities dc ON t.destination_city_id = dc.id
                 LEFT JOIN tour_schedules ts ON b.tour_schedule_id = ts.id
                 WHERE b.user_id = %s
@@ -585,9 +547,10 @@ def get_booking(booking_id):
                     t.name as tour_name, t.duration, t.description,
                     t.destination_city_id, dc.name as destination_city_name,
                     t.departure_city_id, dpc.name as departure_city_name,
-                    (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image
+                    tls.primary_image as tour_image
                 FROM bookings b
                 LEFT JOIN tours_admin t ON b.tour_id = t.id
+                LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                 LEFT JOIN cities dc ON t.destination_city_id = dc.id
                 LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
                 WHERE b.id = %s
@@ -672,8 +635,7 @@ def get_partner_bookings(partner_id):
             
             # Build query based on partner type - calculate partner's share from 90% partner pool
             if partner_type == 'accommodation':
-                # Get bookings where this partner's room was actually selected in customizations
-                # Note: room_id can be either a string like "deluxe_6" or an integer like 51
+                # Get bookings where this partner's room was actually selected
                 query = """
                     SELECT DISTINCT
                         b.id, b.tour_id, b.user_id, b.full_name, b.email, b.phone,
@@ -682,39 +644,22 @@ def get_partner_bookings(partner_id):
                         b.notes, b.status, b.created_at, b.promotion_code,
                         t.name as tour_name, t.duration, t.destination_city_id,
                         dc.name as destination_city_name,
-                        (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image,
+                        tls.primary_image as tour_image,
                         0 as partner_service_cost,
                         0 as total_accommodation_cost,
                         0 as total_restaurant_cost,
                         0 as total_transportation_cost
                     FROM bookings b
                     INNER JOIN tours_admin t ON b.tour_id = t.id
+                    LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                     LEFT JOIN cities dc ON t.destination_city_id = dc.id
-                    WHERE b.customizations IS NOT NULL
-                    AND (
-                        (b.customizations ? 'default_room' 
-                         AND b.customizations->'default_room' ? 'room_id'
-                         AND EXISTS (
-                            SELECT 1 FROM accommodation_rooms ar
-                            INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-                            WHERE (ar.id::text = b.customizations->'default_room'->>'room_id'
-                                   OR ar.room_type = b.customizations->'default_room'->>'room_id')
-                            AND acs.partner_id = %s
-                        ))
-                        OR
-                        (b.customizations ? 'room_upgrade'
-                         AND b.customizations->'room_upgrade' ? 'room_id'
-                         AND EXISTS (
-                            SELECT 1 FROM accommodation_rooms ar
-                            INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-                            WHERE (ar.id::text = b.customizations->'room_upgrade'->>'room_id'
-                                   OR ar.room_type = b.customizations->'room_upgrade'->>'room_id')
-                            AND acs.partner_id = %s
-                        ))
+                    WHERE b.id IN (
+                        SELECT bi.booking_id FROM booking_items bi
+                        WHERE bi.partner_id = %s AND bi.item_type = 'room'
                     )
                     ORDER BY b.created_at DESC
                 """
-                cur.execute(query, (partner_id, partner_id))
+                cur.execute(query, (partner_id,))
             elif partner_type == 'restaurant':
                 # Get bookings with revenue calculation for restaurant partner
                 query = """
@@ -725,7 +670,7 @@ def get_partner_bookings(partner_id):
                         b.notes, b.status, b.created_at, b.promotion_code,
                         t.name as tour_name, t.duration, t.destination_city_id,
                         dc.name as destination_city_name,
-                        (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image,
+                        tls.primary_image as tour_image,
                         COALESCE((
                             SELECT SUM(rsm.total_price)
                             FROM tour_selected_set_meals tssm
@@ -752,6 +697,7 @@ def get_partner_bookings(partner_id):
                         ), 0) as total_transportation_cost
                     FROM bookings b
                     INNER JOIN tours_admin t ON b.tour_id = t.id
+                    LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                     LEFT JOIN cities dc ON t.destination_city_id = dc.id
                     WHERE t.id IN (
                         SELECT DISTINCT ts.tour_id
@@ -772,7 +718,7 @@ def get_partner_bookings(partner_id):
                         b.notes, b.status, b.created_at, b.promotion_code,
                         t.name as tour_name, t.duration, t.destination_city_id,
                         dc.name as destination_city_name,
-                        (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image,
+                        tls.primary_image as tour_image,
                         COALESCE((
                             SELECT SUM(ts2.service_cost)
                             FROM tour_services ts2
@@ -797,6 +743,7 @@ def get_partner_bookings(partner_id):
                         ), 0) as total_transportation_cost
                     FROM bookings b
                     INNER JOIN tours_admin t ON b.tour_id = t.id
+                    LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                     LEFT JOIN cities dc ON t.destination_city_id = dc.id
                     WHERE t.id IN (
                         SELECT DISTINCT ts.tour_id
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.image_derivatives import image_variant_url, listing_variant
 from datetime import datetime
 
 favorites_routes = Blueprint('favorites', __name__)
@@ -23,10 +24,11 @@ def get_user_favorites(user_id):
                     t.name, t.duration, t.description, t.total_price, t.currency,
                     t.destination_city_id, dc.name as destination_city_name,
                     t.departure_city_id, dpc.name as departure_city_name,
-                    (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as tour_image,
+                    tls.primary_image as tour_image,
                     t.number_of_members, t.is_active, t.is_published
                 FROM favorites f
                 INNER JOIN tours_admin t ON f.tour_id = t.id
+                LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
                 LEFT JOIN cities dc ON t.destination_city_id = dc.id
                 LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
                 WHERE f.user_id = %s
@@ -50,7 +52,7 @@ def get_user_favorites(user_id):
                         'currency': row[8],
                         'destination_city': row[10] if row[10] else None,
                         'departure_city': row[12] if row[12] else None,
-                        'image': row[13],
+                        'image': image_variant_url(row[13], listing_variant(request.args)),
                         'number_of_members': row[14],
                         'is_active': row[15],
                         'is_published': row[16]
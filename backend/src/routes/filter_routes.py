@@ -1,6 +1,5 @@
 from flask import Blueprint, jsonify
-from config.database import get_connection
-from psycopg2.extras import RealDictCursor
+from src.services.reference_data import reference_response
 
 filter_routes = Blueprint('filter_routes', __name__)
 
@@ -8,29 +7,11 @@ filter_routes = Blueprint('filter_routes', __name__)
 def get_filter_data():
     """
     API GET /api/filters provides needed data to component FilterSidebar.jsx
+    (regions, provinces and tour types from the reference data cache)
     """
     try:
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cur.execute("SELECT * FROM regions ORDER BY name")
-        regions = cur.fetchall()
-        
-        cur.execute("SELECT * FROM provinces ORDER BY name")
-        provinces = cur.fetchall()
-        
-        cur.execute("SELECT * FROM tour_types ORDER BY name")
-        tour_types = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify({
-            "regions": regions,
-            "provinces": provinces,
-            "tourTypes": tour_types
-        }), 200
+        return reference_response('filters')
 
     except Exception as e:
         print(f"GETTING DATA FAILED filter: {e}")
-        return jsonify({"error": "SERVER ERROR"}), 500
\ No newline at end of file
+        return jsonify({"error": "SERVER ERROR"}), 500
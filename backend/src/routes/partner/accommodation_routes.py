@@ -10,6 +10,8 @@ Partners can manage their accommodation services including:
 
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.reference_data import reference_response
+from src.services.tour_cache import tour_ids_for_service, invalidate_tours
 from datetime import datetime
 import json
 
@@ -24,25 +26,7 @@ accommodation_bp = Blueprint('accommodation_services', __name__, url_prefix='/ap
 def get_cities_for_accommodation():
     """Get all cities for accommodation dropdown"""
     try:
-        conn = get_connection()
-        if not conn:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, code, region FROM cities ORDER BY name")
-        rows = cur.fetchall()
-        
-        cities = [{
-            'id': row[0],
-            'name': row[1],
-            'code': row[2],
-            'region': row[3]
-        } for row in rows]
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify(cities), 200
+        return reference_response('city_list')
     except Exception as e:
         print(f"Error fetching cities: {e}")
         return jsonify({'error': str(e)}), 500
@@ -376,7 +360,10 @@ def update_accommodation(accommodation_id):
             accommodation_id
         ))
         
+        affected_tours = tour_ids_for_service(cur, 'accommodation', accommodation_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -418,10 +405,13 @@ def delete_accommodation(accommodation_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'accommodation', accommodation_id)
+        
         # Delete accommodation (cascade will handle rooms and images)
         cur.execute("DELETE FROM accommodation_services WHERE id = %s", (accommodation_id,))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -669,7 +659,10 @@ def update_room(accommodation_id, room_id):
                     VALUES ('accommodation_room', %s, %s, %s)
                 """, (room_id, image_url, idx))
         
+        affected_tours = tour_ids_for_service(cur, 'accommodation_room', room_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -706,10 +699,13 @@ def delete_room(accommodation_id, room_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'accommodation_room', room_id)
+        
         # Delete room (cascade will handle images)
         cur.execute("DELETE FROM accommodation_rooms WHERE id = %s AND accommodation_id = %s", (room_id, accommodation_id))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
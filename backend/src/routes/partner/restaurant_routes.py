@@ -10,6 +10,8 @@ Partners can manage their restaurant services including:
 
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.reference_data import reference_response
+from src.services.tour_cache import tour_ids_for_service, invalidate_tours
 from datetime import datetime
 import json
 
@@ -24,25 +26,7 @@ restaurant_bp = Blueprint('restaurant_services', __name__, url_prefix='/api/part
 def get_cities_for_restaurant():
     """Get all cities for restaurant dropdown"""
     try:
-        conn = get_connection()
-        if not conn:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, code, region FROM cities ORDER BY name")
-        rows = cur.fetchall()
-        
-        cities = [{
-            'id': row[0],
-            'name': row[1],
-            'code': row[2],
-            'region': row[3]
-        } for row in rows]
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify(cities), 200
+        return reference_response('city_list')
     except Exception as e:
         print(f"Error fetching cities: {e}")
         return jsonify({'error': str(e)}), 500
@@ -431,7 +415,10 @@ def update_restaurant(restaurant_id):
                     VALUES ('restaurant', %s, %s, %s, %s)
                 """, (restaurant_id, image_url, idx == 0, idx))
         
+        affected_tours = tour_ids_for_service(cur, 'restaurant', restaurant_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -473,10 +460,13 @@ def delete_restaurant(restaurant_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'restaurant', restaurant_id)
+        
         # Delete restaurant (cascade handles menu items and images)
         cur.execute("DELETE FROM restaurant_services WHERE id = %s", (restaurant_id,))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -716,7 +706,10 @@ def update_menu_item(restaurant_id, menu_item_id):
             menu_item_id
         ))
         
+        affected_tours = tour_ids_for_service(cur, 'menu_item', menu_item_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -759,10 +752,13 @@ def delete_menu_item(restaurant_id, menu_item_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'menu_item', menu_item_id)
+        
         # Delete menu item
         cur.execute("DELETE FROM restaurant_menu_items WHERE id = %s", (menu_item_id,))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -1026,7 +1022,10 @@ def update_set_meal(restaurant_id, set_meal_id):
                 restaurant_id
             ))
         
+        affected_tours = tour_ids_for_service(cur, 'set_meal', set_meal_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -1069,10 +1068,13 @@ def delete_set_meal(restaurant_id, set_meal_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'set_meal', set_meal_id)
+        
         # Delete set meal (cascade will delete set_meal_items)
         cur.execute("DELETE FROM restaurant_set_meals WHERE id = %s", (set_meal_id,))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
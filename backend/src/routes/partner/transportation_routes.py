@@ -10,6 +10,7 @@ Partners can manage their transportation services including:
 
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.tour_cache import tour_ids_for_service, invalidate_tours
 from datetime import datetime, timedelta
 
 transportation_bp = Blueprint('transportation_services', __name__, url_prefix='/api/partner/transportation')
@@ -346,7 +347,10 @@ def update_transportation_service(service_id):
                     VALUES ('transportation', %s, %s, %s, %s)
                 """, (service_id, image_url, idx == 0, idx))
         
+        affected_tours = tour_ids_for_service(cur, 'transportation', service_id)
+        
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
@@ -388,10 +392,13 @@ def delete_transportation_service(service_id):
             conn.close()
             return jsonify({'error': 'Unauthorized'}), 403
         
+        affected_tours = tour_ids_for_service(cur, 'transportation', service_id)
+        
         # Delete service (cascade handles images)
         cur.execute("DELETE FROM transportation_services WHERE id = %s", (service_id,))
         
         conn.commit()
+        invalidate_tours(affected_tours)
         cur.close()
         conn.close()
         
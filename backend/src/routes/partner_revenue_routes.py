@@ -5,9 +5,61 @@ Partners can view their revenue from completed tours.
 
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.booking_items import ITEM_PARTNER_TYPES
+from src.services.partner_summary import get_partner_summaries
 
 partner_revenue_routes = Blueprint('partner_revenue', __name__)
 
+# partner_type -> booking_items.item_type
+PARTNER_ITEM_TYPES = {partner_type: item_type for item_type, partner_type in ITEM_PARTNER_TYPES.items()}
+
+
+def _revenue_totals(cur, partner_id):
+    """(total_pending, total_paid) from the monthly rollup."""
+    cur.execute("""
+        SELECT COALESCE(SUM(revenue_pending), 0), COALESCE(SUM(revenue_paid), 0)
+        FROM partner_revenue_monthly
+        WHERE partner_id = %s
+    """, (partner_id,))
+    pending, paid = cur.fetchone()
+    return float(pending), float(paid)
+
+
+def _current_month_revenue(cur, partner_id):
+    """Pending + paid revenue recorded this month, from the monthly rollup."""
+    cur.execute("""
+        SELECT COALESCE(SUM(revenue_pending + revenue_paid), 0)
+        FROM partner_revenue_monthly
+        WHERE partner_id = %s AND month = date_trunc('month', CURRENT_DATE)::DATE
+    """, (partner_id,))
+    return float(cur.fetchone()[0])
+
+
+def _services_count(cur, partner_id):
+    """Rooms, set meals or vehicles of the partner, from partner_dashboard_summary."""
+    cur.execute("""
+        SELECT services_count FROM partner_dashboard_summary WHERE partner_id = %s
+    """, (partner_id,))
+    row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def _active_bookings_count(cur, partner_id, partner_type):
+    """Confirmed bookings with an item (room, meal, transport leg) from this partner."""
+    item_type = PARTNER_ITEM_TYPES.get(partner_type)
+    if not item_type:
+        return 0
+    cur.execute("""
+        SELECT COUNT(DISTINCT bi.booking_id)
+        FROM booking_items bi
+        INNER JOIN bookings b ON b.id = bi.booking_id
+        WHERE bi.partner_id = %s
+          AND bi.item_type = %s
+          AND b.status = 'confirmed'
+    """, (partner_id, item_type))
+    row = cur.fetchone()
+    return int(row[0]) if row and row[0] else 0
+
 
 @partner_revenue_routes.route('/partner/<int:partner_id>/revenue', methods=['GET'])
 def get_partner_revenue(partner_id):
@@ -40,16 +92,9 @@ def get_partner_revenue(partner_id):
         
         rows = cur.fetchall()
         revenues = []
-        total_pending = 0
-        total_paid = 0
         
         for row in rows:
             amount = float(row[2])
-            if row[3] == 'pending':
-                total_pending += amount
-            elif row[3] == 'paid':
-                total_paid += amount
-                
             revenues.append({
                 'id': row[0],
                 'schedule_id': row[1],
@@ -62,6 +107,8 @@ def get_partner_revenue(partner_id):
                 'departure_datetime': row[8].isoformat() if row[8] else None
             })
         
+        total_pending, total_paid = _revenue_totals(cur, partner_id)
+        
         cur.close()
         conn.close()
         
@@ -90,18 +137,8 @@ def get_partner_monthly_revenue(partner_id):
         
         cur = conn.cursor()
         
-        # Get monthly revenue (current month only)
-        cur.execute("""
-            SELECT 
-                COALESCE(SUM(prp.amount), 0) as monthly_revenue
-            FROM partner_revenue_pending prp
-            WHERE prp.partner_id = %s
-                AND EXTRACT(MONTH FROM prp.created_at) = EXTRACT(MONTH FROM CURRENT_DATE)
-                AND EXTRACT(YEAR FROM prp.created_at) = EXTRACT(YEAR FROM CURRENT_DATE)
-        """, (partner_id,))
-        
-        row = cur.fetchone()
-        monthly_revenue = float(row[0]) if row and row[0] else 0.0
+        # Current month only
+        monthly_revenue = _current_month_revenue(cur, partner_id)
         
         cur.close()
         conn.close()
@@ -141,40 +178,8 @@ def get_partner_stats(partner_id):
         
         partner_type = partner_row[0]  # 'accommodation', 'restaurant', or 'transportation'
         
-        total_services = 0
-        
-        # Calculate total services based on partner type
-        if partner_type == 'accommodation':
-            # For accommodation: total number of rooms across all accommodations
-            cur.execute("""
-                SELECT COALESCE(SUM(ar.total_rooms), 0)
-                FROM accommodation_services acs
-                LEFT JOIN accommodation_rooms ar ON acs.id = ar.accommodation_id
-                WHERE acs.partner_id = %s
-            """, (partner_id,))
-            row = cur.fetchone()
-            total_services = int(row[0]) if row and row[0] else 0
-            
-        elif partner_type == 'restaurant':
-            # For restaurant: total number of set meals across all restaurants
-            cur.execute("""
-                SELECT COUNT(rsm.id)
-                FROM restaurant_services rs
-                LEFT JOIN restaurant_set_meals rsm ON rs.id = rsm.restaurant_id
-                WHERE rs.partner_id = %s
-            """, (partner_id,))
-            row = cur.fetchone()
-            total_services = int(row[0]) if row and row[0] else 0
-            
-        elif partner_type == 'transportation':
-            # For transportation: total number of vehicles (services)
-            cur.execute("""
-                SELECT COUNT(id)
-                FROM transportation_services
-                WHERE partner_id = %s
-            """, (partner_id,))
-            row = cur.fetchone()
-            total_services = int(row[0]) if row and row[0] else 0
+        # Rooms (accommodation), set meals (restaurant) or vehicles (transportation)
+        total_services = _services_count(cur, partner_id)
         
         cur.close()
         conn.close()
@@ -214,68 +219,7 @@ def get_partner_active_bookings(partner_id):
             return jsonify({'error': 'Partner not found'}), 404
         
         partner_type = partner_row[0]
-        active_bookings = 0
-        
-        # Count confirmed bookings based on partner type
-        # Bookings are linked through customizations JSONB field
-        if partner_type == 'accommodation':
-            # Count bookings with room upgrades from this partner's accommodations
-            cur.execute("""
-                SELECT COUNT(DISTINCT b.id)
-                FROM bookings b
-                CROSS JOIN LATERAL jsonb_extract_path(b.customizations, 'room_upgrade') AS room_upgrade
-                WHERE b.status = 'confirmed'
-                  AND room_upgrade IS NOT NULL
-                  AND EXISTS (
-                      SELECT 1 
-                      FROM accommodation_rooms ar
-                      INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-                      WHERE acs.partner_id = %s
-                        AND ar.id = (room_upgrade->>'room_id')::integer
-                  )
-            """, (partner_id,))
-            row = cur.fetchone()
-            active_bookings = int(row[0]) if row and row[0] else 0
-            
-        elif partner_type == 'restaurant':
-            # Count bookings with selected meals from this partner's restaurants
-            cur.execute("""
-                SELECT COUNT(DISTINCT b.id)
-                FROM bookings b
-                CROSS JOIN LATERAL jsonb_array_elements(
-                    COALESCE(b.customizations->'selected_meals', '[]'::jsonb)
-                ) AS meal
-                WHERE b.status = 'confirmed'
-                  AND EXISTS (
-                      SELECT 1
-                      FROM restaurant_set_meals rsm
-                      INNER JOIN restaurant_services rs ON rsm.restaurant_id = rs.id
-                      WHERE rs.partner_id = %s
-                        AND rsm.id = (meal->>'meal_id')::integer
-                  )
-            """, (partner_id,))
-            row = cur.fetchone()
-            active_bookings = int(row[0]) if row and row[0] else 0
-            
-        elif partner_type == 'transportation':
-            # Count bookings using this partner's transportation services
-            cur.execute("""
-                SELECT COUNT(DISTINCT b.id)
-                FROM bookings b
-                INNER JOIN tour_schedules ts ON b.tour_schedule_id = ts.id
-                WHERE b.status = 'confirmed'
-                  AND EXISTS (
-                      SELECT 1
-                      FROM tour_services tsv
-                      WHERE tsv.tour_id = ts.tour_id
-                        AND tsv.service_type = 'transportation'
-                        AND tsv.transportation_id IN (
-                            SELECT id FROM transportation_services WHERE partner_id = %s
-                        )
-                  )
-            """, (partner_id,))
-            row = cur.fetchone()
-            active_bookings = int(row[0]) if row and row[0] else 0
+        active_bookings = _active_bookings_count(cur, partner_id, partner_type)
         
         cur.close()
         conn.close()
@@ -292,6 +236,87 @@ def get_partner_active_bookings(partner_id):
             'message': f'Error fetching active bookings: {str(e)}'
         }), 500
 
+
+@partner_revenue_routes.route('/partner/<int:partner_id>/dashboard', methods=['GET'])
+def get_partner_dashboard(partner_id):
+    """
+    All partner dashboard widgets in one response: revenue totals, this
+    month's revenue, monthly and daily series, service count and active
+    bookings. Reads the partner rollups, so the cost does not grow with
+    the partner's revenue history.
+    Query params: months (default 12, max 36), days (default 30, max 90)
+    """
+    try:
+        months = min(max(request.args.get('months', 12, type=int), 1), 36)
+        days = min(max(request.args.get('days', 30, type=int), 1), 90)
+
+        conn = get_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT partner_type FROM users WHERE id = %s
+            """, (partner_id,))
+            partner_row = cur.fetchone()
+            if not partner_row:
+                return jsonify({'error': 'Partner not found'}), 404
+            partner_type = partner_row[0]
+
+            cur.execute("""
+                SELECT month, revenue_pending, revenue_paid, bookings
+                FROM partner_revenue_monthly
+                WHERE partner_id = %s
+                  AND month > (date_trunc('month', CURRENT_DATE) - make_interval(months => %s))::DATE
+                ORDER BY month
+            """, (partner_id, months))
+            monthly = [{
+                'month': row[0].strftime('%Y-%m'),
+                'revenue_pending': float(row[1]),
+                'revenue_paid': float(row[2]),
+                'revenue': float(row[1] + row[2]),
+                'bookings': row[3]
+            } for row in cur.fetchall()]
+
+            cur.execute("""
+                SELECT day, revenue_pending, revenue_paid, bookings
+                FROM partner_revenue_daily
+                WHERE partner_id = %s AND day > CURRENT_DATE - %s
+                ORDER BY day
+            """, (partner_id, days))
+            daily = [{
+                'day': row[0].isoformat(),
+                'revenue_pending': float(row[1]),
+                'revenue_paid': float(row[2]),
+                'revenue': float(row[1] + row[2]),
+                'bookings': row[3]
+            } for row in cur.fetchall()]
+
+            total_pending, total_paid = _revenue_totals(cur, partner_id)
+
+            return jsonify({
+                'success': True,
+                'partner_type': partner_type,
+                'total_pending': total_pending,
+                'total_paid': total_paid,
+                'total_revenue': total_pending + total_paid,
+                'monthly_revenue': _current_month_revenue(cur, partner_id),
+                'total_services': _services_count(cur, partner_id),
+                'active_bookings': _active_bookings_count(cur, partner_id, partner_type),
+                'monthly': monthly,
+                'daily': daily
+            }), 200
+        finally:
+            cur.close()
+            conn.close()
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching partner dashboard: {str(e)}'
+        }), 500
+
 @partner_revenue_routes.route('/partner-revenue/all', methods=['GET'])
 def get_all_partner_revenue():
     """Get all partners' aggregated revenue sorted by amount (highest to lowest)"""
@@ -352,65 +377,20 @@ def get_all_partner_revenue():
 @partner_revenue_routes.route('/partners/summary', methods=['GET'])
 def get_partners_summary():
     """
-    List all partners with avatar, type, and count of completed tours participated.
-    A completed tour count is derived from paid partner_revenue_pending entries
-    joined to tour_schedules -> tours_admin.
+    List all partners with avatar, type, and count of tours using their services.
+    Tour counts are precomputed (partner_dashboard_summary.support_tours) and the
+    list is cached for PARTNERS_SUMMARY_CACHE_TTL seconds.
     """
     try:
-        conn = get_connection()
-        if not conn:
-            return jsonify({'success': False, 'message': 'Database connection failed'}), 500
-
-        cur = conn.cursor()
-        try:
-            cur.execute("""
-                SELECT
-                    u.id AS partner_id,
-                    u.username AS partner_name,
-                    u.avatar_url,
-                    u.partner_type,
-                    COALESCE(tour_counts.support_tours, 0) AS support_tours
-                FROM users u
-                LEFT JOIN (
-                    SELECT
-                        p.id AS partner_id,
-                        COUNT(DISTINCT ts.tour_id) AS support_tours
-                    FROM users p
-                    LEFT JOIN tour_services ts ON
-                        (ts.accommodation_id IN (SELECT id FROM accommodation_services WHERE partner_id = p.id))
-                        OR (ts.restaurant_id IN (SELECT id FROM restaurant_services WHERE partner_id = p.id))
-                        OR (ts.transportation_id IN (SELECT id FROM transportation_services WHERE partner_id = p.id))
-                    WHERE p.role = 'partner'
-                    GROUP BY p.id
-                ) tour_counts ON tour_counts.partner_id = u.id
-                WHERE u.role = 'partner'
-                ORDER BY u.username;
-            """)
-
-            rows = cur.fetchall()
-            partners = [{
-                'partner_id': row[0],
-                'partner_name': row[1],
-                'avatar_url': row[2],
-                'partner_type': row[3],
-                'support_tours': int(row[4]) if row[4] is not None else 0
-            } for row in rows]
-
-            return jsonify({
-                'success': True,
-                'partners': partners,
-                'total_partners': len(partners)
-            })
-
-        except Exception as e:
-            conn.rollback()
-            return jsonify({'success': False, 'message': f'Error fetching partners: {str(e)}'}), 500
-        finally:
-            cur.close()
-            conn.close()
+        partners = get_partner_summaries()
+        return jsonify({
+            'success': True,
+            'partners': partners,
+            'total_partners': len(partners)
+        })
 
     except Exception as e:
-        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+        return jsonify({'success': False, 'message': f'Error fetching partners: {str(e)}'}), 500
 
 
 @partner_revenue_routes.route('/partners/<int:partner_id>/detail', methods=['GET'])
@@ -454,12 +434,8 @@ def get_partner_detail(partner_id):
                     COALESCE(AVG(sr.rating), 0) AS avg_rating,
                     COUNT(sr.id) AS review_count
                 FROM service_reviews sr
-                WHERE (
-                    (sr.service_type = 'accommodation' AND sr.service_id IN (SELECT id FROM accommodation_services WHERE partner_id = %s))
-                    OR (sr.service_type = 'restaurant' AND sr.service_id IN (SELECT id FROM restaurant_services WHERE partner_id = %s))
-                    OR (sr.service_type = 'transportation' AND sr.service_id IN (SELECT id FROM transportation_services WHERE partner_id = %s))
-                );
-            """, (partner_id, partner_id, partner_id))
+                WHERE sr.partner_id = %s;
+            """, (partner_id,))
             rating_row = cur.fetchone()
             partner['rating'] = float(rating_row[0]) if rating_row and rating_row[0] is not None else 0.0
             partner['review_count'] = int(rating_row[1]) if rating_row and rating_row[1] is not None else 0
@@ -565,15 +541,11 @@ def get_partner_detail(partner_id):
                 LEFT JOIN accommodation_services acs ON sr.service_type = 'accommodation' AND sr.service_id = acs.id
                 LEFT JOIN restaurant_services rs ON sr.service_type = 'restaurant' AND sr.service_id = rs.id
                 LEFT JOIN transportation_services trs ON sr.service_type = 'transportation' AND sr.service_id = trs.id
-                WHERE (
-                    (sr.service_type = 'accommodation' AND sr.service_id IN (SELECT id FROM accommodation_services WHERE partner_id = %s))
-                    OR (sr.service_type = 'restaurant' AND sr.service_id IN (SELECT id FROM restaurant_services WHERE partner_id = %s))
-                    OR (sr.service_type = 'transportation' AND sr.service_id IN (SELECT id FROM transportation_services WHERE partner_id = %s))
-                )
+                WHERE sr.partner_id = %s
                 AND sr.deleted_at IS NULL
                 ORDER BY sr.created_at DESC
                 LIMIT 50;
-            """, (partner_id, partner_id, partner_id))
+            """, (partner_id,))
 
             reviews = []
             for r in cur.fetchall():
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from psycopg2.extras import execute_values
 from datetime import datetime
 import os
 from src.services.email_service import (
@@ -7,6 +8,9 @@ from src.services.email_service import (
     send_booking_cancellation_email,
     send_post_tour_followup_email
 )
+from src.services.email_outbox import collect_emails, notify_worker
+from src.services.booking_items import ITEM_PARTNER_TYPES, backfill_booking_items
+from src.services.tour_highlights import invalidate_highlights
 
 schedule_status_routes = Blueprint('schedule_status', __name__)
 
@@ -57,8 +61,12 @@ def start_tour_schedule(schedule_id):
 
 @schedule_status_routes.route('/schedules/<int:schedule_id>/complete', methods=['POST'])
 def complete_tour_schedule(schedule_id):
-    """Mark a tour schedule as completed and distribute revenue to partners"""
-    import json
+    """
+    Mark a tour schedule as completed and distribute revenue to partners.
+
+    Partner shares are summed from the bookings' booking_items (room, meals,
+    transport legs) in one grouped query.
+    """
     import traceback
     
     try:
@@ -71,7 +79,7 @@ def complete_tour_schedule(schedule_id):
             
             # Get tour details for this schedule
             cur.execute("""
-                SELECT ts.tour_id, t.duration, t.name
+                SELECT ts.tour_id, t.name
                 FROM tour_schedules ts
                 INNER JOIN tours_admin t ON ts.tour_id = t.id
                 WHERE ts.id = %s
@@ -81,22 +89,11 @@ def complete_tour_schedule(schedule_id):
             if not schedule_info:
                 return jsonify({'success': False, 'message': 'Schedule not found'}), 404
             
-            tour_id, duration, tour_name = schedule_info
-            
-            # Parse duration to get nights
-            try:
-                duration_int = int(duration) if isinstance(duration, str) else duration
-            except:
-                duration_int = int(''.join(filter(str.isdigit, str(duration))))
-            
-            nights = duration_int - 1
+            tour_id, tour_name = schedule_info
             
-            print(f"\n=== COMPLETING TOUR SCHEDULE {schedule_id} ===")
-            print(f"Tour ID: {tour_id}, Duration: {duration_int} days, Nights: {nights}")
-            
-            # Get all bookings for this schedule with customizations
+            # Get all confirmed bookings for this schedule
             cur.execute("""
-                SELECT b.id, b.tour_id, b.number_of_guests, b.total_price, b.customizations
+                SELECT b.id, b.tour_id, b.total_price, b.full_name, b.email
                 FROM bookings b
                 WHERE b.tour_schedule_id = %s AND b.status = 'confirmed'
             """, (schedule_id,))
@@ -106,153 +103,34 @@ def complete_tour_schedule(schedule_id):
             if not bookings:
                 return jsonify({'success': False, 'message': 'No confirmed bookings found for this schedule'}), 400
             
-            print(f"Found {len(bookings)} confirmed bookings")
+            booking_ids = [booking[0] for booking in bookings]
+            tour_ids = list({booking[1] for booking in bookings})
+            cur.execute("SELECT id, name FROM tours_admin WHERE id = ANY(%s)", (tour_ids,))
+            tour_names = dict(cur.fetchall())
             
+            # Partner pool: total price minus the 10% service fee
             total_revenue_distributed = 0
-            partner_revenues = {}  # {partner_id: {partner_type, amount}}
-            
-            # Process each booking and calculate partner revenues
             for booking in bookings:
-                booking_id, tour_id, number_of_guests, total_price, customizations = booking
-                
-                print(f"\nProcessing booking {booking_id}:")
-                print(f"  Guests: {number_of_guests}, Total: {total_price}")
-                
-                # customizations is already a dict from psycopg2 JSONB conversion
-                if not customizations:
-                    customizations = {}
-                print(f"  Customizations: {customizations}")
-                
-                # Calculate service fee (10%) - convert to float for calculations
-                total_price_float = float(total_price)
-                service_fee = total_price_float * 0.1 / 1.1
-                partner_pool = total_price_float - service_fee
-                total_revenue_distributed += partner_pool
-                
-                # --- ACCOMMODATION REVENUE ---
-                accommodation_revenue = 0
-                accommodation_partner_id = None
-                
-                # Calculate number of rooms needed (use actual_people_count if available, otherwise use number_of_guests from booking)
-                actual_guests = customizations.get('actual_people_count', number_of_guests)
-                num_rooms = max(1, (actual_guests + 1) // 2)  # Ceiling division: 2 people per room
-                
-                # Try to get from customizations
-                if customizations.get('room_upgrade'):
-                    room_price = customizations['room_upgrade'].get('room_price', 0)
-                    accommodation_revenue = room_price * num_rooms * nights
-                    # Get partner from room_upgrade
-                    room_id = customizations['room_upgrade'].get('room_id')
-                    if room_id:
-                        cur.execute("""
-                            SELECT acs.partner_id 
-                            FROM accommodation_rooms ar
-                            INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-                            WHERE ar.id::text = %s OR ar.room_type = %s
-                        """, (str(room_id), str(room_id)))
-                        result = cur.fetchone()
-                        if result:
-                            accommodation_partner_id = result[0]
-                            print(f"  Accommodation (upgraded): Partner {accommodation_partner_id}, {num_rooms} rooms × {nights} nights, Revenue: {accommodation_revenue}")
-                
-                elif customizations.get('default_room'):
-                    room_price = customizations['default_room'].get('room_price', 0)
-                    accommodation_revenue = room_price * num_rooms * nights
-                    room_id = customizations['default_room'].get('room_id')
-                    if room_id:
-                        cur.execute("""
-                            SELECT acs.partner_id 
-                            FROM accommodation_rooms ar
-                            INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-                            WHERE ar.id::text = %s OR ar.room_type = %s
-                        """, (str(room_id), str(room_id)))
-                        result = cur.fetchone()
-                        if result:
-                            accommodation_partner_id = result[0]
-                            print(f"  Accommodation (default): Partner {accommodation_partner_id}, {num_rooms} rooms × {nights} nights, Revenue: {accommodation_revenue}")
-                
-                # Add to partner revenues
-                if accommodation_partner_id and accommodation_revenue > 0:
-                    if accommodation_partner_id not in partner_revenues:
-                        partner_revenues[accommodation_partner_id] = {
-                            'partner_type': 'accommodation',
-                            'amount': 0
-                        }
-                    partner_revenues[accommodation_partner_id]['amount'] += accommodation_revenue
-                    print(f"  Added accommodation revenue: {accommodation_revenue} to partner {accommodation_partner_id}")
-                
-                # --- RESTAURANT REVENUE ---
-                selected_meals = customizations.get('selected_meals', [])
-                print(f"  Processing {len(selected_meals)} selected meals")
-                if selected_meals:
-                    for meal in selected_meals:
-                        day_number = meal.get('day_number')
-                        meal_session = meal.get('meal_session')
-                        
-                        # Get meal price and partner
-                        cur.execute("""
-                            SELECT rsm.total_price, rs.partner_id
-                            FROM tour_selected_set_meals tssm
-                            INNER JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-                            INNER JOIN restaurant_services rs ON rsm.restaurant_id = rs.id
-                            WHERE tssm.tour_id = %s
-                            AND tssm.day_number = %s
-                            AND tssm.meal_session = %s
-                        """, (tour_id, day_number, meal_session))
-                        
-                        meal_info = cur.fetchone()
-                        if meal_info:
-                            total_price, restaurant_partner_id = meal_info
-                            meal_revenue = total_price * number_of_guests
-                            
-                            print(f"    Meal {day_number}-{meal_session}: Partner {restaurant_partner_id}, Revenue: {meal_revenue}")
-                            
-                            if restaurant_partner_id not in partner_revenues:
-                                partner_revenues[restaurant_partner_id] = {
-                                    'partner_type': 'restaurant',
-                                    'amount': 0
-                                }
-                            partner_revenues[restaurant_partner_id]['amount'] += meal_revenue
-                        else:
-                            print(f"    Meal {day_number}-{meal_session}: NOT FOUND in database")
-                
-                # --- TRANSPORTATION REVENUE ---
-                transport_options = customizations.get('transport_options', {})
-                outbound = transport_options.get('outbound', False)
-                return_trip = transport_options.get('return', False)
-                trips_selected = (1 if outbound else 0) + (1 if return_trip else 0)
-                
-                print(f"  Transportation: Outbound={outbound}, Return={return_trip}, Trips={trips_selected}")
-                
-                if trips_selected > 0:
-                    # Get transportation service
-                    cur.execute("""
-                        SELECT trs.base_price, trs.partner_id
-                        FROM tour_services ts
-                        INNER JOIN transportation_services trs ON ts.transportation_id = trs.id
-                        WHERE ts.tour_id = %s AND ts.service_type = 'transportation'
-                        LIMIT 1
-                    """, (tour_id,))
-                    
-                    transport_info = cur.fetchone()
-                    if transport_info:
-                        one_way_price, transport_partner_id = transport_info
-                        transport_revenue = float(one_way_price) * number_of_guests * trips_selected
-                        
-                        print(f"    Transport Partner {transport_partner_id}, Revenue: {transport_revenue}")
-                        
-                        if transport_partner_id not in partner_revenues:
-                            partner_revenues[transport_partner_id] = {
-                                'partner_type': 'transportation',
-                                'amount': 0
-                            }
-                        partner_revenues[transport_partner_id]['amount'] += transport_revenue
-                    else:
-                        print(f"    Transportation service NOT FOUND for tour {tour_id}")
-            
-            print(f"\n=== REVENUE SUMMARY ===")
-            print(f"Total revenue distributed: {total_revenue_distributed}")
-            print(f"Partner revenues: {partner_revenues}")
+                total_price_float = float(booking[2])
+                total_revenue_distributed += total_price_float - total_price_float * 0.1 / 1.1
+            
+            # Bookings made before booking_items existed get their items now
+            backfill_booking_items(cur, booking_ids)
+            
+            # --- REVENUE SPLIT ---
+            cur.execute("""
+                SELECT partner_id, item_type, SUM(amount)
+                FROM booking_items
+                WHERE booking_id = ANY(%s) AND partner_id IS NOT NULL AND amount > 0
+                GROUP BY partner_id, item_type
+                ORDER BY partner_id, item_type
+            """, (booking_ids,))
+            partner_revenues = {}  # {partner_id: {partner_type, amount}}
+            for partner_id, item_type, amount in cur.fetchall():
+                entry = partner_revenues.setdefault(
+                    partner_id, {'partner_type': ITEM_PARTNER_TYPES[item_type], 'amount': 0}
+                )
+                entry['amount'] += float(amount)
             
             # Update schedule status to 'completed'
             cur.execute("""
@@ -262,14 +140,6 @@ def complete_tour_schedule(schedule_id):
                 WHERE id = %s
             """, (schedule_id,))
             
-            # Get booking details before updating status (for email notifications)
-            cur.execute("""
-                SELECT b.id, b.full_name, b.email, b.tour_id
-                FROM bookings b
-                WHERE b.tour_schedule_id = %s AND b.status = 'confirmed'
-            """, (schedule_id,))
-            completed_bookings = cur.fetchall()
-            
             # Update all bookings status to 'completed'
             cur.execute("""
                 UPDATE bookings
@@ -278,39 +148,32 @@ def complete_tour_schedule(schedule_id):
             """, (schedule_id,))
             
             # Store revenue distribution records (for future payment processing)
-            for partner_id, revenue_info in partner_revenues.items():
-                # Skip if partner_id is None (shouldn't happen but safety check)
-                if partner_id is None:
-                    continue
-                    
-                cur.execute("""
+            if partner_revenues:
+                execute_values(cur, """
                     INSERT INTO partner_revenue_pending 
                     (schedule_id, partner_id, partner_type, amount, created_at)
-                    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    VALUES %s
                     ON CONFLICT (schedule_id, partner_id, partner_type) 
                     DO UPDATE SET 
                         amount = partner_revenue_pending.amount + EXCLUDED.amount,
                         updated_at = CURRENT_TIMESTAMP
-                """, (schedule_id, partner_id, revenue_info['partner_type'], revenue_info['amount']))
+                """, [
+                    (schedule_id, partner_id, info['partner_type'], info['amount'])
+                    for partner_id, info in partner_revenues.items()
+                ], template="(%s, %s, %s, %s, CURRENT_TIMESTAMP)")
             
-            # Mark all partner_revenue_pending records for this tour as 'paid'
-            # and add the amounts to partner_revenue table
+            # Add this schedule's pending amounts to each partner's revenue total
             cur.execute("""
-                SELECT partner_id, amount FROM partner_revenue_pending
+                INSERT INTO partner_revenue (partner_id, amount, created_at, updated_at)
+                SELECT partner_id, SUM(amount), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                FROM partner_revenue_pending
                 WHERE schedule_id = %s
+                GROUP BY partner_id
+                ON CONFLICT (partner_id) 
+                DO UPDATE SET 
+                    amount = partner_revenue.amount + EXCLUDED.amount,
+                    updated_at = CURRENT_TIMESTAMP
             """, (schedule_id,))
-            pending_revenues = cur.fetchall()
-            
-            for partner_id, amount in pending_revenues:
-                # Update partner_revenue table (add to existing amount)
-                cur.execute("""
-                    INSERT INTO partner_revenue (partner_id, amount, created_at, updated_at)
-                    VALUES (%s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                    ON CONFLICT (partner_id) 
-                    DO UPDATE SET 
-                        amount = partner_revenue.amount + EXCLUDED.amount,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (partner_id, amount))
             
             # Mark all records as 'paid' in partner_revenue_pending
             cur.execute("""
@@ -321,37 +184,25 @@ def complete_tour_schedule(schedule_id):
                 WHERE schedule_id = %s
             """, (schedule_id,))
             
-            conn.commit()
-            
-            # Send post-tour follow-up emails to all customers
-            for booking_row in completed_bookings:
-                booking_id, customer_name, customer_email, booking_tour_id = booking_row
-                
-                if not customer_email:
-                    continue  # Skip if no email
-                
-                # Get tour name (use the one from schedule_info or fetch if different)
-                email_tour_name = tour_name
-                if booking_tour_id != tour_id:
-                    cur.execute("SELECT name FROM tours_admin WHERE id = %s", (booking_tour_id,))
-                    tour_result = cur.fetchone()
-                    if tour_result:
-                        email_tour_name = tour_result[0]
-                
-                # Send post-tour follow-up email
-                # The email will link to the account page (/account) where users can write reviews
-                try:
-                    send_post_tour_followup_email(
-                        customer_email,
-                        customer_name or "Customer",
-                        email_tour_name
-                    )
-                    print(f"✅ Post-tour follow-up email sent to {customer_email}")
-                except Exception as e:
-                    print(f"⚠️ Failed to send post-tour follow-up email to {customer_email}: {e}")
+            # Queue post-tour follow-up emails with the completion; they link to the
+            # account page (/account) where users can write reviews
+            with collect_emails(cur):
+                for booking in bookings:
+                    booking_tour_id, customer_name, customer_email = booking[1], booking[3], booking[4]
+                    if not customer_email:
+                        continue  # Skip if no email
+                    try:
+                        send_post_tour_followup_email(
+                            customer_email,
+                            customer_name or "Customer",
+                            tour_names.get(booking_tour_id, tour_name)
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Failed to queue post-tour follow-up email to {customer_email}: {e}")
             
-            cur.close()
-            conn.close()
+            conn.commit()
+            notify_worker()
+            print(f"✅ Schedule {schedule_id} completed: {len(bookings)} bookings, {len(partner_revenues)} partners paid")
             
             return jsonify({
                 'success': True,
@@ -418,7 +269,7 @@ def cancel_tour_schedule(schedule_id):
                 UPDATE bookings
                 SET status = 'cancelled'
                 WHERE tour_schedule_id = %s AND status = 'confirmed'
-                RETURNING id
+                RETURNING id, full_name, email, total_price
             """, (schedule_id,))
             
             cancelled_bookings = cur.fetchall()
@@ -433,21 +284,10 @@ def cancel_tour_schedule(schedule_id):
             schedule_date_result = cur.fetchone()
             departure_date = schedule_date_result[0].strftime('%Y-%m-%d') if schedule_date_result and schedule_date_result[0] else "N/A"
             
-            conn.commit()
-            
-            # Send cancellation emails to all affected customers
-            for booking_row in cancelled_bookings:
-                booking_id = booking_row[0]
-                
-                # Get booking details
-                cur.execute("""
-                    SELECT b.id, b.full_name, b.email, b.total_price, b.departure_date
-                    FROM bookings b
-                    WHERE b.id = %s
-                """, (booking_id,))
-                booking = cur.fetchone()
-                
-                if booking:
+            # Queue cancellation emails to all affected customers in the same transaction;
+            # the outbox worker delivers them after commit
+            with collect_emails(cur):
+                for booking in cancelled_bookings:
                     booking_data = {
                         'booking_id': booking[0],
                         'full_name': booking[1],
@@ -456,15 +296,18 @@ def cancel_tour_schedule(schedule_id):
                         'total_price': float(booking[3]) if booking[3] else 0
                     }
                     
-                    # Send tour schedule cancelled email
                     try:
                         send_tour_schedule_cancelled_email(
                             booking[2],  # customer email
                             booking_data
                         )
-                        print(f"✅ Tour schedule cancellation email sent to {booking[2]}")
                     except Exception as e:
-                        print(f"⚠️ Failed to send cancellation email to {booking[2]}: {e}")
+                        print(f"⚠️ Failed to queue cancellation email to {booking[2]}: {e}")
+            
+            conn.commit()
+            notify_worker()
+            invalidate_highlights()
+            print(f"✅ Queued {len(cancelled_bookings)} tour schedule cancellation emails")
             
             cur.close()
             conn.close()
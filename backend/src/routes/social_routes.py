@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify, current_app, url_for
+from flask import Blueprint, request, jsonify
 from config.database import get_connection
+from src.services.image_derivatives import image_manifest, image_variant_url, listing_variant, store_upload
+from src.services.hashtag_index import hashtag_index, record_hashtag_usage
+from src.services.search_query import like_pattern, prefix_tsquery
 from datetime import datetime
 import re
 import os
-import time
 from werkzeug.utils import secure_filename
 try:
     from unidecode import unidecode
@@ -107,7 +109,9 @@ def auto_post_from_tour_review(review_id, tour_id, user_id, review_images, revie
                 UPDATE social_hashtag 
                 SET usage_count = usage_count + 1, updated_at = CURRENT_TIMESTAMP
                 WHERE hashtag = %s
+                RETURNING hashtag, usage_count, source_type
             """, (hashtag,))
+            record_hashtag_usage(cur.fetchall())
         
         if should_close_conn:
             conn.commit()
@@ -229,7 +233,9 @@ def auto_post_from_service_review(service_review_id, tour_id, user_id, review_im
                 UPDATE social_hashtag 
                 SET usage_count = usage_count + 1, updated_at = CURRENT_TIMESTAMP
                 WHERE hashtag = %s
+                RETURNING hashtag, usage_count, source_type
             """, (hashtag,))
+            record_hashtag_usage(cur.fetchall())
         
         if should_close_conn:
             conn.commit()
@@ -277,22 +283,13 @@ def _extract_hashtags(text):
     return uniq
 
 
-@social_routes.route('/posts', methods=['GET'])
-def list_posts():
-    conn = get_connection()
-    if conn is None:
-        return jsonify({"error": "Database connection failed."}), 500
-    cur = conn.cursor()
-
-    # Get current user email from request if available
-    user_email = request.headers.get('X-User-Email')
-    user_id = None
-    if user_email:
-        user_id = _get_user_id_by_email(cur, user_email)
+# Social feed page size and the number of latest comments previewed per post
+POST_FEED_DEFAULT_LIMIT = 20
+POST_FEED_MAX_LIMIT = 100
+POST_FEED_COMMENT_PREVIEW = 3
 
-    cur.execute(
-        """
-        SELECT 
+# Columns of a feed/search post row. Parameters: comment preview size, viewer user id (twice)
+FEED_POST_COLUMNS = """
             p.id, 
             p.content, 
             p.image_url, 
@@ -300,8 +297,8 @@ def list_posts():
             p.created_at, 
             u.username, 
             u.email,
-            (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id) AS like_count,
-            (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id AND c.deleted_at IS NULL) AS comment_count,
+            p.like_count,
+            p.comment_count,
             (
                 SELECT json_agg(
                     json_build_object(
@@ -310,18 +307,17 @@ def list_posts():
                         'created_at', c.created_at,
                         'author', u2.username
                     )
-                    ORDER BY c.created_at DESC
+                    ORDER BY c.created_at DESC, c.id DESC
                 )
-                FROM comments c
+                FROM (
+                    SELECT c0.id, c0.content, c0.created_at, c0.author_id
+                    FROM comments c0
+                    WHERE c0.post_id = p.id
+                        AND c0.deleted_at IS NULL
+                    ORDER BY c0.created_at DESC, c0.id DESC
+                    LIMIT %s
+                ) c
                 LEFT JOIN users u2 ON c.author_id = u2.id
-                WHERE c.post_id = p.id
-                    AND c.deleted_at IS NULL
-                    AND EXISTS (
-                        SELECT 1 FROM posts p_check 
-                        WHERE p_check.id = c.post_id 
-                            AND (p_check.deleted_at_tour_reviews IS NULL AND p_check.deleted_at_service_reviews IS NULL)
-                            AND p_check.deleted_at IS NULL
-                    )
             ) as comments,
             (
                 SELECT array_agg(t.name) 
@@ -332,48 +328,161 @@ def list_posts():
             CASE WHEN %s IS NOT NULL THEN 
                 EXISTS(SELECT 1 FROM likes l WHERE l.post_id = p.id AND l.user_id = %s)
             ELSE FALSE END as is_liked
+"""
+
+
+def _feed_post(r, image_size):
+    """Serialize a row selected with FEED_POST_COLUMNS."""
+    return {
+        "id": r[0],
+        "content": r[1],
+        "image_url": image_variant_url(r[2], image_size),
+        "image_original": r[2],
+        "image_srcset": image_manifest(r[2])['srcset'] if r[2] else None,
+        "hashtags": r[3] if r[3] else [],
+        "created_at": r[4].isoformat() if r[4] else None,
+        "author": {"username": r[5], "email": r[6]},
+        "like_count": r[7] or 0,
+        "comment_count": r[8] or 0,
+        "comments": r[9] if r[9] else [],
+        "tags": r[10] if r[10] else [],
+        "is_liked": r[11]
+    }
+
+
+def encode_feed_cursor(created_at, post_id):
+    """Keyset position of the last post on a feed page, as '<created_at ISO>,<id>'."""
+    return f"{created_at.isoformat()},{post_id}"
+
+
+def decode_feed_cursor(value):
+    """Parse a `before` value from encode_feed_cursor. Raises ValueError if malformed."""
+    try:
+        created_at, post_id = value.rsplit(',', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except Exception:
+        raise ValueError("Invalid 'before' cursor, expected '<created_at>,<id>'")
+
+
+@social_routes.route('/posts', methods=['GET'])
+def list_posts():
+    """
+    API GET /api/social/posts - newest visible posts, one page at a time.
+
+    Query params:
+    - limit: page size (default 20, max 100)
+    - before: next_before value from the previous page ('<created_at>,<id>')
+    Each post carries like_count/comment_count and a preview of its latest
+    comments (newest first, at most POST_FEED_COMMENT_PREVIEW).
+    When limit/before are given the response is
+    {'posts': [...], 'has_more': bool, 'next_before': str|None};
+    otherwise every visible post is returned as a list (legacy shape).
+    """
+    paginate = 'limit' in request.args or 'before' in request.args
+    try:
+        limit = int(request.args.get('limit') or POST_FEED_DEFAULT_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = max(1, min(limit, POST_FEED_MAX_LIMIT))
+
+    before = None
+    if request.args.get('before'):
+        try:
+            before = decode_feed_cursor(request.args['before'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    conn = get_connection()
+    if conn is None:
+        return jsonify({"error": "Database connection failed."}), 500
+    cur = conn.cursor()
+
+    # Get current user email from request if available
+    user_email = request.headers.get('X-User-Email')
+    user_id = None
+    if user_email:
+        user_id = _get_user_id_by_email(cur, user_email)
+
+    where = [
+        "p.deleted_at_tour_reviews IS NULL",
+        "p.deleted_at_service_reviews IS NULL",
+        "p.deleted_at IS NULL",
+    ]
+    # Parameters in statement order: comment preview size, is_liked user, filters, page size
+    params = [POST_FEED_COMMENT_PREVIEW, user_id, user_id]
+    if before:
+        where.append("(p.created_at, p.id) < (%s, %s)")
+        params.extend(before)
+    # Fetch one extra row to know whether another page exists (LIMIT NULL = all posts)
+    params.append(limit + 1 if paginate else None)
+
+    cur.execute(
+        f"""
+        SELECT {FEED_POST_COLUMNS}
         FROM posts p
         LEFT JOIN users u ON p.author_id = u.id
-        WHERE (p.deleted_at_tour_reviews IS NULL AND p.deleted_at_service_reviews IS NULL)
-            AND p.deleted_at IS NULL
-        ORDER BY p.created_at DESC
+        WHERE {' AND '.join(where)}
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT %s
         """,
-        (user_id, user_id)
+        params
     )
     rows = cur.fetchall()
-    posts = []
-    for r in rows:
-        posts.append({
-            "id": r[0],
-            "content": r[1],
-            "image_url": r[2],
-            "hashtags": r[3] if r[3] else [],
-            "created_at": r[4].isoformat() if len(r) > 4 and r[4] else None,
-            "author": {"username": r[5] if len(r) > 5 else None, "email": r[6] if len(r) > 6 else None},
-            "like_count": r[7] if len(r) > 7 else 0,
-            "comment_count": r[8] if len(r) > 8 else 0,
-            "comments": r[9] if len(r) > 9 and r[9] else [],
-            "tags": r[10] if len(r) > 10 and r[10] else [],
-            "is_liked": r[11] if len(r) > 11 else False
-        })
-
     cur.close()
     conn.close()
-    return jsonify(posts)
+
+    image_size = listing_variant(request.args)
+    if not paginate:
+        return jsonify([_feed_post(r, image_size) for r in rows])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_before = encode_feed_cursor(rows[-1][4], rows[-1][0]) if has_more else None
+    posts = [_feed_post(r, image_size) for r in rows]
+    return jsonify({"posts": posts, "has_more": has_more, "next_before": next_before})
+
+
+POST_SEARCH_DEFAULT_LIMIT = 20
+POST_SEARCH_MAX_LIMIT = 50
+POST_SEARCH_HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2'
 
 
 @social_routes.route('/posts/search', methods=['GET'])
 def search_posts():
+    """
+    API GET /api/social/posts/search?q= - ranked, accent-insensitive post search.
+
+    - q: words to find in post content and hashtags ("da nang" matches "Đà Nẵng"),
+      or '#tag' to search hashtags only
+    - limit: page size (default 20, max 50), offset: number of results to skip
+    Content matches use the posts.search_vector full-text index (word prefixes)
+    and pg_trgm on posts.search_text for arbitrary substrings. Each result
+    includes `highlight`, the matching content fragments wrapped in <mark>.
+    When limit/offset are given the response is
+    {'posts': [...], 'has_more': bool, 'next_offset': int|None};
+    otherwise every match is returned as a list (legacy shape).
+    """
     conn = None
     cur = None
+    query = request.args.get('q', '').lower().strip()
     try:
-        # Input validation
-        query = request.args.get('q', '').lower().strip()
-        
         # Return empty results for invalid queries
         if not query or query in ['#', '@', '#@', '@#']:
             return jsonify([])
-            
+
+        paginate = 'limit' in request.args or 'offset' in request.args
+        try:
+            limit = int(request.args.get('limit') or POST_SEARCH_DEFAULT_LIMIT)
+            offset = max(0, int(request.args.get('offset') or 0))
+        except ValueError:
+            return jsonify({"error": "Invalid limit or offset"}), 400
+        limit = max(1, min(limit, POST_SEARCH_MAX_LIMIT))
+
+        is_hashtag = query.startswith('#')
+        term = query[1:].strip() if is_hashtag else query
+        if not term:  # If only '#' was entered
+            return jsonify([])
+
         # Database connection
         conn = get_connection()
         if conn is None:
@@ -387,118 +496,75 @@ def search_posts():
         if user_email:
             user_id = _get_user_id_by_email(cur, user_email)
 
-        base_sql = """
-            WITH post_comments AS (
-                SELECT c.post_id,
-                    COALESCE(
-                        json_agg(
-                            json_build_object(
-                                'id', c.id,
-                                'content', c.content,
-                                'created_at', c.created_at::text,
-                                'author', u2.username
-                            ) ORDER BY c.created_at DESC
-                        ) FILTER (WHERE c.id IS NOT NULL 
-                            AND EXISTS (
-                                SELECT 1 FROM posts p_check 
-                                WHERE p_check.id = c.post_id 
-                                    AND (p_check.deleted_at_tour_reviews IS NULL AND p_check.deleted_at_service_reviews IS NULL)
-                            )),
-                        '[]'
-                    )::jsonb AS comments
-                FROM posts p_base
-                LEFT JOIN comments c ON c.post_id = p_base.id
-                LEFT JOIN users u2 ON c.author_id = u2.id
-                WHERE (p_base.deleted_at_tour_reviews IS NULL AND p_base.deleted_at_service_reviews IS NULL)
-                    AND p_base.deleted_at IS NULL
-                    AND c.deleted_at IS NULL
-                GROUP BY c.post_id
-            ),
-            post_tags_data AS (
-                SELECT pt.post_id,
-                    COALESCE(
-                        json_agg(t.name) FILTER (WHERE t.id IS NOT NULL),
-                        '[]'
-                    )::jsonb AS tags
-                FROM posts p_base
-                LEFT JOIN post_tags pt ON pt.post_id = p_base.id
-                LEFT JOIN tags t ON t.id = pt.tag_id
-                GROUP BY pt.post_id
-            )
-            SELECT DISTINCT 
-                p.id, 
-                p.content, 
-                p.image_url,
-                p.hashtags,
-                p.created_at, 
-                u.username, 
-                u.email,
-                COALESCE((SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id), 0) AS like_count,
-                COALESCE((SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id 
-                    AND c.deleted_at IS NULL
-                    AND EXISTS (
-                        SELECT 1 FROM posts p_check 
-                        WHERE p_check.id = c.post_id 
-                            AND (p_check.deleted_at_tour_reviews IS NULL AND p_check.deleted_at_service_reviews IS NULL)
-                    )), 0) AS comment_count,
-                COALESCE(pc.comments, '[]'::jsonb) as comments,
-                COALESCE(ptd.tags, '[]'::jsonb) as tags,
-                CASE WHEN %s IS NOT NULL THEN 
-                    EXISTS(SELECT 1 FROM likes l WHERE l.post_id = p.id AND l.user_id = %s)
-                ELSE FALSE END as is_liked
-            FROM posts p
-            LEFT JOIN users u ON p.author_id = u.id
-            LEFT JOIN post_comments pc ON pc.post_id = p.id
-            LEFT JOIN post_tags_data ptd ON ptd.post_id = p.id
-            WHERE (p.deleted_at_tour_reviews IS NULL AND p.deleted_at_service_reviews IS NULL)
-                AND p.deleted_at IS NULL
-        """
-
-        if query.startswith('#'):
-            # Search by hashtag - search in hashtags column in posts table
-            tag = query[1:]  # Remove the # symbol
-            if not tag.strip():  # If only '#' was entered
-                return jsonify([])
-                
-            sql = base_sql + """
-                AND (
-                    EXISTS (
-                        SELECT 1 FROM unnest(p.hashtags) AS hashtag
-                        WHERE LOWER(hashtag) LIKE %s
-                    )
+        if is_hashtag:
+            # Hashtag search: substring of a post hashtag or a legacy post_tags tag
+            match_sql = """
+                (
+                    p.search_tags LIKE sq.pattern
                     OR EXISTS (
                         SELECT 1 FROM post_tags pt2
-                        JOIN tags t ON t.id = pt2.tag_id
+                        JOIN tags t2 ON t2.id = pt2.tag_id
                         WHERE pt2.post_id = p.id
-                        AND LOWER(t.name) LIKE %s
+                            AND lower(f_unaccent(t2.name)) LIKE sq.pattern
                     )
                 )
-                ORDER BY p.created_at DESC
             """
-            search_pattern = f"%{tag.strip()}%"
-            cur.execute(sql, (user_id, user_id, search_pattern, search_pattern))
+            rank_sql = "word_similarity(sq.norm, COALESCE(p.search_tags, ''))"
         else:
-            # Search in post content
-            sql = base_sql + """
-                AND LOWER(p.content) LIKE %s
-                ORDER BY p.created_at DESC
-            """
-            cur.execute(sql, (user_id, user_id, f"%{query}%"))
-
-        posts = cur.fetchall()
-        
-        return jsonify([{
-            'id': post[0],
-            'content': post[1],
-            'image_url': post[2],
-            'hashtags': post[3] if post[3] else [],
-            'created_at': post[4].isoformat() if len(post) > 4 and post[4] else None,
-            'author': {'username': post[5] if len(post) > 5 else None, 'email': post[6] if len(post) > 6 else None},
-            'like_count': post[7] if len(post) > 7 else 0,
-            'comment_count': post[8] if len(post) > 8 else 0,
-            'comments': post[9] if len(post) > 9 and post[9] else [],
-            'tags': post[10] if len(post) > 10 and post[10] else []
-        } for post in posts])
+            match_sql = "(p.search_vector @@ sq.tsq OR p.search_text LIKE sq.pattern)"
+            rank_sql = "ts_rank_cd(p.search_vector, sq.tsq) + word_similarity(sq.norm, COALESCE(p.search_text, ''))"
+
+        # Rank and page over the indexes first; comments, tags and highlights
+        # are only built for the posts on the returned page
+        cur.execute(f"""
+            WITH sq AS (
+                SELECT to_tsquery('vietnamese_unaccent', %s) AS tsq,
+                       lower(f_unaccent(%s)) AS norm,
+                       lower(f_unaccent(%s)) AS pattern
+            ),
+            page AS (
+                SELECT p.id, {rank_sql} AS rank
+                FROM posts p, sq
+                WHERE (p.deleted_at_tour_reviews IS NULL AND p.deleted_at_service_reviews IS NULL)
+                    AND p.deleted_at IS NULL
+                    AND {match_sql}
+                ORDER BY rank DESC, p.created_at DESC, p.id DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT {FEED_POST_COLUMNS},
+                ts_headline('vietnamese_unaccent', COALESCE(p.content, ''), sq.tsq, %s) AS highlight
+            FROM page
+            JOIN posts p ON p.id = page.id
+            LEFT JOIN users u ON p.author_id = u.id
+            CROSS JOIN sq
+            ORDER BY page.rank DESC, p.created_at DESC, p.id DESC
+        """, (
+            prefix_tsquery(term), term, like_pattern(term),
+            # One extra row tells whether another page exists (LIMIT NULL = all matches)
+            limit + 1 if paginate else None, offset,
+            POST_FEED_COMMENT_PREVIEW, user_id, user_id,
+            POST_SEARCH_HEADLINE_OPTIONS,
+        ))
+
+        rows = cur.fetchall()
+        has_more = paginate and len(rows) > limit
+        if paginate:
+            rows = rows[:limit]
+        image_size = listing_variant(request.args)
+
+        posts = []
+        for row in rows:
+            post = _feed_post(row, image_size)
+            post['highlight'] = row[12]
+            posts.append(post)
+
+        if paginate:
+            return jsonify({
+                'posts': posts,
+                'has_more': has_more,
+                'next_offset': offset + limit if has_more else None
+            })
+        return jsonify(posts)
 
     except Exception as e:
         import traceback
@@ -524,8 +590,10 @@ def search_posts():
 
 @social_routes.route('/upload', methods=['POST'])
 def upload_image():
-    """Accept a single image file (multipart/form-data, field name 'image'), save it to
-    backend/static/uploads and return a public URL.
+    """Accept a single image file (multipart/form-data, field name 'image'), store it in
+    the blob store and return its public URL plus responsive versions:
+    {"url": ..., "images": {"original", "thumbnail", "medium", "large", "srcset"}}.
+    The WebP derivatives are generated in the background.
     """
     if 'image' not in request.files:
         return jsonify({"error": "No image file provided."}), 400
@@ -536,28 +604,20 @@ def upload_image():
 
     # Basic security: secure the filename and restrict extensions
     filename = secure_filename(file.filename)
-    allowed_ext = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+    allowed_ext = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg',
+                   '.gif': 'image/gif', '.webp': 'image/webp'}
     root, ext = os.path.splitext(filename.lower())
     if ext not in allowed_ext:
         return jsonify({"error": "Unsupported file type."}), 400
 
-    # Ensure uploads directory exists inside the Flask static folder
-    uploads_dir = os.path.join(current_app.static_folder, 'uploads')
-    os.makedirs(uploads_dir, exist_ok=True)
-
-    # Make filename unique
-    ts = int(time.time() * 1000)
-    filename = f"{root}_{ts}{ext}"
-    save_path = os.path.join(uploads_dir, filename)
-
     try:
-        file.save(save_path)
+        path = store_upload(file.read(), allowed_ext[ext])
     except Exception as e:
         return jsonify({"error": "Failed to save file.", "details": str(e)}), 500
 
-    # Build external URL to static/uploads/<filename>
-    file_url = url_for('static', filename=f'uploads/{filename}', _external=True)
-    return jsonify({"url": file_url}), 201
+    # Absolute URL, like the previous static/uploads links
+    file_url = request.host_url.rstrip('/') + path
+    return jsonify({"url": file_url, "images": image_manifest(file_url)}), 201
 
 
 @social_routes.route('/posts', methods=['POST'])
@@ -611,7 +671,9 @@ def create_post():
             UPDATE social_hashtag 
             SET usage_count = usage_count + 1, updated_at = CURRENT_TIMESTAMP
             WHERE LOWER(hashtag) = LOWER(%s)
+            RETURNING hashtag, usage_count, source_type
         """, (f'#{hashtag_clean}',))
+        record_hashtag_usage(cur.fetchall())
         
         # Also update old tags table for backward compatibility
         tag_lower = hashtag_clean.lower()
@@ -663,7 +725,7 @@ def get_post(post_id):
             p.created_at, 
             u.username, 
             u.email,
-            (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id) AS like_count,
+            p.like_count,
             (SELECT array_agg(t.name) FROM tags t 
                 JOIN post_tags pt ON t.id = pt.tag_id 
                 WHERE pt.post_id = p.id) AS tags,
@@ -714,6 +776,7 @@ def get_post(post_id):
         "id": post[0],
         "content": post[1],
         "image_url": post[2],
+        "images": image_manifest(post[2]) if post[2] else None,
         "hashtags": post[3] if post[3] else [],
         "created_at": post[4].isoformat() if post[4] else None,
         "author": {"username": post[5], "email": post[6]},
@@ -962,12 +1025,15 @@ def posts_by_tag(tag_name):
         (tag_id,)
     )
     rows = cur.fetchall()
+    image_size = listing_variant(request.args)
     posts = []
     for r in rows:
         posts.append({
             "id": r[0],
             "content": r[1],
-            "image_url": r[2],
+            "image_url": image_variant_url(r[2], image_size),
+            "image_original": r[2],
+            "image_srcset": image_manifest(r[2])['srcset'] if r[2] else None,
             "hashtags": r[3] if r[3] else [],
             "created_at": r[4].isoformat() if r[4] else None,
             "author": {"username": r[5], "email": r[6]},
@@ -984,50 +1050,19 @@ def posts_by_tag(tag_name):
 
 @social_routes.route('/hashtags/search', methods=['GET'])
 def search_hashtags():
-    """Search hashtags from social_hashtag table, sorted by usage count (highest first)."""
+    """
+    Autocomplete hashtags, sorted by usage count (highest first).
+    Served from the in-memory hashtag index: matches hashtags having a word
+    that starts with `q`, ignoring case and Vietnamese accents.
+    """
     query = request.args.get('q', '').strip()
     limit = request.args.get('limit', 20, type=int)
     
-    conn = get_connection()
-    if conn is None:
-        return jsonify({"error": "Database connection failed."}), 500
-    
-    cur = conn.cursor()
-    
     try:
-        if query:
-            # Search hashtags that start with or contain the query
-            cur.execute("""
-                SELECT hashtag, usage_count, source_type
-                FROM social_hashtag
-                WHERE LOWER(hashtag) LIKE LOWER(%s)
-                ORDER BY usage_count DESC, hashtag ASC
-                LIMIT %s
-            """, (f"%{query}%", limit))
-        else:
-            # Return top hashtags by usage
-            cur.execute("""
-                SELECT hashtag, usage_count, source_type
-                FROM social_hashtag
-                ORDER BY usage_count DESC, hashtag ASC
-                LIMIT %s
-            """, (limit,))
-        
-        hashtags = []
-        for row in cur.fetchall():
-            hashtags.append({
-                'hashtag': row[0],
-                'usage_count': row[1],
-                'source_type': row[2]
-            })
-        
-        return jsonify(hashtags)
+        return jsonify(hashtag_index.complete(query, limit))
     except Exception as e:
         print(f"Error searching hashtags: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
 
 
 @social_routes.route('/hashtags/info', methods=['GET'])
@@ -3,7 +3,14 @@ from config.database import get_connection
 import jwt
 import os
 from functools import wraps
-from src.routes.social_routes import auto_post_from_tour_review, auto_post_from_service_review
+from src.routes.social_routes import (
+    auto_post_from_tour_review,
+    auto_post_from_service_review,
+    encode_feed_cursor,
+    decode_feed_cursor
+)
+from src.services.rating_stats import RATING_STATS_COLUMNS, rating_stats
+from src.services.tour_cache import invalidate_tour
 from src.services.email_service import (
     send_review_submitted_email,
     send_review_deleted_email
@@ -13,6 +20,10 @@ tour_review_routes = Blueprint('tour_review_routes', __name__)
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'your_secret_key')
 
+# Partner review inbox page size
+PARTNER_REVIEWS_DEFAULT_LIMIT = 20
+PARTNER_REVIEWS_MAX_LIMIT = 100
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -173,11 +184,13 @@ def get_tour_reviews(tour_id):
                 'service_reviews': service_reviews
             })
         
-        # Calculate average rating
-        if reviews:
-            avg_rating = sum(r['rating'] for r in reviews_list) / len(reviews_list)
-        else:
-            avg_rating = 0
+        # Count, average and star histogram from tour_rating_stats
+        cur.execute(f"""
+            SELECT {RATING_STATS_COLUMNS}
+            FROM tour_rating_stats trs
+            WHERE trs.tour_id = %s
+        """, (tour_id,))
+        review_count, avg_rating, distribution, _ = rating_stats(cur.fetchone())
         
         cur.close()
         conn.close()
@@ -185,8 +198,9 @@ def get_tour_reviews(tour_id):
         return jsonify({
             'success': True,
             'reviews': reviews_list,
-            'total_reviews': len(reviews_list),
-            'average_rating': round(avg_rating, 1)
+            'total_reviews': review_count,
+            'average_rating': avg_rating,
+            'rating_distribution': distribution
         })
         
     except Exception as e:
@@ -369,11 +383,13 @@ def create_review():
             cur.execute("""
                 INSERT INTO service_reviews 
                 (tour_review_id, tour_service_id, tour_id, user_id, booking_id, 
-                 service_type, service_id, rating, review_text, review_images)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                 service_type, service_id, rating, review_text, review_images, partner_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                        (SELECT partner_id FROM partner_service_map WHERE service_type = %s AND service_id = %s))
                 RETURNING id
             """, (review_id, tour_service_id, tour_id, request.user_id, booking_id,
-                  service_type, service_id, svc_rating, svc_review_text, svc_review_images))
+                  service_type, service_id, svc_rating, svc_review_text, svc_review_images,
+                  service_type, service_id))
             
             svc_review_id = cur.fetchone()[0]
             created_service_reviews.append({
@@ -394,6 +410,7 @@ def create_review():
                     # Don't fail the review creation if auto-posting fails
         
         conn.commit()
+        invalidate_tour(tour_id)
         
         # Get user email and username for email notification
         cur.execute("SELECT email, username FROM users WHERE id = %s", (request.user_id,))
@@ -489,12 +506,13 @@ def update_review(review_id):
         updates.append("updated_at = CURRENT_TIMESTAMP")
         params.append(review_id)
         
-        query = f"UPDATE tour_reviews SET {', '.join(updates)} WHERE id = %s RETURNING id, updated_at"
+        query = f"UPDATE tour_reviews SET {', '.join(updates)} WHERE id = %s RETURNING id, updated_at, tour_id"
         cur.execute(query, params)
         
         result = cur.fetchone()
         
         conn.commit()
+        invalidate_tour(result[2])
         cur.close()
         conn.close()
         
@@ -529,7 +547,7 @@ def delete_review(review_id):
                 UPDATE tour_reviews 
                 SET deleted_at = CURRENT_TIMESTAMP, deleted_by = %s
                 WHERE id = %s AND deleted_at IS NULL
-                RETURNING id, deleted_at
+                RETURNING id, deleted_at, tour_id
             """, (request.user_id, review_id))
         else:
             # Regular user can only soft delete their own review
@@ -537,7 +555,7 @@ def delete_review(review_id):
                 UPDATE tour_reviews 
                 SET deleted_at = CURRENT_TIMESTAMP, deleted_by = %s
                 WHERE id = %s AND user_id = %s AND deleted_at IS NULL
-                RETURNING id, deleted_at
+                RETURNING id, deleted_at, tour_id
             """, (request.user_id, review_id, request.user_id))
         
         result = cur.fetchone()
@@ -563,6 +581,7 @@ def delete_review(review_id):
         user_info = cur.fetchone()
         
         conn.commit()
+        invalidate_tour(result[2])
         
         # Send review deleted email notification
         if user_info:
@@ -790,29 +809,53 @@ def get_booking_services(booking_id):
 @tour_review_routes.route('/partner/<int:partner_id>/reviews', methods=['GET'])
 @token_required
 def get_partner_reviews(partner_id):
-    """Get all reviews containing services belonging to a partner"""
+    """
+    Reviews containing services belonging to a partner, newest first, one page at a time.
+
+    Query params:
+    - limit: page size (default 20, max 100)
+    - before: next_before value from the previous page ('<created_at>,<id>')
+    total_reviews and average_rating cover all of the partner's reviews.
+    """
     try:
         # Verify partner owns this account
         if request.user_id != partner_id:
             return jsonify({'success': False, 'message': 'Unauthorized'}), 403
         
+        try:
+            limit = int(request.args.get('limit') or PARTNER_REVIEWS_DEFAULT_LIMIT)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid limit'}), 400
+        limit = max(1, min(limit, PARTNER_REVIEWS_MAX_LIMIT))
+        
+        before = None
+        if request.args.get('before'):
+            try:
+                before = decode_feed_cursor(request.args['before'])
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+        
         conn = get_connection()
         cur = conn.cursor()
         
-        # Get user's partner type
         cur.execute("""
-            SELECT partner_type FROM users WHERE id = %s AND role = 'partner'
+            SELECT 1 FROM users WHERE id = %s AND role = 'partner'
         """, (partner_id,))
-        
-        user_row = cur.fetchone()
-        if not user_row:
+        if not cur.fetchone():
+            cur.close()
+            conn.close()
             return jsonify({'success': False, 'message': 'Partner not found'}), 404
         
-        partner_type = user_row[0]
-        
-        # Get reviews containing services belonging to this partner (exclude deleted reviews)
-        cur.execute("""
-            SELECT DISTINCT
+        # Page of tour reviews having a live service review for this partner (exclude deleted reviews)
+        keyset = ""
+        params = [partner_id]
+        if before:
+            keyset = "AND (tr.created_at, tr.id) < (%s, %s)"
+            params.extend(before)
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        cur.execute(f"""
+            SELECT
                 tr.id, tr.tour_id, tr.user_id, tr.booking_id, tr.rating,
                 tr.review_text, tr.is_anonymous, tr.review_images,
                 tr.created_at, tr.updated_at,
@@ -822,61 +865,29 @@ def get_partner_reviews(partner_id):
             JOIN users u ON tr.user_id = u.id
             JOIN tours_admin t ON tr.tour_id = t.id
             WHERE tr.deleted_at IS NULL
-            AND EXISTS (
-                SELECT 1 FROM service_reviews sr
-                JOIN tour_services ts ON sr.tour_service_id = ts.id
-                WHERE sr.tour_review_id = tr.id
-                AND sr.deleted_at IS NULL
-                AND (
-                    (ts.service_type = 'accommodation' AND ts.accommodation_id IN (
-                        SELECT id FROM accommodation_services WHERE partner_id = %s
-                    ))
-                    OR
-                    (ts.service_type = 'transportation' AND ts.transportation_id IN (
-                        SELECT id FROM transportation_services WHERE partner_id = %s
-                    ))
-                    OR
-                    (ts.service_type = 'restaurant' AND ts.restaurant_id IN (
-                        SELECT id FROM restaurant_services WHERE partner_id = %s
-                    ))
-                )
+            AND tr.id IN (
+                SELECT sr.tour_review_id FROM service_reviews sr
+                WHERE sr.partner_id = %s AND sr.deleted_at IS NULL
             )
-            ORDER BY tr.created_at DESC
-        """, (partner_id, partner_id, partner_id))
+            {keyset}
+            ORDER BY tr.created_at DESC, tr.id DESC
+            LIMIT %s
+        """, params)
         
         reviews_rows = cur.fetchall()
-        reviews_list = []
-        
-        for review in reviews_rows:
-            review_id = review[0]
-            
-            # Get service reviews for this partner only
-            if partner_type == 'accommodation':
-                service_filter = """
-                    AND ts.service_type = 'accommodation' 
-                    AND ts.accommodation_id IN (
-                        SELECT id FROM accommodation_services WHERE partner_id = %s
-                    )
-                """
-            elif partner_type == 'transportation':
-                service_filter = """
-                    AND ts.service_type = 'transportation' 
-                    AND ts.transportation_id IN (
-                        SELECT id FROM transportation_services WHERE partner_id = %s
-                    )
-                """
-            elif partner_type == 'restaurant':
-                service_filter = """
-                    AND ts.service_type = 'restaurant' 
-                    AND ts.restaurant_id IN (
-                        SELECT id FROM restaurant_services WHERE partner_id = %s
-                    )
-                """
-            else:
-                service_filter = " AND 1=0"  # No results if unknown type
-            
-            query = f"""
+        has_more = len(reviews_rows) > limit
+        reviews_rows = reviews_rows[:limit]
+        next_before = (
+            encode_feed_cursor(reviews_rows[-1][8], reviews_rows[-1][0])
+            if has_more and reviews_rows[-1][8] else None
+        )
+        
+        # This partner's service reviews for the whole page in one query
+        service_reviews_by_review = {}
+        if reviews_rows:
+            cur.execute("""
                 SELECT 
+                    sr.tour_review_id,
                     sr.id, sr.tour_service_id, sr.service_type,
                     sr.rating, sr.review_text, sr.review_images,
                     sr.created_at,
@@ -890,28 +901,26 @@ def get_partner_reviews(partner_id):
                 LEFT JOIN accommodation_services acs ON ts.accommodation_id = acs.id
                 LEFT JOIN transportation_services ts2 ON ts.transportation_id = ts2.id
                 LEFT JOIN restaurant_services rs ON ts.restaurant_id = rs.id
-                WHERE sr.tour_review_id = %s
+                WHERE sr.tour_review_id = ANY(%s)
+                AND sr.partner_id = %s
                 AND sr.deleted_at IS NULL
-                {service_filter}
-                ORDER BY sr.created_at ASC
-            """
-            
-            cur.execute(query, (review_id, partner_id))
-            service_reviews_rows = cur.fetchall()
-            
-            service_reviews = []
-            for svc_review in service_reviews_rows:
-                service_reviews.append({
-                    'id': svc_review[0],
-                    'tour_service_id': svc_review[1],
-                    'service_type': svc_review[2],
-                    'rating': svc_review[3],
-                    'review_text': svc_review[4],
-                    'review_images': svc_review[5] or [],
-                    'created_at': svc_review[6].isoformat() if svc_review[6] else None,
-                    'service_name': svc_review[7]
+                ORDER BY sr.tour_review_id, sr.created_at ASC
+            """, ([review[0] for review in reviews_rows], partner_id))
+            for svc_review in cur.fetchall():
+                service_reviews_by_review.setdefault(svc_review[0], []).append({
+                    'id': svc_review[1],
+                    'tour_service_id': svc_review[2],
+                    'service_type': svc_review[3],
+                    'rating': svc_review[4],
+                    'review_text': svc_review[5],
+                    'review_images': svc_review[6] or [],
+                    'created_at': svc_review[7].isoformat() if svc_review[7] else None,
+                    'service_name': svc_review[8]
                 })
-            
+        
+        reviews_list = []
+        for review in reviews_rows:
+            service_reviews = service_reviews_by_review.get(review[0])
             # Only include reviews that have service reviews for this partner
             if service_reviews:
                 reviews_list.append({
@@ -931,13 +940,25 @@ def get_partner_reviews(partner_id):
                     'service_reviews': service_reviews
                 })
         
+        # Totals over every page, from the partner index
+        cur.execute("""
+            SELECT COUNT(DISTINCT sr.tour_review_id), AVG(sr.rating)
+            FROM service_reviews sr
+            JOIN tour_reviews tr ON tr.id = sr.tour_review_id AND tr.deleted_at IS NULL
+            WHERE sr.partner_id = %s AND sr.deleted_at IS NULL
+        """, (partner_id,))
+        total_reviews, average_rating = cur.fetchone()
+        
         cur.close()
         conn.close()
         
         return jsonify({
             'success': True,
             'reviews': reviews_list,
-            'total_reviews': len(reviews_list)
+            'total_reviews': total_reviews,
+            'average_rating': round(float(average_rating), 1) if average_rating is not None else 0,
+            'has_more': has_more,
+            'next_before': next_before
         })
         
     except Exception as e:
@@ -1195,11 +1216,13 @@ def create_service_reviews():
                 cur.execute("""
                     INSERT INTO service_reviews (
                         tour_review_id, tour_service_id, tour_id, user_id, booking_id,
-                        service_type, service_id, rating, review_text, review_images
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        service_type, service_id, rating, review_text, review_images, partner_id
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                              (SELECT partner_id FROM partner_service_map WHERE service_type = %s AND service_id = %s))
                     RETURNING id
                 """, (tour_review_id, tour_service_id, tour_id, request.user_id, booking_id,
-                      service_type, service_id, rating, review_text, review_images))
+                      service_type, service_id, rating, review_text, review_images,
+                      service_type, service_id))
                 review_id = cur.fetchone()[0]
                 print(f"DEBUG: Inserted service review with id: {review_id}")
             
@@ -1218,6 +1241,8 @@ def create_service_reviews():
             })
         
         conn.commit()
+        # A minimal tour review may have been added, changing the tour's rating
+        invalidate_tour(tour_id)
         print(f"DEBUG: Successfully committed {len(created_reviews)} service reviews")
         cur.close()
         conn.close()
@@ -1,29 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from config.database import get_connection
-import re
+from src.services.tour_cache import document_generation, get_tour_document, store_tour_document
+from src.services.image_derivatives import image_variant_url, listing_variant
+from src.services.search_query import like_pattern, prefix_tsquery
+from src.services.tour_highlights import get_highlight_rows
+from src.services.rating_stats import RATING_STATS_COLUMNS, RATING_STATS_WIDTH, rating_stats
+from datetime import datetime
+import base64
+import json
 
 tour_routes = Blueprint('tour_routes', __name__)
 
-def extract_days_from_duration(duration):
-    """
-    Extract number of days from duration (now stored as integer)
-    Returns the duration as integer if it's a number, otherwise tries to parse from string
-    """
-    if not duration:
-        return None
-    
-    # If duration is already a number, return it
-    if isinstance(duration, (int, float)):
-        return int(duration)
-    
-    # Try to parse as integer
-    try:
-        return int(duration)
-    except (ValueError, TypeError):
-        # Fallback: try to extract from string format "3 days 2 nights"
-        match = re.search(r'(\d+)', str(duration))
-        return int(match.group(1)) if match else None
-
 @tour_routes.route('/highlights', methods=['GET'])
 def get_highlighted_tours():
     """
@@ -31,43 +18,12 @@ def get_highlighted_tours():
     Returns tours ordered by booking count (descending).
     """
     limit = request.args.get('limit', 6, type=int)
-    
-    conn = get_connection()
-    if not conn:
-        return jsonify({"error": "Database connection failed"}), 500
 
     try:
-        cur = conn.cursor()
-        
-        # Get highlighted tours with their primary image and review stats
-        # Only include tours that have at least one available schedule
-        query = """
-            SELECT 
-                th.id, th.name, th.duration, th.description,
-                th.destination_city_id, dc.name as destination_city_name,
-                th.departure_city_id, dpc.name as departure_city_name,
-                th.total_price, th.currency, th.number_of_members,
-                th.booking_count,
-                ti.image_url,
-                COALESCE(AVG(tr.rating), 0) as avg_rating,
-                COUNT(DISTINCT tr.id) as review_count
-            FROM tour_highlights th
-            LEFT JOIN cities dc ON th.destination_city_id = dc.id
-            LEFT JOIN cities dpc ON th.departure_city_id = dpc.id
-            LEFT JOIN tour_images ti ON th.id = ti.tour_id AND ti.is_primary = TRUE
-            LEFT JOIN tour_reviews tr ON th.id = tr.tour_id
-            GROUP BY th.id, th.name, th.duration, th.description,
-                     th.destination_city_id, dc.name,
-                     th.departure_city_id, dpc.name,
-                     th.total_price, th.currency, th.number_of_members,
-                     th.booking_count, ti.image_url
-            ORDER BY th.booking_count DESC, avg_rating DESC
-            LIMIT %s
-        """
-        
-        cur.execute(query, (limit,))
-        rows = cur.fetchall()
+        # Most booked published tours, served from the in-memory top-K cache
+        rows = get_highlight_rows(limit)
         
+        image_size = listing_variant(request.args)
         tours = []
         for row in rows:
             # Calculate price per person
@@ -85,14 +41,12 @@ def get_highlighted_tours():
                 'currency': row[9],
                 'number_of_members': row[10],
                 'booking_count': row[11],
-                'image': row[12] or 'https://images.unsplash.com/photo-1559592413-7cec4d0cae2b?w=800&h=600&fit=crop&q=80',
+                'image': image_variant_url(row[12], image_size) or 'https://images.unsplash.com/photo-1559592413-7cec4d0cae2b?w=800&h=600&fit=crop&q=80',
                 'rating': round(float(row[13]), 1) if row[13] else 0,
-                'reviews': row[14]
+                'reviews': row[14],
+                'rating_distribution': rating_stats(row[15:15 + RATING_STATS_WIDTH])[2]
             })
         
-        cur.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'tours': tours,
@@ -103,19 +57,165 @@ def get_highlighted_tours():
         print(f"Error getting highlighted tours: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+TOUR_LIST_DEFAULT_LIMIT = 20
+TOUR_LIST_MAX_LIMIT = 100
+TOUR_SEARCH_MAX_LIMIT = 50
+
+
+# Columns read by _tour_list_item, and the joins they need
+TOUR_LIST_COLUMNS = """
+                t.id, t.name, t.duration, t.description,
+                t.destination_city_id, dc.name as destination_city_name,
+                t.departure_city_id, dpc.name as departure_city_name,
+                t.total_price, t.currency, t.number_of_members,
+                t.created_at, t.updated_at,
+                tls.primary_image,
+                COALESCE(tls.image_count, 0) as image_count,
+                COALESCE(tls.available_schedules_count, 0) as available_schedules_count,
+                COALESCE(tls.avg_rating, 0) as avg_rating,
+                COALESCE(tls.review_count, 0) as review_count,
+                tls.next_departure,
+""" + RATING_STATS_COLUMNS
+# Index of the first column after TOUR_LIST_COLUMNS
+TOUR_LIST_WIDTH = 19 + RATING_STATS_WIDTH
+TOUR_LIST_JOINS = """
+            FROM tours_admin t
+            LEFT JOIN cities dc ON t.destination_city_id = dc.id
+            LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
+            LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
+            LEFT JOIN tour_rating_stats trs ON trs.tour_id = t.id
+"""
+
+# Accent-insensitive text match on the tours_admin search columns
+# (see migrate_tour_search): word prefixes through the tsvector, substrings
+# and misspellings through pg_trgm. Parameters: _text_match_params(q).
+TOUR_TEXT_MATCH_SQL = """(
+    t.search_vector @@ to_tsquery('vietnamese_unaccent', %s)
+    OR t.search_text LIKE lower(f_unaccent(%s))
+    OR lower(f_unaccent(%s)) <%% t.search_text
+)"""
+TOUR_TEXT_RANK_SQL = """(
+    ts_rank_cd(t.search_vector, to_tsquery('vietnamese_unaccent', %s))
+    + word_similarity(lower(f_unaccent(%s)), COALESCE(t.search_text, ''))
+)"""
+
+# Facet buckets on total_price: (key, min inclusive, max exclusive)
+TOUR_PRICE_BANDS = [
+    ('under_2m', None, 2000000),
+    ('2m_5m', 2000000, 5000000),
+    ('5m_10m', 5000000, 10000000),
+    ('over_10m', 10000000, None),
+]
+# Unpriced tours (NULL total_price) belong to no band
+TOUR_PRICE_BAND_SQL = "CASE WHEN t.total_price IS NULL THEN NULL " + " ".join(
+    f"WHEN t.total_price < {high} THEN '{key}'" for key, low, high in TOUR_PRICE_BANDS if high is not None
+) + f" ELSE '{TOUR_PRICE_BANDS[-1][0]}' END"
+
+# Listing order and keyset position; tours without created_at sort last as the epoch
+TOUR_CURSOR_EPOCH = datetime(1970, 1, 1)
+TOUR_SORT_KEY_SQL = "COALESCE(t.created_at, 'epoch'::timestamp)"
+
+
+def _text_match_params(search_query):
+    return [prefix_tsquery(search_query), like_pattern(search_query.lower()), search_query.lower()]
+
+
+def encode_tour_cursor(created_at, tour_id):
+    """Encode the keyset position (created_at, id) of the last tour on a page."""
+    raw = json.dumps([(created_at or TOUR_CURSOR_EPOCH).isoformat(), tour_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_tour_cursor(cursor):
+    """Decode a cursor from encode_tour_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, tour_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if created_at is None:
+            return TOUR_CURSOR_EPOCH, int(tour_id)
+        return datetime.fromisoformat(created_at), int(tour_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _parse_int_arg(name):
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _tour_list_item(row, image_size):
+    review_count, average, distribution, last_review_at = rating_stats(row[19:TOUR_LIST_WIDTH])
+    return {
+        'id': row[0],
+        'name': row[1],
+        'duration': row[2],
+        'description': row[3],
+        'destination_city': {'id': row[4], 'name': row[5]},
+        'departure_city': {'id': row[6], 'name': row[7]},
+        'price': round((float(row[8]) / row[10]) / 1000) * 1000 if row[8] and row[10] and row[10] > 0 else float(row[8]) if row[8] else 0,  # Price per person rounded to nearest 1,000
+        'total_price': float(row[8]) if row[8] else 0,
+        'currency': row[9],
+        'number_of_members': row[10],
+        'created_at': row[11].isoformat() if row[11] else None,
+        'updated_at': row[12].isoformat() if row[12] else None,
+        'primary_image': row[13],
+        'image': image_variant_url(row[13], image_size),  # For compatibility with TourCard component
+        'image_count': row[14],
+        'available_schedules_count': row[15],  # Number of available schedules
+        'next_departure': row[18].isoformat() if row[18] else None,
+        # For compatibility with frontend
+        'destination': row[5],  # destination city name
+        'region': None,  # Can be added later if needed
+        'province': None,  # Can be added later if needed
+        'rating': average,
+        'reviews': review_count,
+        'rating_distribution': distribution,
+        'last_review_at': last_review_at,
+        'type': []  # Can be added later with tour types
+    }
+
+
 @tour_routes.route('/', methods=['GET'])
 def get_tours():
     """
     API GET /api/tours to get published tours list with filtering.
+    `search` matches name, cities and description through the tour search
+    index (accent-insensitive); use /api/tours/search for relevance ranking.
+    
+    Pagination (opt-in, keyset on created_at DESC, id DESC; NULL created_at sorts last):
+    - limit: page size (default 20, max 100)
+    - cursor: next_cursor value from the previous page
+    - include_total: 'true' to also return the total number of matching tours
+    When limit/cursor are given the response is
+    {'tours': [...], 'next_cursor': str|None, 'has_more': bool[, 'total': int]};
+    otherwise the full list is returned as before.
     """
     
     search_query = request.args.get('search')
     destination_city_id = request.args.get('destination_city_id')
     departure_city_id = request.args.get('departure_city_id')
     max_price = request.args.get('max_price')
-    min_duration = request.args.get('min_duration')
-    max_duration = request.args.get('max_duration')
-    number_of_members = request.args.get('number_of_members')
+    min_duration = _parse_int_arg('min_duration')
+    max_duration = _parse_int_arg('max_duration')
+    number_of_members = _parse_int_arg('number_of_members')
+    
+    paginate = 'limit' in request.args or 'cursor' in request.args
+    limit = _parse_int_arg('limit') or TOUR_LIST_DEFAULT_LIMIT
+    limit = max(1, min(limit, TOUR_LIST_MAX_LIMIT))
+    include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+    image_size = listing_variant(request.args)
+    
+    cursor_position = None
+    if request.args.get('cursor'):
+        try:
+            cursor_position = decode_tour_cursor(request.args['cursor'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
     conn = get_connection()
     if not conn:
@@ -124,103 +224,82 @@ def get_tours():
     try:
         cur = conn.cursor()
         
-        # Build query for published tours only with available schedules
-        query = """
-            SELECT 
-                t.id, t.name, t.duration, t.description,
-                t.destination_city_id, dc.name as destination_city_name,
-                t.departure_city_id, dpc.name as departure_city_name,
-                t.total_price, t.currency, t.number_of_members,
-                t.created_at, t.updated_at,
-                (SELECT image_url FROM tour_images WHERE tour_id = t.id AND is_primary = TRUE LIMIT 1) as primary_image,
-                (SELECT COUNT(*) FROM tour_images WHERE tour_id = t.id) as image_count,
-                (SELECT COUNT(*) FROM tour_schedules ts 
-                 WHERE ts.tour_id = t.id 
-                 AND ts.is_active = TRUE 
-                 AND ts.departure_datetime > NOW()
-                 AND ts.slots_available > 0
-                 AND ts.status NOT IN ('completed', 'cancelled')) as available_schedules_count
-            FROM tours_admin t
-            LEFT JOIN cities dc ON t.destination_city_id = dc.id
-            LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
-            WHERE t.is_published = TRUE AND t.is_active = TRUE
-        """
-        
+        # Filters shared by the page query and the optional count query
+        where = ["t.is_published = TRUE", "t.is_active = TRUE"]
         params = []
         
         if search_query:
-            query += " AND (t.name ILIKE %s OR t.description ILIKE %s OR dc.name ILIKE %s)"
-            search_param = f"%{search_query}%"
-            params.extend([search_param, search_param, search_param])
+            where.append(TOUR_TEXT_MATCH_SQL)
+            params.extend(_text_match_params(search_query))
         
         if destination_city_id:
-            query += " AND t.destination_city_id = %s"
+            where.append("t.destination_city_id = %s")
             params.append(destination_city_id)
         
         if departure_city_id:
-            query += " AND t.departure_city_id = %s"
+            where.append("t.departure_city_id = %s")
             params.append(departure_city_id)
         
         if max_price:
-            query += " AND t.total_price <= %s"
+            where.append("t.total_price <= %s")
             params.append(max_price)
         
-        if number_of_members:
-            try:
-                members_count = int(number_of_members)
-                query += " AND t.number_of_members >= %s"
-                params.append(members_count)
-            except (ValueError, TypeError):
-                pass  # Skip invalid number_of_members parameter
+        if min_duration is not None:
+            where.append("t.duration_days >= %s")
+            params.append(min_duration)
+        
+        if max_duration is not None:
+            where.append("t.duration_days <= %s")
+            params.append(max_duration)
+        
+        if number_of_members is not None:
+            where.append("t.number_of_members >= %s")
+            params.append(number_of_members)
         
-        query += " ORDER BY t.created_at DESC"
+        page_where = list(where)
+        page_params = list(params)
+        if cursor_position:
+            page_where.append(f"({TOUR_SORT_KEY_SQL}, t.id) < (%s, %s)")
+            page_params.extend(cursor_position)
         
-        cur.execute(query, params)
+        # Build query for published tours only with available schedules
+        query = f"""
+            SELECT {TOUR_LIST_COLUMNS}
+            {TOUR_LIST_JOINS}
+            WHERE {' AND '.join(page_where)}
+            ORDER BY {TOUR_SORT_KEY_SQL} DESC, t.id DESC
+        """
+        
+        if paginate:
+            # Fetch one extra row to know whether another page exists
+            query += " LIMIT %s"
+            page_params.append(limit + 1)
+        
+        cur.execute(query, page_params)
         rows = cur.fetchall()
         
-        # Filter by duration on application level since duration is stored as string
-        tours = []
-        for row in rows:
-            tour_duration_days = extract_days_from_duration(row[2])
-            
-            # Apply duration filters if specified
-            if min_duration:
-                min_days = int(min_duration)
-                if tour_duration_days is None or tour_duration_days < min_days:
-                    continue
-            
-            if max_duration:
-                max_days = int(max_duration)
-                if tour_duration_days is None or tour_duration_days > max_days:
-                    continue
+        if not paginate:
+            return jsonify([_tour_list_item(row, image_size) for row in rows]), 200
         
-            tours.append({
-                'id': row[0],
-                'name': row[1],
-                'duration': row[2],
-                'description': row[3],
-                'destination_city': {'id': row[4], 'name': row[5]},
-                'departure_city': {'id': row[6], 'name': row[7]},
-                'price': round((float(row[8]) / row[10]) / 1000) * 1000 if row[8] and row[10] and row[10] > 0 else float(row[8]) if row[8] else 0,  # Price per person rounded to nearest 1,000
-                'total_price': float(row[8]) if row[8] else 0,
-                'currency': row[9],
-                'number_of_members': row[10],
-                'created_at': row[11].isoformat() if row[11] else None,
-                'updated_at': row[12].isoformat() if row[12] else None,
-                'primary_image': row[13],
-                'image': row[13],  # For compatibility with TourCard component
-                'image_count': row[14],
-                'available_schedules_count': row[15] if len(row) > 15 else 0,  # Number of available schedules
-                # For compatibility with frontend
-                'destination': row[5],  # destination city name
-                'region': None,  # Can be added later if needed
-                'province': None,  # Can be added later if needed
-                'rating': 0,  # Can be added later with reviews
-                'reviews': 0,  # Can be added later with reviews
-                'type': []  # Can be added later with tour types
-            })
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        result = {
+            'tours': [_tour_list_item(row, image_size) for row in rows],
+            'has_more': has_more,
+            'next_cursor': encode_tour_cursor(rows[-1][11], rows[-1][0]) if has_more else None
+        }
         
-        return jsonify(tours), 200
+        if include_total:
+            cur.execute(f"""
+                SELECT COUNT(*)
+                FROM tours_admin t
+                LEFT JOIN cities dc ON t.destination_city_id = dc.id
+                WHERE {' AND '.join(where)}
+            """, params)
+            result['total'] = cur.fetchone()[0]
+        
+        return jsonify(result), 200
         
     except Exception as e:
         print(f"Error fetching tours: {e}")
@@ -230,357 +309,498 @@ def get_tours():
         conn.close()
 
 
-@tour_routes.route('/<int:tour_id>', methods=['GET'])
-def get_tour_detail(tour_id):
+@tour_routes.route('/search', methods=['GET'])
+def search_tours():
     """
-    API GET /api/tours/<id> to get detailed tour information for public tour detail page.
-    Only returns published and active tours.
+    API GET /api/tours/search - ranked tour search with facet counts.
+
+    Query params:
+    - q: text matched against tour name, cities and description, ignoring
+      accents ("Ha Noi" finds "Hà Nội") and tolerating small typos
+    - destination_city_id, departure_city_id, price_band (see TOUR_PRICE_BANDS),
+      min_duration, max_duration, number_of_members: filters
+    - limit (default 20, max 50), offset
+    Returns {'tours': [...], 'total', 'has_more', 'next_offset', 'facets'}.
+    Each facet (destination, departure, price_band, duration_days) counts the
+    matching tours with every filter applied except its own, so the counts
+    show what selecting another value of that facet would return.
     """
+    search_query = request.args.get('q', '').strip()
+    limit = max(1, min(_parse_int_arg('limit') or TOUR_LIST_DEFAULT_LIMIT, TOUR_SEARCH_MAX_LIMIT))
+    offset = max(0, _parse_int_arg('offset') or 0)
+    image_size = listing_variant(request.args)
+
+    price_bands = {key: (low, high) for key, low, high in TOUR_PRICE_BANDS}
+    price_band = request.args.get('price_band')
+    if price_band and price_band not in price_bands:
+        return jsonify({"error": f"Invalid price_band. Use one of: {', '.join(price_bands)}"}), 400
+
+    # Facet filters as {facet: (sql, params)}; base conditions apply everywhere
+    base_where = ["t.is_published = TRUE", "t.is_active = TRUE"]
+    base_params = []
+    if search_query:
+        base_where.append(TOUR_TEXT_MATCH_SQL)
+        base_params.extend(_text_match_params(search_query))
+
+    number_of_members = _parse_int_arg('number_of_members')
+    if number_of_members is not None:
+        base_where.append("t.number_of_members >= %s")
+        base_params.append(number_of_members)
+
+    facet_filters = {}
+    destination_city_id = _parse_int_arg('destination_city_id')
+    if destination_city_id is not None:
+        facet_filters['destination'] = ("t.destination_city_id = %s", [destination_city_id])
+    departure_city_id = _parse_int_arg('departure_city_id')
+    if departure_city_id is not None:
+        facet_filters['departure'] = ("t.departure_city_id = %s", [departure_city_id])
+    if price_band:
+        low, high = price_bands[price_band]
+        conditions, values = [], []
+        if low is not None:
+            conditions.append("t.total_price >= %s")
+            values.append(low)
+        if high is not None:
+            conditions.append("t.total_price < %s")
+            values.append(high)
+        facet_filters['price_band'] = (' AND '.join(conditions), values)
+    min_duration = _parse_int_arg('min_duration')
+    max_duration = _parse_int_arg('max_duration')
+    if min_duration is not None or max_duration is not None:
+        conditions, values = [], []
+        if min_duration is not None:
+            conditions.append("t.duration_days >= %s")
+            values.append(min_duration)
+        if max_duration is not None:
+            conditions.append("t.duration_days <= %s")
+            values.append(max_duration)
+        facet_filters['duration_days'] = (' AND '.join(conditions), values)
+
+    def where_clause(exclude=None):
+        where = list(base_where)
+        params = list(base_params)
+        for facet, (sql, values) in facet_filters.items():
+            if facet != exclude:
+                where.append(sql)
+                params.extend(values)
+        return ' AND '.join(where), params
+
     conn = get_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
 
     try:
         cur = conn.cursor()
-        
-        # Get basic tour info with partner information
-        cur.execute("""
-            SELECT 
-                t.id, t.name, t.duration, t.description,
-                t.destination_city_id, dc.name as destination_city_name,
-                t.departure_city_id, dpc.name as departure_city_name,
-                t.total_price, t.currency, t.number_of_members,
-                t.created_at, t.updated_at, t.created_by,
-                u.username as partner_name, u.email as partner_email, u.phone as partner_phone,
-                u.partner_type
-            FROM tours_admin t
-            LEFT JOIN cities dc ON t.destination_city_id = dc.id
-            LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
-            LEFT JOIN users u ON t.created_by = u.id
-            WHERE t.id = %s AND t.is_published = TRUE AND t.is_active = TRUE
-        """, (tour_id,))
-        
-        tour_row = cur.fetchone()
-        if not tour_row:
-            return jsonify({"error": "Tour not found or not published"}), 404
-        
-        tour_data = {
-            'id': tour_row[0],
-            'name': tour_row[1],
-            'title': tour_row[1],  # For compatibility
-            'duration': tour_row[2],
-            'description': tour_row[3],
-            'destination_city': {'id': tour_row[4], 'name': tour_row[5]},
-            'departure_city': {'id': tour_row[6], 'name': tour_row[7]},
-            'location': tour_row[5],  # destination city name for display
-            'price': round((float(tour_row[8]) / tour_row[10]) / 1000) * 1000 if tour_row[8] and tour_row[10] and tour_row[10] > 0 else float(tour_row[8]) if tour_row[8] else 0,  # Price per person rounded to nearest 1,000
-            'total_price': float(tour_row[8]) if tour_row[8] else 0,
-            'basePrice': round((float(tour_row[8]) / tour_row[10]) / 1000) * 1000 if tour_row[8] and tour_row[10] and tour_row[10] > 0 else float(tour_row[8]) if tour_row[8] else 0,  # For compatibility, price per person rounded
-            'currency': tour_row[9],
-            'number_of_members': tour_row[10],
-            'created_at': tour_row[11].isoformat() if tour_row[11] else None,
-            'updated_at': tour_row[12].isoformat() if tour_row[12] else None,
-            # Default values for features not yet implemented
-            'tags': [],
-            'highlights': [],
-            'included': [],
-            'excluded': [],
-            'hotel': None,
-            'tourLocations': [],
-            'centerCoordinates': None
+
+        where_sql, where_params = where_clause()
+        if search_query:
+            rank_sql = TOUR_TEXT_RANK_SQL
+            rank_params = [prefix_tsquery(search_query), search_query.lower()]
+        else:
+            rank_sql, rank_params = "0", []
+
+        cur.execute(f"""
+            SELECT {TOUR_LIST_COLUMNS}, {rank_sql} AS relevance, COUNT(*) OVER () AS total
+            {TOUR_LIST_JOINS}
+            WHERE {where_sql}
+            ORDER BY relevance DESC, t.created_at DESC, t.id DESC
+            LIMIT %s OFFSET %s
+        """, rank_params + where_params + [limit, offset])
+        rows = cur.fetchall()
+
+        total = rows[0][TOUR_LIST_WIDTH + 1] if rows else 0
+        if not rows and offset:
+            cur.execute(f"SELECT COUNT(*) FROM tours_admin t WHERE {where_sql}", where_params)
+            total = cur.fetchone()[0]
+
+        tours = []
+        for row in rows:
+            item = _tour_list_item(row, image_size)
+            item['relevance'] = round(float(row[TOUR_LIST_WIDTH]), 4)
+            tours.append(item)
+
+        # All four facets in one round trip
+        facet_selects = {
+            'destination': ("t.destination_city_id::text", "MAX(c.name)",
+                            "LEFT JOIN cities c ON c.id = t.destination_city_id"),
+            'departure': ("t.departure_city_id::text", "MAX(c.name)",
+                          "LEFT JOIN cities c ON c.id = t.departure_city_id"),
+            'price_band': (TOUR_PRICE_BAND_SQL, "NULL", ""),
+            'duration_days': ("t.duration_days::text", "NULL", ""),
         }
-        
-        # Get real review statistics
-        cur.execute("""
-            SELECT 
-                COUNT(*) as review_count,
-                COALESCE(AVG(rating), 0) as avg_rating
-            FROM tour_reviews
-            WHERE tour_id = %s
-        """, (tour_id,))
-        
-        review_stats = cur.fetchone()
-        tour_data['reviewCount'] = review_stats[0] if review_stats else 0
-        tour_data['rating'] = round(float(review_stats[1]), 1) if review_stats and review_stats[1] else 0
-        
-        # Get images
-        cur.execute("""
-            SELECT id, image_url, image_caption, display_order, is_primary
-            FROM tour_images
-            WHERE tour_id = %s
-            ORDER BY display_order, id
-        """, (tour_id,))
-        
-        tour_data['images'] = []
-        for img_row in cur.fetchall():
-            tour_data['images'].append({
-                'id': img_row[0],
-                'url': img_row[1],
-                'caption': img_row[2],
-                'display_order': img_row[3],
-                'is_primary': img_row[4]
-            })
-        
-        # Get itinerary with time checkpoints
-        cur.execute("""
-            SELECT id, day_number, day_title, day_summary
-            FROM tour_daily_itinerary
-            WHERE tour_id = %s
-            ORDER BY day_number
-        """, (tour_id,))
-        
-        tour_data['itinerary'] = []
-        for day_row in cur.fetchall():
+        facet_sql = []
+        facet_params = []
+        for facet, (value_sql, label_sql, join_sql) in facet_selects.items():
+            facet_where, params = where_clause(exclude=facet)
+            facet_sql.append(f"""
+                SELECT '{facet}' AS facet, {value_sql} AS value, {label_sql} AS label, COUNT(*) AS count
+                FROM tours_admin t
+                {join_sql}
+                WHERE {facet_where}
+                GROUP BY 2
+            """)
+            facet_params.extend(params)
+        cur.execute(" UNION ALL ".join(facet_sql) + " ORDER BY 1, 4 DESC, 2", facet_params)
+
+        facets = {facet: [] for facet in facet_selects}
+        for facet, value, label, count in cur.fetchall():
+            if value is None:
+                continue
+            if facet in ('destination', 'departure'):
+                facets[facet].append({'id': int(value), 'name': label, 'count': count})
+            elif facet == 'price_band':
+                low, high = price_bands[value]
+                facets[facet].append({'value': value, 'min': low, 'max': high, 'count': count})
+            else:
+                facets[facet].append({'value': int(value), 'count': count})
+        facets['price_band'].sort(key=lambda band: [key for key, _, _ in TOUR_PRICE_BANDS].index(band['value']))
+        facets['duration_days'].sort(key=lambda bucket: bucket['value'])
+
+        has_more = offset + len(rows) < total
+        return jsonify({
+            'tours': tours,
+            'total': total,
+            'has_more': has_more,
+            'next_offset': offset + limit if has_more else None,
+            'facets': facets
+        }), 200
+
+    except Exception as e:
+        print(f"Error searching tours: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+def build_tour_detail(cur, tour_id):
+    """
+    Assemble the public tour detail document for a published, active tour.
+    Returns None if the tour does not exist or is not published.
+    """
+    # Get basic tour info with partner information
+    cur.execute("""
+        SELECT 
+            t.id, t.name, t.duration, t.description,
+            t.destination_city_id, dc.name as destination_city_name,
+            t.departure_city_id, dpc.name as departure_city_name,
+            t.total_price, t.currency, t.number_of_members,
+            t.created_at, t.updated_at, t.created_by,
+            u.username as partner_name, u.email as partner_email, u.phone as partner_phone,
+            u.partner_type,
+            """ + RATING_STATS_COLUMNS + """
+        FROM tours_admin t
+        LEFT JOIN cities dc ON t.destination_city_id = dc.id
+        LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
+        LEFT JOIN users u ON t.created_by = u.id
+        LEFT JOIN tour_rating_stats trs ON trs.tour_id = t.id
+        WHERE t.id = %s AND t.is_published = TRUE AND t.is_active = TRUE
+    """, (tour_id,))
+    
+    tour_row = cur.fetchone()
+    if not tour_row:
+        return None
+    
+    tour_data = {
+        'id': tour_row[0],
+        'name': tour_row[1],
+        'title': tour_row[1],  # For compatibility
+        'duration': tour_row[2],
+        'description': tour_row[3],
+        'destination_city': {'id': tour_row[4], 'name': tour_row[5]},
+        'departure_city': {'id': tour_row[6], 'name': tour_row[7]},
+        'location': tour_row[5],  # destination city name for display
+        'price': round((float(tour_row[8]) / tour_row[10]) / 1000) * 1000 if tour_row[8] and tour_row[10] and tour_row[10] > 0 else float(tour_row[8]) if tour_row[8] else 0,  # Price per person rounded to nearest 1,000
+        'total_price': float(tour_row[8]) if tour_row[8] else 0,
+        'basePrice': round((float(tour_row[8]) / tour_row[10]) / 1000) * 1000 if tour_row[8] and tour_row[10] and tour_row[10] > 0 else float(tour_row[8]) if tour_row[8] else 0,  # For compatibility, price per person rounded
+        'currency': tour_row[9],
+        'number_of_members': tour_row[10],
+        'created_at': tour_row[11].isoformat() if tour_row[11] else None,
+        'updated_at': tour_row[12].isoformat() if tour_row[12] else None,
+        # Default values for features not yet implemented
+        'tags': [],
+        'highlights': [],
+        'included': [],
+        'excluded': [],
+        'hotel': None,
+        'tourLocations': [],
+        'centerCoordinates': None
+    }
+    
+    # Review statistics (tour_rating_stats, read with the tour row)
+    review_count, average, distribution, last_review_at = rating_stats(tour_row[18:18 + RATING_STATS_WIDTH])
+    tour_data['reviewCount'] = review_count
+    tour_data['rating'] = average
+    tour_data['ratingDistribution'] = distribution
+    tour_data['lastReviewAt'] = last_review_at
+    
+    # Get images
+    cur.execute("""
+        SELECT id, image_url, image_caption, display_order, is_primary
+        FROM tour_images
+        WHERE tour_id = %s
+        ORDER BY display_order, id
+    """, (tour_id,))
+    
+    tour_data['images'] = []
+    for img_row in cur.fetchall():
+        tour_data['images'].append({
+            'id': img_row[0],
+            'url': img_row[1],
+            'caption': img_row[2],
+            'display_order': img_row[3],
+            'is_primary': img_row[4]
+        })
+    
+    # Get itinerary with all time checkpoints in one query
+    cur.execute("""
+        SELECT 
+            tdi.id, tdi.day_number, tdi.day_title, tdi.day_summary,
+            ttc.id, ttc.time_period, ttc.checkpoint_time, ttc.activity_title,
+            ttc.activity_description, ttc.location, ttc.display_order
+        FROM tour_daily_itinerary tdi
+        LEFT JOIN tour_time_checkpoints ttc ON ttc.itinerary_id = tdi.id
+        WHERE tdi.tour_id = %s
+        ORDER BY tdi.day_number, ttc.time_period, ttc.checkpoint_time, ttc.display_order
+    """, (tour_id,))
+    
+    tour_data['itinerary'] = []
+    days_by_id = {}
+    for row in cur.fetchall():
+        day_data = days_by_id.get(row[0])
+        if day_data is None:
             day_data = {
-                'id': day_row[0],
-                'day_number': day_row[1],
-                'day_title': day_row[2],
-                'day_summary': day_row[3],
+                'id': row[0],
+                'day_number': row[1],
+                'day_title': row[2],
+                'day_summary': row[3],
                 'checkpoints': {'morning': [], 'noon': [], 'evening': []}
             }
-            
-            # Get time checkpoints for this day
-            cur.execute("""
-                SELECT id, time_period, checkpoint_time, activity_title, 
-                       activity_description, location, display_order
-                FROM tour_time_checkpoints
-                WHERE itinerary_id = %s
-                ORDER BY time_period, checkpoint_time, display_order
-            """, (day_row[0],))
-            
-            for cp_row in cur.fetchall():
-                checkpoint = {
-                    'id': cp_row[0],
-                    'time_period': cp_row[1],
-                    'checkpoint_time': str(cp_row[2]),
-                    'activity_title': cp_row[3],
-                    'activity_description': cp_row[4],
-                    'location': cp_row[5],
-                    'display_order': cp_row[6]
-                }
-                day_data['checkpoints'][cp_row[1]].append(checkpoint)
-            
+            days_by_id[row[0]] = day_data
             tour_data['itinerary'].append(day_data)
         
-        # Get services
-        cur.execute("""
-            SELECT 
-                ts.id, ts.service_type, ts.day_number, ts.service_cost, ts.notes,
-                ts.restaurant_id, rs.name as restaurant_name,
-                ts.accommodation_id, acs.name as accommodation_name,
-                ts.transportation_id, 
-                CONCAT(trans.vehicle_type, ' - ', trans.license_plate) as transportation_name
-            FROM tour_services ts
-            LEFT JOIN restaurant_services rs ON ts.restaurant_id = rs.id
-            LEFT JOIN accommodation_services acs ON ts.accommodation_id = acs.id
-            LEFT JOIN transportation_services trans ON ts.transportation_id = trans.id
-            WHERE ts.tour_id = %s
-            ORDER BY ts.service_type, ts.day_number
-        """, (tour_id,))
-        
-        tour_data['services'] = {
-            'restaurants': [],
-            'accommodation': None,
-            'transportation': None
+        # LEFT JOIN yields NULL checkpoint columns for days without activities
+        if row[4] is not None:
+            day_data['checkpoints'][row[5]].append({
+                'id': row[4],
+                'time_period': row[5],
+                'checkpoint_time': str(row[6]),
+                'activity_title': row[7],
+                'activity_description': row[8],
+                'location': row[9],
+                'display_order': row[10]
+            })
+    
+    # Get services together with transportation details and the owning partner
+    cur.execute("""
+        SELECT 
+            ts.id, ts.service_type, ts.day_number, ts.service_cost, ts.notes,
+            ts.restaurant_id, rs.name as restaurant_name,
+            ts.accommodation_id, acs.name as accommodation_name,
+            ts.transportation_id, 
+            CONCAT(trans.vehicle_type, ' - ', trans.license_plate) as transportation_name,
+            trans.license_plate, trans.vehicle_type, trans.brand, trans.max_passengers,
+            trans.description, trans.base_price,
+            u.id, u.username, u.email, u.phone, u.partner_type
+        FROM tour_services ts
+        LEFT JOIN restaurant_services rs ON ts.restaurant_id = rs.id
+        LEFT JOIN accommodation_services acs ON ts.accommodation_id = acs.id
+        LEFT JOIN transportation_services trans ON ts.transportation_id = trans.id
+        LEFT JOIN users u ON u.id = COALESCE(rs.partner_id, acs.partner_id, trans.partner_id)
+        WHERE ts.tour_id = %s
+        ORDER BY ts.service_type, ts.day_number
+    """, (tour_id,))
+    
+    tour_data['services'] = {
+        'restaurants': [],
+        'accommodation': None,
+        'transportation': None
+    }
+    
+    def partner_from_row(svc_row):
+        if svc_row[17] is None:
+            return None
+        return {
+            'id': svc_row[17],
+            'name': svc_row[18] or 'N/A',
+            'email': svc_row[19],
+            'phone': svc_row[20],
+            'partner_type': svc_row[21]
+        }
+    
+    accommodation_partner = None
+    transportation_partner = None
+    restaurant_partners = []
+    
+    for svc_row in cur.fetchall():
+        service_data = {
+            'id': svc_row[0],
+            'service_type': svc_row[1],
+            'day_number': svc_row[2],
+            'service_cost': float(svc_row[3]),
+            'notes': svc_row[4]
         }
         
-        for svc_row in cur.fetchall():
-            service_data = {
-                'id': svc_row[0],
-                'service_type': svc_row[1],
-                'day_number': svc_row[2],
-                'service_cost': float(svc_row[3]),
-                'notes': svc_row[4]
-            }
-            
-            if svc_row[1] == 'restaurant':
-                service_data['service_id'] = svc_row[5]
-                service_data['service_name'] = svc_row[6]
-                tour_data['services']['restaurants'].append(service_data)
-            elif svc_row[1] == 'accommodation':
-                service_data['service_id'] = svc_row[7]
-                service_data['service_name'] = svc_row[8]
-                tour_data['services']['accommodation'] = service_data
-            elif svc_row[1] == 'transportation':
-                service_data['service_id'] = svc_row[9]
-                service_data['service_name'] = svc_row[10]
-                # Get more transportation details
-                if svc_row[9]:
-                    cur.execute("""
-                        SELECT id, license_plate, vehicle_type, brand, max_passengers, description, base_price
-                        FROM transportation_services
-                        WHERE id = %s
-                    """, (svc_row[9],))
-                    trans_row = cur.fetchone()
-                    if trans_row:
-                        service_data['license_plate'] = trans_row[1]
-                        service_data['vehicle_type'] = trans_row[2]
-                        service_data['brand'] = trans_row[3]
-                        service_data['capacity'] = trans_row[4]  # max_passengers
-                        service_data['description'] = trans_row[5]
-                        service_data['price_per_person'] = float(trans_row[6]) if trans_row[6] else 0
-                tour_data['services']['transportation'] = service_data
-        
-        # Get room bookings with details
-        cur.execute("""
-            SELECT 
-                ar.id, ar.name, ar.room_type, ar.description, 
-                ar.max_adults, ar.max_children, ar.room_size, ar.bed_type,
-                ar.view_type, ar.amenities, ar.base_price, trb.quantity,
-                acs.name as accommodation_name, acs.address, acs.star_rating, acs.description as acc_description
-            FROM tour_room_bookings trb
-            JOIN accommodation_rooms ar ON trb.room_id = ar.id
-            JOIN accommodation_services acs ON ar.accommodation_id = acs.id
-            WHERE trb.tour_id = %s
-            ORDER BY ar.base_price
-        """, (tour_id,))
+        if svc_row[1] == 'restaurant':
+            service_data['service_id'] = svc_row[5]
+            service_data['service_name'] = svc_row[6]
+            tour_data['services']['restaurants'].append(service_data)
+            restaurant_partners.append(partner_from_row(svc_row))
+        elif svc_row[1] == 'accommodation':
+            service_data['service_id'] = svc_row[7]
+            service_data['service_name'] = svc_row[8]
+            tour_data['services']['accommodation'] = service_data
+            accommodation_partner = partner_from_row(svc_row)
+        elif svc_row[1] == 'transportation':
+            service_data['service_id'] = svc_row[9]
+            service_data['service_name'] = svc_row[10]
+            if svc_row[9]:
+                service_data['license_plate'] = svc_row[11]
+                service_data['vehicle_type'] = svc_row[12]
+                service_data['brand'] = svc_row[13]
+                service_data['capacity'] = svc_row[14]  # max_passengers
+                service_data['description'] = svc_row[15]
+                service_data['price_per_person'] = float(svc_row[16]) if svc_row[16] else 0
+            tour_data['services']['transportation'] = service_data
+            transportation_partner = partner_from_row(svc_row)
+    
+    # Get room bookings with details and first room image
+    cur.execute("""
+        SELECT 
+            ar.id, ar.name, ar.room_type, ar.description, 
+            ar.max_adults, ar.max_children, ar.room_size, ar.bed_type,
+            ar.view_type, ar.amenities, ar.base_price, trb.quantity,
+            acs.name as accommodation_name, acs.address, acs.star_rating, acs.description as acc_description,
+            img.image_url
+        FROM tour_room_bookings trb
+        JOIN accommodation_rooms ar ON trb.room_id = ar.id
+        JOIN accommodation_services acs ON ar.accommodation_id = acs.id
+        LEFT JOIN LATERAL (
+            SELECT si.image_url FROM service_images si
+            WHERE si.service_type = 'accommodation_room' AND si.service_id = ar.id
+            ORDER BY si.display_order
+            LIMIT 1
+        ) img ON TRUE
+        WHERE trb.tour_id = %s
+        ORDER BY ar.base_price
+    """, (tour_id,))
+    
+    tour_data['roomBookings'] = []
+    tour_data['accommodationDetails'] = None
+    
+    for room_row in cur.fetchall():
+        tour_data['roomBookings'].append({
+            'room_id': room_row[0],
+            'quantity': room_row[11],
+            'base_price': float(room_row[10]) if room_row[10] else 0,
+            'name': room_row[1],
+            'roomType': room_row[2],
+            'description': room_row[3],
+            'maxAdults': room_row[4],
+            'maxChildren': room_row[5],
+            'roomSize': float(room_row[6]) if room_row[6] else None,
+            'bedType': room_row[7],
+            'viewType': room_row[8],
+            'amenities': room_row[9] if room_row[9] else [],
+            'image': room_row[16]
+        })
         
-        tour_data['roomBookings'] = []
-        tour_data['accommodationDetails'] = None
-        
-        for room_row in cur.fetchall():
-            # Get room images
-            cur.execute("""
-                SELECT image_url FROM service_images
-                WHERE service_type = 'accommodation_room' AND service_id = %s
-                ORDER BY display_order
-                LIMIT 1
-            """, (room_row[0],))
-            image_row = cur.fetchone()
-            
-            tour_data['roomBookings'].append({
-                'room_id': room_row[0],
-                'quantity': room_row[11],
-                'base_price': float(room_row[10]) if room_row[10] else 0,
-                'name': room_row[1],
-                'roomType': room_row[2],
-                'description': room_row[3],
-                'maxAdults': room_row[4],
-                'maxChildren': room_row[5],
-                'roomSize': float(room_row[6]) if room_row[6] else None,
-                'bedType': room_row[7],
-                'viewType': room_row[8],
-                'amenities': room_row[9] if room_row[9] else [],
-                'image': image_row[0] if image_row else None
-            })
-            
-            # Set accommodation details (same for all rooms)
-            if not tour_data['accommodationDetails']:
-                tour_data['accommodationDetails'] = {
-                    'name': room_row[12],
-                    'address': room_row[13],
-                    'star_rating': room_row[14],
-                    'description': room_row[15]
-                }
-        
-        # Get selected set meals with details
-        cur.execute("""
-            SELECT 
-                tssm.set_meal_id, tssm.day_number, tssm.meal_session,
-                rsm.name, rsm.description, rsm.total_price, rsm.currency,
-                rs.name as restaurant_name, rs.cuisine_type, rs.address
-            FROM tour_selected_set_meals tssm
-            JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
-            JOIN restaurant_services rs ON rsm.restaurant_id = rs.id
-            WHERE tssm.tour_id = %s
-            ORDER BY tssm.day_number, tssm.meal_session
-        """, (tour_id,))
+        # Set accommodation details (same for all rooms)
+        if not tour_data['accommodationDetails']:
+            tour_data['accommodationDetails'] = {
+                'name': room_row[12],
+                'address': room_row[13],
+                'star_rating': room_row[14],
+                'description': room_row[15]
+            }
+    
+    # Get selected set meals with their menu items aggregated as JSON
+    cur.execute("""
+        SELECT 
+            tssm.set_meal_id, tssm.day_number, tssm.meal_session,
+            rsm.name, rsm.description, rsm.total_price, rsm.currency,
+            rs.name as restaurant_name, rs.cuisine_type, rs.address,
+            COALESCE(items.menu_items, '[]'::json)
+        FROM tour_selected_set_meals tssm
+        JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
+        JOIN restaurant_services rs ON rsm.restaurant_id = rs.id
+        LEFT JOIN LATERAL (
+            SELECT json_agg(
+                json_build_object(
+                    'name', rmi.name,
+                    'description', rmi.description,
+                    'category', rmi.category
+                ) ORDER BY rmi.category, rmi.name
+            ) as menu_items
+            FROM restaurant_set_meal_items rsmi
+            JOIN restaurant_menu_items rmi ON rsmi.menu_item_id = rmi.id
+            WHERE rsmi.set_meal_id = tssm.set_meal_id
+        ) items ON TRUE
+        WHERE tssm.tour_id = %s
+        ORDER BY tssm.day_number, tssm.meal_session
+    """, (tour_id,))
+    
+    tour_data['selectedSetMeals'] = []
+    for meal_row in cur.fetchall():
+        tour_data['selectedSetMeals'].append({
+            'set_meal_id': meal_row[0],
+            'day_number': meal_row[1],
+            'meal_session': meal_row[2],
+            'set_meal_name': meal_row[3],
+            'set_meal_description': meal_row[4],
+            'total_price': float(meal_row[5]) if meal_row[5] else 0,  # Price for 2 people
+            'currency': meal_row[6],
+            'restaurant_name': meal_row[7],
+            'cuisine_type': meal_row[8],
+            'restaurant_address': meal_row[9],
+            'menu_items': meal_row[10]
+        })
+    
+    # Collect all partners involved in this tour (already joined with services above)
+    partners_dict = {}  # Use dict to avoid duplicates by partner_id
+    for partner in [accommodation_partner, transportation_partner] + restaurant_partners:
+        if partner:
+            partners_dict[partner['id']] = partner
+    
+    # Convert dict to list
+    tour_data['partners'] = list(partners_dict.values())
+    
+    return tour_data
+
+
+def _tour_document_response(entry):
+    """Serve a cached tour document with its ETag, answering 304 when the client copy is current."""
+    response = Response(entry['body'], status=200, mimetype='application/json')
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+@tour_routes.route('/<int:tour_id>', methods=['GET'])
+def get_tour_detail(tour_id):
+    """
+    API GET /api/tours/<id> to get detailed tour information for public tour detail page.
+    Only returns published and active tours.
+    The document is cached per tour and invalidated by the admin, partner and review write paths.
+    """
+    entry = get_tour_document(tour_id)
+    if entry is not None:
+        return _tour_document_response(entry)
+    
+    generation = document_generation()
+    conn = get_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cur = conn.cursor()
         
-        tour_data['selectedSetMeals'] = []
-        for meal_row in cur.fetchall():
-            # Get set meal items
-            cur.execute("""
-                SELECT rmi.name, rmi.description, rmi.category
-                FROM restaurant_set_meal_items rsmi
-                JOIN restaurant_menu_items rmi ON rsmi.menu_item_id = rmi.id
-                WHERE rsmi.set_meal_id = %s
-                ORDER BY rmi.category, rmi.name
-            """, (meal_row[0],))
-            
-            menu_items = []
-            for item_row in cur.fetchall():
-                menu_items.append({
-                    'name': item_row[0],
-                    'description': item_row[1],
-                    'category': item_row[2]
-                })
-            
-            tour_data['selectedSetMeals'].append({
-                'set_meal_id': meal_row[0],
-                'day_number': meal_row[1],
-                'meal_session': meal_row[2],
-                'set_meal_name': meal_row[3],
-                'set_meal_description': meal_row[4],
-                'total_price': float(meal_row[5]) if meal_row[5] else 0,  # Price for 2 people
-                'currency': meal_row[6],
-                'restaurant_name': meal_row[7],
-                'cuisine_type': meal_row[8],
-                'restaurant_address': meal_row[9],
-                'menu_items': menu_items
-            })
+        tour_data = build_tour_detail(cur, tour_id)
+        if tour_data is None:
+            return jsonify({"error": "Tour not found or not published"}), 404
         
-        # Get all partners involved in this tour from services
-        partners_dict = {}  # Use dict to avoid duplicates by partner_id
-        
-        # Get partners from accommodation
-        if tour_data['services'].get('accommodation') and tour_data['services']['accommodation'].get('service_id'):
-            cur.execute("""
-                SELECT u.id, u.username, u.email, u.phone, u.partner_type
-                FROM accommodation_services acs
-                JOIN users u ON acs.partner_id = u.id
-                WHERE acs.id = %s
-            """, (tour_data['services']['accommodation']['service_id'],))
-            acc_row = cur.fetchone()
-            if acc_row:
-                partners_dict[acc_row[0]] = {
-                    'id': acc_row[0],
-                    'name': acc_row[1] or 'N/A',
-                    'email': acc_row[2],
-                    'phone': acc_row[3],
-                    'partner_type': acc_row[4]
-                }
-        
-        # Get partners from transportation
-        if tour_data['services'].get('transportation') and tour_data['services']['transportation'].get('service_id'):
-            cur.execute("""
-                SELECT u.id, u.username, u.email, u.phone, u.partner_type
-                FROM transportation_services ts
-                JOIN users u ON ts.partner_id = u.id
-                WHERE ts.id = %s
-            """, (tour_data['services']['transportation']['service_id'],))
-            trans_row = cur.fetchone()
-            if trans_row:
-                partners_dict[trans_row[0]] = {
-                    'id': trans_row[0],
-                    'name': trans_row[1] or 'N/A',
-                    'email': trans_row[2],
-                    'phone': trans_row[3],
-                    'partner_type': trans_row[4]
-                }
-        
-        # Get partners from restaurants
-        for restaurant in tour_data['services'].get('restaurants', []):
-            if restaurant.get('service_id'):
-                cur.execute("""
-                    SELECT u.id, u.username, u.email, u.phone, u.partner_type
-                    FROM restaurant_services rs
-                    JOIN users u ON rs.partner_id = u.id
-                    WHERE rs.id = %s
-                """, (restaurant['service_id'],))
-                rest_row = cur.fetchone()
-                if rest_row:
-                    partners_dict[rest_row[0]] = {
-                        'id': rest_row[0],
-                        'name': rest_row[1] or 'N/A',
-                        'email': rest_row[2],
-                        'phone': rest_row[3],
-                        'partner_type': rest_row[4]
-                    }
-        
-        # Convert dict to list
-        tour_data['partners'] = list(partners_dict.values())
-        
-        return jsonify(tour_data), 200
+        entry = store_tour_document(tour_id, tour_data, generation)
+        return _tour_document_response(entry)
         
     except Exception as e:
         print(f"Error fetching tour detail: {e}")
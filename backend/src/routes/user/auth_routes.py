@@ -6,6 +6,9 @@ import random
 import string
 from datetime import datetime, timedelta
 from config.database import get_connection
+from src.services.blob_store import RASTER_IMAGE_TYPES, is_data_uri, parse_data_uri
+from src.services.image_derivatives import image_manifest, store_upload
+from src.services.tour_cache import invalidate_tours, tour_ids_for_user
 from src.services.email_service import (
     send_welcome_email,
     send_password_reset_email,
@@ -502,9 +505,13 @@ def manage_user(user_id):
                 if admin_count <= 1:
                     return jsonify({"error": "Cannot delete the last admin user"}), 400
             
+            # Tours embedding this user's details (their links go with the user)
+            affected_tours = tour_ids_for_user(cur, user_id)
+            
             # Delete the user
             cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
             conn.commit()
+            invalidate_tours(affected_tours)
             
             return jsonify({
                 "message": "User deleted successfully",
@@ -580,7 +587,9 @@ def manage_user(user_id):
             
             cur.execute(update_query, tuple(params))
             updated_user = cur.fetchone()
+            affected_tours = tour_ids_for_user(cur, user_id)
             conn.commit()
+            invalidate_tours(affected_tours)
             
             print(f"[DEBUG] Updated user: {updated_user}")
             print(f"[DEBUG] Transaction committed successfully")
@@ -748,7 +757,10 @@ def update_profile():
             """, (name, phone, avatar, current_email))
         
         user = cur.fetchone()
+        # Cached tour documents embed partner names and contact details
+        affected_tours = tour_ids_for_user(cur, user[0]) if user and user[5] != 'client' else []
         conn.commit()
+        invalidate_tours(affected_tours)
         
         if not user:
             return jsonify({"error": "User not found"}), 404
@@ -939,8 +951,18 @@ def upload_avatar():
     if not avatar_data:
         return jsonify({"error": "Avatar data is required"}), 400
     
-    # For now, we'll store the base64 data directly
-    # In production, you might want to upload to a file storage service (S3, Cloudinary, etc.)
+    # Base64 data URIs are moved to the blob store; resized versions are generated in the background
+    if is_data_uri(avatar_data):
+        try:
+            mime_type, image_bytes = parse_data_uri(avatar_data)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid avatar data: {e}"}), 400
+        if mime_type not in RASTER_IMAGE_TYPES:
+            return jsonify({"error": "Avatar must be a PNG, JPEG, WebP or GIF image"}), 400
+        try:
+            avatar_data = store_upload(image_bytes, mime_type)
+        except Exception as e:
+            return jsonify({"error": f"Failed to upload avatar: {str(e)}"}), 500
     
     conn = get_connection()
     if not conn:
@@ -964,7 +986,8 @@ def upload_avatar():
         
         return jsonify({
             "message": "Avatar uploaded successfully",
-            "avatar": result[0]
+            "avatar": result[0],
+            "images": image_manifest(result[0])
         }), 200
     
     except Exception as e:
@@ -0,0 +1,149 @@
+"""
+Content-addressed blob store for images.
+
+Files are stored on disk under their SHA-256 digest, so identical uploads are
+kept once and a stored file never changes. Blobs are served by
+src/routes/blob_routes.py at /api/blobs/<digest><ext>, which lets clients
+cache them forever.
+
+Set BLOB_STORE_DIR to change the storage directory (default: backend/storage/blobs).
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+
+backend_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(backend_root, 'storage', 'blobs'))
+BLOB_URL_PREFIX = '/api/blobs/'
+
+MIME_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+    'image/bmp': '.bmp',
+    'image/svg+xml': '.svg',
+}
+EXTENSION_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.svg': 'image/svg+xml',
+    '.bin': 'application/octet-stream',
+}
+# Types accepted from user uploads; anything else (notably SVG, which can carry
+# scripts) could run same-origin when served from /api/blobs
+RASTER_IMAGE_TYPES = {'image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/gif'}
+
+# <digest><ext> for originals, <digest>_<variant><ext> for derived files (e.g. resized copies)
+BLOB_NAME_RE = re.compile(r'^([0-9a-f]{64})(?:_([a-z]+))?(\.[a-z0-9]+)$')
+DATA_URI_RE = re.compile(r'^data:([\w.+-]+/[\w.+-]+)?((?:;[\w-]+=[^;,]*)*);base64,', re.IGNORECASE)
+
+
+def is_data_uri(value):
+    return isinstance(value, str) and value[:5].lower() == 'data:'
+
+
+def parse_data_uri(data_uri):
+    """
+    Split a Base64 data URI into (mime_type, bytes).
+    Raises ValueError if it is not a Base64 data URI.
+    """
+    match = DATA_URI_RE.match(data_uri or '')
+    if not match:
+        raise ValueError("Not a base64 data URI")
+    mime_type = (match.group(1) or 'application/octet-stream').lower()
+    try:
+        data = base64.b64decode(data_uri[match.end():], validate=False)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid base64 payload")
+    return mime_type, data
+
+
+def blob_path(name):
+    """Absolute path of a blob name (<digest>[_<variant>]<ext>), or None if the name is invalid."""
+    match = BLOB_NAME_RE.match(name or '')
+    if not match:
+        return None
+    digest = match.group(1)
+    return os.path.join(BLOB_STORE_DIR, digest[:2], digest[2:4], name)
+
+
+def blob_url(name):
+    return BLOB_URL_PREFIX + name
+
+
+def find_original(digest):
+    """Return the stored original blob name for a digest, or None."""
+    directory = os.path.join(BLOB_STORE_DIR, digest[:2], digest[2:4])
+    try:
+        entries = os.listdir(directory)
+    except FileNotFoundError:
+        return None
+    for entry in entries:
+        match = BLOB_NAME_RE.match(entry)
+        if match and match.group(1) == digest and not match.group(2):
+            return entry
+    return None
+
+
+def mime_type_for(name):
+    return EXTENSION_MIME_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream')
+
+
+def store_blob(data, mime_type=None):
+    """
+    Store bytes and return the blob name (<sha256><ext>).
+    Writing the same content twice is a no-op.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    name = digest + MIME_EXTENSIONS.get((mime_type or '').lower(), '.bin')
+    if os.path.exists(blob_path(name)):
+        return name
+    return write_blob(name, data)
+
+
+def write_blob(name, data):
+    """Write bytes under an explicit blob name (used for derived files), atomically."""
+    path = blob_path(name)
+    if path is None:
+        raise ValueError(f"Invalid blob name: {name}")
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temp file and rename so readers never see a partial blob
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return name
+
+
+def store_file(file_path, mime_type):
+    with open(file_path, 'rb') as f:
+        return store_blob(f.read(), mime_type)
+
+
+def store_data_uri(data_uri):
+    """Store the payload of a Base64 data URI and return its public URL."""
+    mime_type, data = parse_data_uri(data_uri)
+    return blob_url(store_blob(data, mime_type))
+
+
+def externalize_image_url(value):
+    """Return the blob URL for a data URI; any other value is returned unchanged."""
+    if is_data_uri(value):
+        return store_data_uri(value)
+    return value
@@ -0,0 +1,181 @@
+"""
+Normalized booking line items.
+
+Every booking gets one booking_items row per priced part: the room
+(quantity = rooms x nights), each selected set meal (quantity = guests) and
+each selected transport leg (quantity = guests), with the partner that
+earns it and the unit price. Partner booking counts and revenue are then
+indexed lookups on booking_items(partner_id) instead of scans of
+bookings.customizations. Amounts follow the revenue split applied when a
+schedule is completed.
+
+create_booking writes the items in the booking transaction;
+backfill_booking_items() fills them in for older bookings.
+"""
+
+from psycopg2.extras import execute_values
+
+# booking_items.item_type -> partner_type of the partner earning it
+ITEM_PARTNER_TYPES = {
+    'room': 'accommodation',
+    'meal': 'restaurant',
+    'transport': 'transportation',
+}
+
+
+def _room_from(customizations):
+    """Return (room_price, room_ref) of the upgraded room, falling back to the default room."""
+    room = customizations.get('room_upgrade') or customizations.get('default_room')
+    if not room:
+        return None, None
+    return room.get('room_price', 0), room.get('room_id')
+
+
+def _meal_key(tour_id, day_number, meal_session):
+    try:
+        day_number = int(day_number)
+    except (TypeError, ValueError):
+        pass
+    return (tour_id, day_number, meal_session)
+
+
+def build_booking_items(cur, bookings):
+    """
+    Item rows for [(booking_id, tour_id, number_of_guests, customizations)].
+    Rooms, meals, transport and tour nights are prefetched for all bookings,
+    so the number of queries does not grow with the number of bookings.
+    """
+    if not bookings:
+        return []
+    tour_ids = list({booking[1] for booking in bookings if booking[1] is not None})
+
+    # Rooms are referenced by id or, in older bookings, by room type
+    room_refs = set()
+    for booking in bookings:
+        _, room_ref = _room_from(booking[3] or {})
+        if room_ref:
+            room_refs.add(str(room_ref))
+
+    rooms_by_id = {}
+    rooms_by_type = {}
+    if room_refs:
+        cur.execute("""
+            SELECT ar.id, ar.room_type, acs.partner_id
+            FROM accommodation_rooms ar
+            INNER JOIN accommodation_services acs ON ar.accommodation_id = acs.id
+            WHERE ar.id = ANY(%s) OR ar.room_type = ANY(%s)
+            ORDER BY ar.id
+        """, ([int(ref) for ref in room_refs if ref.isdigit()], list(room_refs)))
+        for room_id, room_type, partner_id in cur.fetchall():
+            rooms_by_id[str(room_id)] = (room_id, partner_id)
+            rooms_by_type.setdefault(room_type, (room_id, partner_id))
+
+    cur.execute("""
+        SELECT id, COALESCE(duration_nights, 0) FROM tours_admin WHERE id = ANY(%s)
+    """, (tour_ids,))
+    nights_by_tour = dict(cur.fetchall())
+
+    cur.execute("""
+        SELECT tssm.tour_id, tssm.day_number, tssm.meal_session, rsm.id, rsm.total_price, rs.partner_id
+        FROM tour_selected_set_meals tssm
+        INNER JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
+        INNER JOIN restaurant_services rs ON rsm.restaurant_id = rs.id
+        WHERE tssm.tour_id = ANY(%s)
+        ORDER BY tssm.id
+    """, (tour_ids,))
+    meals_by_key = {}
+    for meal_tour_id, day_number, meal_session, set_meal_id, meal_price, partner_id in cur.fetchall():
+        meals_by_key.setdefault(
+            _meal_key(meal_tour_id, day_number, meal_session), (set_meal_id, meal_price, partner_id)
+        )
+
+    cur.execute("""
+        SELECT DISTINCT ON (ts.tour_id) ts.tour_id, trs.id, trs.base_price, trs.partner_id
+        FROM tour_services ts
+        INNER JOIN transportation_services trs ON ts.transportation_id = trs.id
+        WHERE ts.tour_id = ANY(%s) AND ts.service_type = 'transportation'
+        ORDER BY ts.tour_id, ts.id
+    """, (tour_ids,))
+    transport_by_tour = {row[0]: row[1:] for row in cur.fetchall()}
+
+    # (booking_id, item_type, partner_id, service_id, day_number, meal_session, leg,
+    #  quantity, unit_price, amount)
+    items = []
+    for booking_id, tour_id, number_of_guests, customizations in bookings:
+        customizations = customizations or {}
+        number_of_guests = number_of_guests or 1
+
+        # Room: 2 people per room (actual_people_count if available) for every night
+        room_price, room_ref = _room_from(customizations)
+        room = None
+        if room_ref:
+            room_ref = str(room_ref)
+            room = rooms_by_id.get(room_ref) or rooms_by_type.get(room_ref)
+        if room:
+            actual_guests = customizations.get('actual_people_count', number_of_guests)
+            quantity = max(1, (actual_guests + 1) // 2) * nights_by_tour.get(tour_id, 0)
+            unit_price = float(room_price or 0)
+            items.append((booking_id, 'room', room[1], room[0], None, None, None,
+                          quantity, unit_price, unit_price * quantity))
+
+        # Meals: each selected set meal per guest
+        for meal in customizations.get('selected_meals', []) or []:
+            day_number, meal_session = meal.get('day_number'), meal.get('meal_session')
+            meal_info = meals_by_key.get(_meal_key(tour_id, day_number, meal_session))
+            if meal_info:
+                set_meal_id, meal_price, partner_id = meal_info
+                unit_price = float(meal_price or 0)
+                items.append((booking_id, 'meal', partner_id, set_meal_id,
+                              _meal_key(tour_id, day_number, meal_session)[1], meal_session, None,
+                              number_of_guests, unit_price, unit_price * number_of_guests))
+
+        # Transport: one-way price per guest for each selected leg
+        transport = transport_by_tour.get(tour_id)
+        if transport:
+            transport_id, one_way_price, partner_id = transport
+            unit_price = float(one_way_price or 0)
+            transport_options = customizations.get('transport_options', {}) or {}
+            for leg in ('outbound', 'return'):
+                if transport_options.get(leg):
+                    items.append((booking_id, 'transport', partner_id, transport_id, None, None, leg,
+                                  number_of_guests, unit_price, unit_price * number_of_guests))
+    return items
+
+
+def write_booking_items(cur, bookings):
+    """Insert the items of the given bookings. Returns the number of rows written."""
+    items = build_booking_items(cur, bookings)
+    if items:
+        execute_values(cur, """
+            INSERT INTO booking_items
+            (booking_id, item_type, partner_id, service_id, day_number, meal_session, leg,
+             quantity, unit_price, amount)
+            VALUES %s
+        """, items)
+    return len(items)
+
+
+def backfill_booking_items(cur, booking_ids=None, batch_size=500):
+    """
+    Write items for bookings that have none, in id order and batches of
+    `batch_size` (all bookings, or only `booking_ids`). The caller commits.
+    Returns the number of bookings examined.
+    """
+    examined = 0
+    after_id = 0
+    while True:
+        cur.execute("""
+            SELECT b.id, b.tour_id, b.number_of_guests, b.customizations
+            FROM bookings b
+            WHERE b.id > %s
+              AND (%s::int[] IS NULL OR b.id = ANY(%s::int[]))
+              AND NOT EXISTS (SELECT 1 FROM booking_items bi WHERE bi.booking_id = b.id)
+            ORDER BY b.id
+            LIMIT %s
+        """, (after_id, booking_ids, booking_ids, batch_size))
+        bookings = cur.fetchall()
+        if not bookings:
+            return examined
+        write_booking_items(cur, bookings)
+        examined += len(bookings)
+        after_id = bookings[-1][0]
@@ -72,13 +72,13 @@ VIETNAM_CITIES = [
 ]
 
 def init_cities():
-    """Initialize cities in database if not exists"""
+    """Initialize cities in database if not exists. Returns False on failure."""
     conn = None
     try:
         conn = get_connection()
         if conn is None:
             print("❌ Cannot initialize cities: Database connection failed.")
-            return
+            return False
         
         cur = conn.cursor()
         
@@ -89,7 +89,7 @@ def init_cities():
         if count > 0:
             print(f"✅ Cities already initialized. Total: {count}")
             cur.close()
-            return
+            return True
         
         # Add all cities
         for city_data in VIETNAM_CITIES:
@@ -102,10 +102,16 @@ def init_cities():
         cur.close()
         print(f"✅ Successfully initialized {len(VIETNAM_CITIES)} cities!")
         
+        # Serve the new cities from the reference data cache
+        from src.services.reference_data import reload_reference_data
+        reload_reference_data()
+        return True
+        
     except Exception as e:
         if conn:
             conn.rollback()
         print(f"⚠️ Error initializing cities: {str(e)}")
+        return False
     finally:
         if conn:
             conn.close()
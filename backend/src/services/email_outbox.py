@@ -0,0 +1,370 @@
+"""
+Durable email outbox.
+
+email_service.send_email() stores messages in the email_outbox table instead
+of calling SendGrid inside the request. A background worker claims due rows in
+batches (FOR UPDATE SKIP LOCKED, so several workers/processes can run), sends
+them through a pluggable transport under a rate limit, and reschedules
+failures with exponential backoff until max_attempts is reached.
+
+Inside `with collect_emails(cur):` enqueued emails are written with the
+caller's cursor, i.e. in the same transaction as the booking/cancellation that
+triggered them, and only become visible to the worker once it commits.
+
+Settings (environment):
+    EMAIL_OUTBOX_ENABLED   'false' sends synchronously like before (default 'true')
+    EMAIL_OUTBOX_WORKER    'thread' runs the worker in the web process (default),
+                           'off' when a separate `python -m src.services.email_outbox` runs it
+    EMAIL_TRANSPORT        'sendgrid' (default) or 'fake'
+    EMAIL_BATCH_SIZE, EMAIL_SEND_THREADS, EMAIL_RATE_PER_SECOND, EMAIL_POLL_INTERVAL,
+    EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_BASE_DELAY, EMAIL_RETRY_MAX_DELAY
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from config.database import get_connection
+
+OUTBOX_ENABLED = os.getenv("EMAIL_OUTBOX_ENABLED", "true").lower() not in ("0", "false", "no")
+BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+SEND_THREADS = int(os.getenv("EMAIL_SEND_THREADS", 4))
+RATE_PER_SECOND = float(os.getenv("EMAIL_RATE_PER_SECOND", 10))
+POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 5))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+RETRY_BASE_DELAY = float(os.getenv("EMAIL_RETRY_BASE_DELAY", 30))
+RETRY_MAX_DELAY = float(os.getenv("EMAIL_RETRY_MAX_DELAY", 3600))
+# Rows stuck in 'sending' longer than this (worker crashed mid-batch) are retried
+STALE_LOCK_SECONDS = 600
+
+
+class EmailDeliveryError(Exception):
+    """Raised by a transport when a message could not be delivered."""
+
+
+class SendGridTransport:
+    """Delivers through email_service.deliver_email (SendGrid)."""
+
+    def send(self, message):
+        from src.services.email_service import deliver_email
+        if not deliver_email(message['to_email'], message['subject'],
+                             message['html_content'], message.get('text_content')):
+            raise EmailDeliveryError("SendGrid rejected the message or is not configured")
+
+
+class FakeTransport:
+    """
+    In-memory transport for tests and local development.
+    `fail_times` makes the first N sends raise, to exercise retries.
+    """
+
+    def __init__(self, fail_times=0):
+        self.sent = []
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise EmailDeliveryError("Fake transport failure")
+            self.sent.append(dict(message))
+
+
+class RateLimiter:
+    """Token bucket shared by the sending threads."""
+
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _create_default_transport():
+    if os.getenv("EMAIL_TRANSPORT", "sendgrid").lower() == "fake":
+        return FakeTransport()
+    return SendGridTransport()
+
+
+_transport = _create_default_transport()
+_rate_limiter = RateLimiter(RATE_PER_SECOND)
+_collector = threading.local()
+_wakeup = threading.Event()
+
+
+def set_transport(transport):
+    """Install a different transport (any object with send(message))."""
+    global _transport
+    _transport = transport
+
+
+def get_transport():
+    return _transport
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retry number `attempts` (1-based), with jitter."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.9, 1.1)
+
+
+# ------------------------------------------------------------------
+# Enqueueing
+# ------------------------------------------------------------------
+@contextmanager
+def collect_emails(cur):
+    """Write emails enqueued inside the block with `cur` (the caller's transaction)."""
+    previous = getattr(_collector, 'cur', None)
+    _collector.cur = cur
+    try:
+        yield
+    finally:
+        _collector.cur = previous
+
+
+def enqueue_email(to_email, subject, html_content, text_content=None, max_attempts=MAX_ATTEMPTS):
+    """Store an email for delivery by the worker. Returns the outbox id, or None on failure."""
+    sql = """
+        INSERT INTO email_outbox (to_email, subject, html_content, text_content, max_attempts)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING id
+    """
+    params = (to_email, subject, html_content, text_content, max_attempts)
+
+    cur = getattr(_collector, 'cur', None)
+    if cur is not None:
+        # Savepoint so a failed insert does not abort the caller's transaction
+        cur.execute("SAVEPOINT email_outbox_enqueue")
+        try:
+            cur.execute(sql, params)
+            outbox_id = cur.fetchone()[0]
+            cur.execute("RELEASE SAVEPOINT email_outbox_enqueue")
+            return outbox_id
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT email_outbox_enqueue")
+            print(f"❌ Could not queue email to {to_email}: {e}")
+            return None
+
+    conn = get_connection()
+    if conn is None:
+        print(f"❌ Could not queue email to {to_email}: Database connection failed.")
+        return None
+    own_cur = conn.cursor()
+    try:
+        own_cur.execute(sql, params)
+        outbox_id = own_cur.fetchone()[0]
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Could not queue email to {to_email}: {e}")
+        return None
+    finally:
+        own_cur.close()
+        conn.close()
+    _wakeup.set()
+    return outbox_id
+
+
+def notify_worker():
+    """Wake the in-process worker, e.g. after committing emails queued with collect_emails()."""
+    _wakeup.set()
+
+
+# ------------------------------------------------------------------
+# Delivery
+# ------------------------------------------------------------------
+def _claim_batch(cur, batch_size):
+    cur.execute("""
+        UPDATE email_outbox
+        SET status = 'pending', locked_at = NULL
+        WHERE status = 'sending'
+          AND locked_at < NOW() - (%s * INTERVAL '1 second')
+    """, (STALE_LOCK_SECONDS,))
+    cur.execute("""
+        UPDATE email_outbox
+        SET status = 'sending', locked_at = NOW(), attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM email_outbox
+            WHERE status = 'pending' AND next_attempt_at <= NOW()
+            ORDER BY next_attempt_at, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, to_email, subject, html_content, text_content, attempts, max_attempts
+    """, (batch_size,))
+    columns = ('id', 'to_email', 'subject', 'html_content', 'text_content', 'attempts', 'max_attempts')
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def _deliver(message):
+    _rate_limiter.acquire()
+    try:
+        _transport.send(message)
+        return message, None
+    except Exception as e:
+        return message, str(e) or e.__class__.__name__
+
+
+def process_outbox_once(batch_size=BATCH_SIZE, executor=None):
+    """
+    Claim and deliver one batch of due emails.
+    Returns (sent, failed) counts; (0, 0) when nothing is due.
+    """
+    conn = get_connection()
+    if conn is None:
+        return 0, 0
+
+    cur = conn.cursor()
+    try:
+        batch = _claim_batch(cur, batch_size)
+        conn.commit()
+        if not batch:
+            return 0, 0
+
+        if executor is not None:
+            results = list(executor.map(_deliver, batch))
+        else:
+            results = [_deliver(message) for message in batch]
+
+        sent_ids = [message['id'] for message, error in results if error is None]
+        retries = []
+        failures = []
+        for message, error in results:
+            if error is None:
+                continue
+            if message['attempts'] >= message['max_attempts']:
+                failures.append((error, message['id']))
+            else:
+                retries.append((retry_delay(message['attempts']), error, message['id']))
+
+        if sent_ids:
+            cur.execute("""
+                UPDATE email_outbox
+                SET status = 'sent', sent_at = NOW(), locked_at = NULL, last_error = NULL
+                WHERE id = ANY(%s)
+            """, (sent_ids,))
+        if retries:
+            cur.executemany("""
+                UPDATE email_outbox
+                SET status = 'pending', locked_at = NULL,
+                    next_attempt_at = NOW() + (%s * INTERVAL '1 second'),
+                    last_error = %s
+                WHERE id = %s
+            """, retries)
+        if failures:
+            cur.executemany("""
+                UPDATE email_outbox
+                SET status = 'failed', locked_at = NULL, last_error = %s
+                WHERE id = %s
+            """, failures)
+        conn.commit()
+
+        for error, outbox_id in failures:
+            print(f"❌ Email #{outbox_id} failed permanently: {error}")
+        return len(sent_ids), len(retries) + len(failures)
+
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Email outbox batch failed: {e}")
+        return 0, 0
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_outbox_stats():
+    """Row counts per status, plus the oldest pending email's age in seconds."""
+    conn = get_connection()
+    if conn is None:
+        return None
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+        stats = {status: count for status, count in cur.fetchall()}
+        cur.execute("""
+            SELECT EXTRACT(EPOCH FROM NOW() - MIN(created_at))
+            FROM email_outbox WHERE status = 'pending'
+        """)
+        oldest = cur.fetchone()[0]
+        stats['oldest_pending_seconds'] = float(oldest) if oldest is not None else None
+        return stats
+    finally:
+        cur.close()
+        conn.close()
+
+
+class OutboxWorker(threading.Thread):
+    """Daemon thread draining the outbox; sends each batch on a small thread pool."""
+
+    def __init__(self, batch_size=BATCH_SIZE, send_threads=SEND_THREADS, poll_interval=POLL_INTERVAL):
+        super().__init__(name='email-outbox-worker', daemon=True)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=send_threads, thread_name_prefix='email-send')
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        _wakeup.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                sent, failed = process_outbox_once(self.batch_size, self.executor)
+            except Exception as e:
+                print(f"[ERROR] Email outbox worker: {e}")
+                sent, failed = 0, 0
+            # A full batch probably means more rows are due right now
+            if sent + failed >= self.batch_size:
+                continue
+            _wakeup.wait(self.poll_interval)
+            _wakeup.clear()
+        self.executor.shutdown(wait=True)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_email_worker():
+    """Start the in-process outbox worker once (no-op if disabled or already running)."""
+    global _worker
+    if not OUTBOX_ENABLED or os.getenv("EMAIL_OUTBOX_WORKER", "thread").lower() != "thread":
+        return None
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = OutboxWorker()
+            _worker.start()
+    return _worker
+
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m src.services.email_outbox
+    print("📧 Email outbox worker started")
+    worker = OutboxWorker()
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
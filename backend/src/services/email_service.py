@@ -8,6 +8,7 @@ from sendgrid.helpers.mail import Mail, Email, To, Content
 from flask import current_app, url_for
 from datetime import datetime
 import logging
+from src.services.email_outbox import OUTBOX_ENABLED, enqueue_email
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,31 @@ else:
 
 def send_email(to_email, subject, html_content, text_content=None):
     """
-    Send an email using SendGrid
+    Queue an email for delivery by the outbox worker (see email_outbox.py).
+    With EMAIL_OUTBOX_ENABLED=false it is sent immediately instead.
+    
+    Args:
+        to_email: Recipient email address
+        subject: Email subject
+        html_content: HTML email content
+        text_content: Plain text email content (optional)
+    
+    Returns:
+        bool: True if queued (or sent) successfully, False otherwise
+    """
+    if not to_email:
+        logger.error("No recipient email provided.")
+        return False
+    
+    if not OUTBOX_ENABLED:
+        return deliver_email(to_email, subject, html_content, text_content)
+    
+    return enqueue_email(to_email, subject, html_content, text_content) is not None
+
+
+def deliver_email(to_email, subject, html_content, text_content=None):
+    """
+    Send an email using SendGrid right away
     
     Args:
         to_email: Recipient email address
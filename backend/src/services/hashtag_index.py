@@ -0,0 +1,161 @@
+"""
+In-memory hashtag autocomplete index.
+
+social_hashtag rows are loaded into a prefix trie whose nodes keep their
+best completions (highest usage_count first), so a lookup is a walk of
+len(prefix) nodes. Keys are accent-insensitive (remove_vietnamese_accents)
+and every word of a PascalCase hashtag is indexed, so "nang", "đà n" and
+"danang" all complete to #DaNang.
+
+Usage counts bumped by create_post / auto posts are applied incrementally
+with record_usage(). Hashtags created by database triggers (new cities and
+tours) are picked up by the periodic reload (HASHTAG_INDEX_TTL seconds).
+"""
+
+import os
+import threading
+import time
+
+from config.database import get_connection
+from migrate_social_hashtag import remove_vietnamese_accents
+
+HASHTAG_INDEX_TTL = int(os.getenv("HASHTAG_INDEX_TTL", 300))
+# Completions kept per trie node, i.e. the largest `limit` a lookup can serve
+TOP_K = 50
+
+
+def normalize_key(text):
+    """Lowercase, accent-free, alphanumeric-only form used for matching."""
+    return remove_vietnamese_accents(text or '').lower()
+
+
+def _index_keys(hashtag):
+    """Keys a hashtag is reachable by: the whole tag and each word-start suffix."""
+    tag = (hashtag or '').lstrip('#')
+    keys = []
+    for i, char in enumerate(tag):
+        if not char.isalnum():
+            continue
+        prev = tag[i - 1] if i else ''
+        # A word starts after a separator, at an uppercase letter or at a digit run
+        if (not prev.isalnum() or (char.isupper() and not prev.isupper())
+                or (char.isdigit() and not prev.isdigit())):
+            key = normalize_key(tag[i:])
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class HashtagIndex:
+    """Prefix trie of hashtags ranked by usage_count."""
+
+    def __init__(self, ttl=HASHTAG_INDEX_TTL, top_k=TOP_K):
+        self.ttl = ttl
+        self.top_k = top_k
+        self._entries = {}
+        self._root = _Node()
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def _rank(self, hashtag):
+        return (-self._entries[hashtag]['usage_count'], hashtag)
+
+    def _promote(self, node, hashtag):
+        top = node.top
+        if hashtag not in top:
+            if len(top) >= self.top_k and self._rank(hashtag) >= self._rank(top[-1]):
+                return
+            top = top + [hashtag]
+        # Swap in a new list so concurrent readers never see a half-sorted one
+        node.top = sorted(top, key=self._rank)[:self.top_k]
+
+    def _insert(self, root, hashtag):
+        self._promote(root, hashtag)
+        for key in _index_keys(hashtag):
+            node = root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+                self._promote(node, hashtag)
+
+    def load(self, rows):
+        """Replace the index with (hashtag, usage_count, source_type) rows."""
+        entries = {
+            hashtag: {'hashtag': hashtag, 'usage_count': usage_count or 0, 'source_type': source_type}
+            for hashtag, usage_count, source_type in rows
+        }
+        with self._lock:
+            self._entries = entries
+            root = _Node()
+            for hashtag in sorted(entries, key=self._rank):
+                self._insert(root, hashtag)
+            self._root = root
+            self._loaded_at = time.monotonic()
+
+    def reload(self):
+        """Load all hashtags from social_hashtag. Returns False if the database is unavailable."""
+        conn = get_connection()
+        if conn is None:
+            return False
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT hashtag, usage_count, source_type FROM social_hashtag")
+            self.load(cur.fetchall())
+            return True
+        finally:
+            cur.close()
+            conn.close()
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def record_usage(self, hashtag, usage_count, source_type=None):
+        """Apply a new usage_count for one hashtag (e.g. from UPDATE ... RETURNING)."""
+        with self._lock:
+            entry = self._entries.get(hashtag)
+            if entry is None:
+                self._entries[hashtag] = {
+                    'hashtag': hashtag, 'usage_count': usage_count, 'source_type': source_type
+                }
+            elif usage_count < entry['usage_count']:
+                # Nodes only track winners, so a drop needs a full rebuild
+                self.invalidate()
+                return
+            else:
+                entry['usage_count'] = usage_count
+            self._insert(self._root, hashtag)
+
+    def complete(self, prefix, limit=20):
+        """Top `limit` hashtags (by usage_count) having a word starting with `prefix`."""
+        if self.is_stale():
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[WARNING] Could not reload hashtag index: {e}")
+        limit = max(1, min(limit, self.top_k))
+        node = self._root
+        for char in normalize_key(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        entries = self._entries
+        return [dict(entries[hashtag]) for hashtag in node.top[:limit] if hashtag in entries]
+
+
+hashtag_index = HashtagIndex()
+
+
+def record_hashtag_usage(rows):
+    """Feed (hashtag, usage_count, source_type) rows returned by usage UPDATEs into the index."""
+    for hashtag, usage_count, source_type in rows:
+        hashtag_index.record_usage(hashtag, usage_count, source_type)
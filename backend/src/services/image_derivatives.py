@@ -0,0 +1,157 @@
+"""
+Responsive image derivatives for blob store images.
+
+For an original blob <digest><ext> this generates WebP copies
+<digest>_thumbnail.webp, <digest>_medium.webp and <digest>_large.webp in a
+background thread pool, so uploads return immediately. Their URLs are
+deterministic, which lets an upload response include the full manifest
+before the files exist; blob_routes serves the original until they do.
+
+Requires the optional Pillow package. Without it no derivatives are generated
+and derivative URLs keep falling back to the original.
+"""
+
+import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.blob_store import BLOB_NAME_RE, BLOB_URL_PREFIX, blob_path, blob_url, store_blob, write_blob
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+# Variant name -> maximum width in pixels
+DERIVATIVE_WIDTHS = {
+    'thumbnail': 320,
+    'medium': 800,
+    'large': 1600,
+}
+DEFAULT_LISTING_VARIANT = 'thumbnail'
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+
+BLOB_URL_RE = re.compile(r'^(.*' + re.escape(BLOB_URL_PREFIX) + r')([0-9a-f]{64})(\.[a-z0-9]+)$')
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+# Originals Pillow could not process; not retried until the process restarts
+_failed = set()
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("IMAGE_WORKERS", 2)),
+                    thread_name_prefix='image-derivatives'
+                )
+    return _executor
+
+
+def derivative_name(original_name, variant):
+    digest = BLOB_NAME_RE.match(original_name).group(1)
+    return f"{digest}_{variant}.webp"
+
+
+def generate_derivatives(original_name):
+    """Create any missing WebP derivatives for an original blob. Runs in the worker pool."""
+    if Image is None:
+        return []
+    path = blob_path(original_name)
+    created = []
+    with Image.open(path) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        for variant, max_width in DERIVATIVE_WIDTHS.items():
+            name = derivative_name(original_name, variant)
+            if os.path.exists(blob_path(name)):
+                continue
+            resized = image
+            if image.width > max_width:
+                height = max(1, round(image.height * max_width / image.width))
+                resized = image.resize((max_width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+            write_blob(name, buffer.getvalue())
+            created.append(name)
+    return created
+
+
+def _run_derivatives(original_name):
+    failed = False
+    try:
+        generate_derivatives(original_name)
+    except Exception as e:
+        failed = True
+        print(f"[WARNING] Could not generate image derivatives for {original_name}: {e}")
+    finally:
+        with _pending_lock:
+            _pending.discard(original_name)
+            if failed:
+                _failed.add(original_name)
+
+
+def schedule_derivatives(original_name):
+    """Queue derivative generation for an original blob (no-op if already queued or failed)."""
+    if Image is None:
+        return False
+    with _pending_lock:
+        if original_name in _pending or original_name in _failed:
+            return False
+        _pending.add(original_name)
+    _get_executor().submit(_run_derivatives, original_name)
+    return True
+
+
+def image_manifest(original_url):
+    """
+    Describe the responsive versions of an uploaded blob image:
+    {'original', 'thumbnail', 'medium', 'large', 'srcset'}.
+    URLs that are not blob originals get a manifest pointing at the URL itself.
+    """
+    manifest = {'original': original_url}
+    for variant in DERIVATIVE_WIDTHS:
+        manifest[variant] = image_variant_url(original_url, variant)
+    if not BLOB_URL_RE.match(original_url or ''):
+        manifest['srcset'] = None
+        return manifest
+    manifest['srcset'] = ', '.join(
+        f"{manifest[variant]} {width}w" for variant, width in DERIVATIVE_WIDTHS.items()
+    )
+    return manifest
+
+
+def image_variant_url(url, variant=DEFAULT_LISTING_VARIANT):
+    """
+    Return the URL of a derivative of a blob image, e.g. for listings.
+    Non-blob URLs (external links, legacy data) and 'original' are returned unchanged.
+    """
+    if not url or variant not in DERIVATIVE_WIDTHS:
+        return url
+    match = BLOB_URL_RE.match(url)
+    if not match:
+        return url
+    return f"{match.group(1)}{match.group(2)}_{variant}.webp"
+
+
+def store_upload(data, mime_type):
+    """Store an uploaded image, queue its derivatives and return the original's URL."""
+    name = store_blob(data, mime_type)
+    schedule_derivatives(name)
+    return blob_url(name)
+
+
+def listing_variant(args):
+    """Derivative requested by a listing's ?image_size= argument (default: thumbnail)."""
+    variant = args.get('image_size', DEFAULT_LISTING_VARIANT)
+    return variant if variant in DERIVATIVE_WIDTHS or variant == 'original' else DEFAULT_LISTING_VARIANT
@@ -0,0 +1,102 @@
+"""
+Background sweep of tour_listing_summary rows whose next departure has passed.
+
+Triggers keep tour_listing_summary current on writes, but a schedule leaving
+the "upcoming" window is not a write. A daemon thread recomputes those rows
+every LISTING_SUMMARY_REFRESH_INTERVAL seconds, so tour listings only read.
+When several processes run the sweep, an advisory lock lets one of them do
+each round.
+
+Settings (environment):
+    LISTING_SUMMARY_REFRESH_INTERVAL  seconds between sweeps (default 60)
+    LISTING_SUMMARY_WORKER            'thread' runs the sweep in the web process (default),
+                                      'off' when a separate `python -m src.services.listing_summary` runs it
+"""
+
+import os
+import threading
+
+from config.database import get_connection
+
+REFRESH_INTERVAL = float(os.getenv("LISTING_SUMMARY_REFRESH_INTERVAL", 60))
+# Arbitrary application-wide key for pg_try_advisory_xact_lock
+SWEEP_LOCK_ID = 72_410_005
+
+
+def refresh_expired_listing_summaries():
+    """
+    Recompute the summaries of tours whose next departure is in the past.
+    Returns the number of tours refreshed (0 if another process holds the sweep).
+    """
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Database connection failed")
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (SWEEP_LOCK_ID,))
+        if not cur.fetchone()[0]:
+            conn.rollback()
+            return 0
+        cur.execute("""
+            SELECT refresh_tour_listing_summary(tour_id)
+            FROM tour_listing_summary
+            WHERE next_departure <= NOW()
+        """)
+        refreshed = cur.rowcount
+        conn.commit()
+        return refreshed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+class ListingSummaryWorker(threading.Thread):
+    """Daemon thread running refresh_expired_listing_summaries() periodically."""
+
+    def __init__(self, interval=REFRESH_INTERVAL):
+        super().__init__(name='listing-summary-worker', daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                refresh_expired_listing_summaries()
+            except Exception as e:
+                print(f"[WARNING] Could not refresh tour listing summaries: {e}")
+            self._stop_event.wait(self.interval)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_listing_summary_worker():
+    """Start the in-process sweep once (no-op if disabled or already running)."""
+    global _worker
+    if os.getenv("LISTING_SUMMARY_WORKER", "thread").lower() != "thread":
+        return None
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = ListingSummaryWorker()
+            _worker.start()
+    return _worker
+
+
+if __name__ == "__main__":
+    # Standalone sweep process: python -m src.services.listing_summary
+    print("🗓️ Tour listing summary sweep started")
+    worker = ListingSummaryWorker()
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
@@ -0,0 +1,63 @@
+"""
+Short-lived in-memory cache for the admin partners summary
+(GET /api/partners/summary).
+
+The per-partner tour counts are precomputed in
+partner_dashboard_summary.support_tours (see migrate_partner_service_map.py),
+so a refresh is one join over users; the cache only spares repeated admin
+page loads. New partners, avatars and tour links show up once the copy
+expires (PARTNERS_SUMMARY_CACHE_TTL seconds).
+"""
+
+import os
+import time
+
+from config.database import get_connection
+
+PARTNERS_SUMMARY_CACHE_TTL = int(os.getenv("PARTNERS_SUMMARY_CACHE_TTL", 30))
+
+PARTNERS_SUMMARY_QUERY = """
+    SELECT
+        u.id AS partner_id,
+        u.username AS partner_name,
+        u.avatar_url,
+        u.partner_type,
+        COALESCE(pds.support_tours, 0) AS support_tours
+    FROM users u
+    LEFT JOIN partner_dashboard_summary pds ON pds.partner_id = u.id
+    WHERE u.role = 'partner'
+    ORDER BY u.username
+"""
+
+_cache = None
+
+
+def _fetch():
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Database connection failed")
+    cur = conn.cursor()
+    try:
+        cur.execute(PARTNERS_SUMMARY_QUERY)
+        rows = cur.fetchall()
+        conn.rollback()
+        return [{
+            'partner_id': row[0],
+            'partner_name': row[1],
+            'avatar_url': row[2],
+            'partner_type': row[3],
+            'support_tours': int(row[4])
+        } for row in rows]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_partner_summaries():
+    """All partners with avatar, type and number of tours using their services."""
+    global _cache
+    cache = _cache
+    if cache is None or time.monotonic() - cache['loaded_at'] > PARTNERS_SUMMARY_CACHE_TTL:
+        cache = {'partners': _fetch(), 'loaded_at': time.monotonic()}
+        _cache = cache
+    return cache['partners']
@@ -0,0 +1,316 @@
+"""
+Tour price calculation shared by the admin tour editor, sync_all_tours, the
+seed script and the booking revenue verification.
+
+Prices are read into a PriceCatalog with one query per component type
+(rooms, set meals, transport) for any number of ids, and tour compositions
+with one query per table for any number of tours (load_tour_components), so
+pricing a batch of tours costs a constant number of queries. quote() is pure
+arithmetic over those lookups.
+
+Pricing rules:
+- accommodation: room base_price x quantity x nights (nights = days - 1, min 1)
+- restaurants: set meal price (per person) x members
+- transportation: base_price (per person, one way) x members x 2
+- total: sum rounded up to the next thousand VND
+"""
+
+import math
+import re
+from functools import lru_cache
+
+# Legacy free-text durations ("3 ngày 2 đêm", "2 days 1 night")
+_NIGHTS_PATTERN = re.compile(r'(\d+)\s*(?:night|đêm)')
+_DAYS_PATTERN = re.compile(r'(\d+)\s*(?:day|ngày)')
+
+
+def round_to_thousands(price):
+    """Round price up to the next thousand (e.g., 649,000 -> 650,000, 911,900 -> 912,000)"""
+    return math.ceil(price / 1000) * 1000
+
+
+def nights_for_days(days):
+    """Number of nights for a tour of `days` days (2 days = 1 night, minimum 1)."""
+    return max(1, int(days or 1) - 1)
+
+
+def billable_nights(duration_nights):
+    """Nights charged for accommodation (tours_admin.duration_nights, minimum 1)."""
+    return max(1, duration_nights or 0)
+
+
+@lru_cache(maxsize=256)
+def _parse_duration_text(text):
+    if text.isdigit():
+        return nights_for_days(int(text))
+    match = _NIGHTS_PATTERN.search(text)
+    if match:
+        return int(match.group(1))
+    match = _DAYS_PATTERN.search(text)
+    if match:
+        return nights_for_days(int(match.group(1)))
+    return 1
+
+
+def nights_from_duration(duration):
+    """
+    Number of nights for a duration submitted by a client (not yet saved):
+    a day count (int or numeric string) or a legacy "X days Y nights" string.
+    Defaults to 1. Saved tours use tours_admin.duration_nights instead.
+    """
+    if isinstance(duration, (int, float)):
+        return nights_for_days(duration)
+    return _parse_duration_text(str(duration or '').strip().lower())
+
+
+def people_per_room(bed_type):
+    """Guests per room: King bed = 3 people, other beds = 2."""
+    return 3 if bed_type == 'King' else 2
+
+
+class PriceCatalog:
+    """Prices of rooms, set meals and transport services, keyed by id."""
+
+    __slots__ = ('rooms', 'set_meals', 'transports')
+
+    def __init__(self, rooms=None, set_meals=None, transports=None):
+        self.rooms = rooms or {}            # room_id -> (base_price, bed_type, room_type)
+        self.set_meals = set_meals or {}    # set_meal_id -> (total_price, name, meal_session)
+        self.transports = transports or {}  # transportation_id -> base_price
+
+    @classmethod
+    def load(cls, cur, room_ids=(), set_meal_ids=(), transport_ids=()):
+        """Load the given ids with at most three queries."""
+        catalog = cls()
+        room_ids = list({i for i in room_ids if i is not None})
+        set_meal_ids = list({i for i in set_meal_ids if i is not None})
+        transport_ids = list({i for i in transport_ids if i is not None})
+
+        if room_ids:
+            cur.execute("""
+                SELECT id, base_price, bed_type, room_type
+                FROM accommodation_rooms WHERE id = ANY(%s)
+            """, (room_ids,))
+            catalog.rooms = {
+                row[0]: (float(row[1]) if row[1] else 0.0, row[2], row[3])
+                for row in cur.fetchall()
+            }
+        if set_meal_ids:
+            cur.execute("""
+                SELECT id, total_price, name, meal_session
+                FROM restaurant_set_meals WHERE id = ANY(%s)
+            """, (set_meal_ids,))
+            catalog.set_meals = {
+                row[0]: (float(row[1]) if row[1] else 0.0, row[2], row[3])
+                for row in cur.fetchall()
+            }
+        if transport_ids:
+            cur.execute("""
+                SELECT id, base_price FROM transportation_services WHERE id = ANY(%s)
+            """, (transport_ids,))
+            catalog.transports = {
+                row[0]: float(row[1]) if row[1] else 0.0 for row in cur.fetchall()
+            }
+        return catalog
+
+    @classmethod
+    def for_tours(cls, cur, components):
+        """Catalog covering everything referenced by TourComponents objects."""
+        components = list(components)
+        return cls.load(
+            cur,
+            room_ids=[room_id for c in components for room_id, _ in c.rooms],
+            set_meal_ids=[set_meal_id for c in components for set_meal_id, _, _ in c.set_meals],
+            transport_ids=[c.transport_id for c in components],
+        )
+
+    def room_price(self, room_id):
+        room = self.rooms.get(room_id)
+        return room[0] if room else 0.0
+
+    def set_meal_price(self, set_meal_id):
+        meal = self.set_meals.get(set_meal_id)
+        return meal[0] if meal else 0.0
+
+    def transport_price(self, transport_id):
+        return self.transports.get(transport_id, 0.0)
+
+    def members_for_rooms(self, rooms):
+        """Guests housed by [(room_id, quantity)] (0 if no known rooms)."""
+        total = 0
+        for room_id, quantity in rooms:
+            room = self.rooms.get(room_id)
+            if room:
+                total += (quantity or 0) * people_per_room(room[1])
+        return total
+
+
+class TourComponents:
+    """The priced parts of one saved tour."""
+
+    __slots__ = ('tour_id', 'duration_nights', 'rooms', 'set_meals', 'transport_id')
+
+    def __init__(self, tour_id, duration_nights=None):
+        self.tour_id = tour_id
+        self.duration_nights = duration_nights
+        self.rooms = []         # [(room_id, quantity)]
+        self.set_meals = []     # [(set_meal_id, day_number, meal_session)]
+        self.transport_id = None
+
+
+def load_tour_components(cur, tour_ids):
+    """{tour_id: TourComponents} for the given tours, in four queries."""
+    tour_ids = list(tour_ids)
+    if not tour_ids:
+        return {}
+
+    cur.execute("""
+        SELECT id, duration_nights FROM tours_admin WHERE id = ANY(%s)
+    """, (tour_ids,))
+    components = {row[0]: TourComponents(row[0], row[1]) for row in cur.fetchall()}
+
+    cur.execute("""
+        SELECT tour_id, room_id, quantity FROM tour_room_bookings WHERE tour_id = ANY(%s)
+    """, (tour_ids,))
+    for tour_id, room_id, quantity in cur.fetchall():
+        if tour_id in components:
+            components[tour_id].rooms.append((room_id, quantity))
+
+    cur.execute("""
+        SELECT tour_id, set_meal_id, day_number, meal_session
+        FROM tour_selected_set_meals WHERE tour_id = ANY(%s)
+    """, (tour_ids,))
+    for tour_id, set_meal_id, day_number, meal_session in cur.fetchall():
+        if tour_id in components:
+            components[tour_id].set_meals.append((set_meal_id, day_number, meal_session))
+
+    # First transportation service linked to each tour
+    cur.execute("""
+        SELECT DISTINCT ON (tour_id) tour_id, transportation_id
+        FROM tour_services
+        WHERE tour_id = ANY(%s) AND service_type = 'transportation'
+        ORDER BY tour_id, id
+    """, (tour_ids,))
+    for tour_id, transport_id in cur.fetchall():
+        if tour_id in components:
+            components[tour_id].transport_id = transport_id
+
+    return components
+
+
+def quote(catalog, nights, number_of_members, rooms=(), set_meal_ids=(), transport_id=None):
+    """
+    Price breakdown {'accommodation', 'restaurants', 'transportation',
+    'total_price'} for the given rooms [(room_id, quantity)], set meal ids and
+    transport service. total_price is rounded up to the next thousand.
+    """
+    accommodation = sum(
+        catalog.room_price(room_id) * (quantity or 0) * nights for room_id, quantity in rooms
+    )
+    restaurants = sum(catalog.set_meal_price(set_meal_id) for set_meal_id in set_meal_ids) * number_of_members
+    transportation = (
+        catalog.transport_price(transport_id) * number_of_members * 2 if transport_id else 0  # Round trip
+    )
+    return {
+        'accommodation': accommodation,
+        'restaurants': restaurants,
+        'transportation': transportation,
+        'total_price': round_to_thousands(accommodation + restaurants + transportation),
+    }
+
+
+def quote_tour(components, catalog, number_of_members=None):
+    """
+    Quote a saved tour. Members default to the guests its rooms house (at
+    least 1). Returns (number_of_members, breakdown).
+    """
+    if number_of_members is None:
+        number_of_members = catalog.members_for_rooms(components.rooms) or 1
+    breakdown = quote(
+        catalog,
+        billable_nights(components.duration_nights),
+        number_of_members,
+        rooms=components.rooms,
+        set_meal_ids=[set_meal_id for set_meal_id, _, _ in components.set_meals],
+        transport_id=components.transport_id,
+    )
+    return number_of_members, breakdown
+
+
+def quote_tours(cur, tour_ids):
+    """{tour_id: (number_of_members, breakdown)} for saved tours, in at most seven queries."""
+    components = load_tour_components(cur, tour_ids)
+    catalog = PriceCatalog.for_tours(cur, components.values())
+    return {tour_id: quote_tour(c, catalog) for tour_id, c in components.items()}
+
+
+def booking_partner_revenue(cur, tour_id, nights, number_of_guests, customizations=None):
+    """
+    Expected partner revenue of a booking {'accommodation', 'restaurants',
+    'transportation'} from the tour's services and the guest's customizations
+    (room upgrade / default room price, selected meals, transport trips).
+    Uses two queries regardless of the number of selected meals.
+    """
+    customizations = customizations or {}
+    rooms_booked = (number_of_guests + 1) // 2
+
+    cur.execute("""
+        SELECT
+            (SELECT SUM(ar.base_price) FROM (
+                 SELECT DISTINCT tsr.room_id FROM tour_selected_rooms tsr WHERE tsr.tour_id = %s
+             ) r JOIN accommodation_rooms ar ON ar.id = r.room_id),
+            (SELECT COUNT(*) FROM (
+                 SELECT DISTINCT tsr.room_id FROM tour_selected_rooms tsr
+                 JOIN accommodation_rooms ar ON ar.id = tsr.room_id
+                 WHERE tsr.tour_id = %s
+             ) r),
+            (SELECT ts.service_cost FROM tour_services ts
+             WHERE ts.tour_id = %s AND ts.service_type = 'accommodation' LIMIT 1),
+            (SELECT SUM(ts.service_cost) FROM tour_services ts
+             WHERE ts.tour_id = %s AND ts.service_type = 'transportation')
+    """, (tour_id, tour_id, tour_id, tour_id))
+    selected_room_total, selected_room_count, accommodation_cost, transport_cost = cur.fetchone()
+
+    # Accommodation: the room the guest booked, else the tour's selected rooms, else tour_services
+    room_info = customizations.get('room_upgrade') or {}
+    if not room_info.get('room_price'):
+        room_info = customizations.get('default_room') or {}
+    if room_info.get('room_price'):
+        room_price = float(room_info['room_price'])
+    elif selected_room_count:
+        room_price = float(selected_room_total or 0) / selected_room_count
+    else:
+        room_price = float(accommodation_cost or 0)
+    accommodation = room_price * rooms_booked * nights
+
+    # Restaurants: the meals the guest kept, or every tour meal for old bookings
+    cur.execute("""
+        SELECT tssm.day_number, tssm.meal_session, rsm.total_price
+        FROM tour_selected_set_meals tssm
+        INNER JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
+        WHERE tssm.tour_id = %s
+    """, (tour_id,))
+    tour_meals = cur.fetchall()
+    selected_meals = customizations.get('selected_meals') or []
+    if selected_meals:
+        meal_prices = {}
+        for day_number, meal_session, price in tour_meals:
+            meal_prices.setdefault((day_number, meal_session), float(price or 0))
+        restaurant_prices = [
+            meal_prices.get((meal.get('day_number'), meal.get('meal_session')), 0)
+            for meal in selected_meals
+        ]
+    else:
+        restaurant_prices = [float(price or 0) for _, _, price in tour_meals]
+    restaurants = sum(restaurant_prices) * number_of_guests
+
+    # Transportation: one-way price per guest for each selected trip
+    transport_options = customizations.get('transport_options') or {}
+    trips = (1 if transport_options.get('outbound', True) else 0) + (1 if transport_options.get('return', True) else 0)
+    transportation = float(transport_cost or 0) * number_of_guests * trips
+
+    return {
+        'accommodation': accommodation,
+        'restaurants': restaurants,
+        'transportation': transportation,
+    }
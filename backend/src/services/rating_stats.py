@@ -0,0 +1,30 @@
+"""
+Per-tour rating aggregates from tour_rating_stats (see
+migrate_tour_rating_stats.py), kept current by a trigger on tour_reviews.
+
+Queries select RATING_STATS_COLUMNS with tour_rating_stats joined as `trs`
+and turn the values into response fields with rating_stats().
+"""
+
+RATING_STATS_COLUMNS = """
+    COALESCE(trs.review_count, 0), COALESCE(trs.rating_sum, 0),
+    COALESCE(trs.rating_1, 0), COALESCE(trs.rating_2, 0), COALESCE(trs.rating_3, 0),
+    COALESCE(trs.rating_4, 0), COALESCE(trs.rating_5, 0),
+    trs.last_review_at
+"""
+# Number of columns in RATING_STATS_COLUMNS
+RATING_STATS_WIDTH = 8
+
+
+def rating_stats(values):
+    """
+    (review_count, average rating rounded to 1 decimal, {'1'..'5': count},
+    last_review_at ISO string) from RATING_STATS_COLUMNS values (None = no reviews).
+    """
+    if not values:
+        return 0, 0, {str(star): 0 for star in range(1, 6)}, None
+    review_count, rating_sum = values[0], values[1]
+    average = round(rating_sum / review_count, 1) if review_count else 0
+    distribution = {str(star): values[1 + star] for star in range(1, 6)}
+    last_review_at = values[7].isoformat() if values[7] else None
+    return review_count, average, distribution, last_review_at
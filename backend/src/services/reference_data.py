@@ -0,0 +1,135 @@
+"""
+Process-wide cache of reference data: cities, regions, provinces and tour types.
+
+These tables only change when city_init.init_cities() runs (or an operator
+edits them), so they are read once into an immutable snapshot and the JSON
+responses of the reference endpoints are pre-serialized with a strong ETag.
+Requests are answered from memory; reload_reference_data() (called by
+init_cities and by POST /api/admin/stats/reference-data/reload) swaps in a
+new snapshot and bumps its version.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import Response, request
+
+from config.database import get_connection
+
+# Clients and proxies may reuse a response this long before revalidating
+REFERENCE_DATA_MAX_AGE = int(os.getenv("REFERENCE_DATA_MAX_AGE", 300))
+
+_snapshot = None
+_version = 0
+_lock = threading.Lock()
+
+
+def _entry(payload):
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+    etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return {'etag': etag, 'body': body}
+
+
+def _fetch_optional(cur, sql):
+    """Rows as dicts, or [] if the table does not exist in this database."""
+    cur.execute("SAVEPOINT reference_data")
+    try:
+        cur.execute(sql)
+        columns = [column[0] for column in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+        cur.execute("RELEASE SAVEPOINT reference_data")
+        return rows
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT reference_data")
+        print(f"[WARNING] Reference data: {e}")
+        return []
+
+
+def _build_snapshot(cities, regions, provinces, tour_types):
+    entries = {
+        'cities': _entry({'success': True, 'cities': cities}),
+        'city_list': _entry(cities),
+        'filters': _entry({'regions': regions, 'provinces': provinces, 'tourTypes': tour_types}),
+    }
+    for region in {city['region'] for city in cities}:
+        entries[f'cities_region:{region}'] = _entry({
+            'success': True,
+            'cities': [city for city in cities if city['region'] == region],
+        })
+    return entries
+
+
+def reload_reference_data():
+    """Read all reference tables and swap in a new snapshot. Returns the new version."""
+    global _snapshot, _version
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Database connection failed")
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id, name, code, region FROM cities ORDER BY name")
+        cities = [
+            {'id': row[0], 'name': row[1], 'code': row[2], 'region': row[3]}
+            for row in cur.fetchall()
+        ]
+        regions = _fetch_optional(cur, "SELECT * FROM regions ORDER BY name")
+        provinces = _fetch_optional(cur, "SELECT * FROM provinces ORDER BY name")
+        tour_types = _fetch_optional(cur, "SELECT * FROM tour_types ORDER BY name")
+        conn.rollback()
+    finally:
+        cur.close()
+        conn.close()
+
+    entries = _build_snapshot(cities, regions, provinces, tour_types)
+    with _lock:
+        _version += 1
+        _snapshot = {
+            'version': _version,
+            'loaded_at': time.time(),
+            'counts': {
+                'cities': len(cities),
+                'regions': len(regions),
+                'provinces': len(provinces),
+                'tour_types': len(tour_types),
+            },
+            'entries': entries,
+        }
+    return _version
+
+
+def _current_snapshot():
+    if _snapshot is None:
+        reload_reference_data()
+    return _snapshot
+
+
+def get_reference_entry(key):
+    """Return the cached {'etag', 'body'} for `key`, or None if there is no such entry."""
+    return _current_snapshot()['entries'].get(key)
+
+
+def get_reference_status():
+    snapshot = _current_snapshot()
+    return {
+        'version': snapshot['version'],
+        'loaded_at': snapshot['loaded_at'],
+        'counts': snapshot['counts'],
+    }
+
+
+def reference_response(key, default=None):
+    """
+    Serve a cached reference payload with its strong ETag and Cache-Control,
+    answering 304 when the client copy is current. `default` is served (and
+    not cached) when the key has no entry, e.g. an unknown region.
+    """
+    entry = get_reference_entry(key)
+    if entry is None:
+        entry = _entry(default)
+    response = Response(entry['body'], status=200, mimetype='application/json')
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = f'public, max-age={REFERENCE_DATA_MAX_AGE}'
+    return response.make_conditional(request)
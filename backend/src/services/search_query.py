@@ -0,0 +1,20 @@
+"""
+Helpers for building Postgres search predicates from user input.
+
+Used with the `vietnamese_unaccent` text search configuration and the
+f_unaccent() / pg_trgm setup created by migrate_post_search.
+"""
+
+import re
+
+
+def prefix_tsquery(text):
+    """Build a to_tsquery() string matching every word of `text` as a prefix ('da:* & nang:*')."""
+    words = re.findall(r"(?u)\w+", text or '')
+    return ' & '.join(f"{word}:*" for word in words)
+
+
+def like_pattern(text):
+    """Escape LIKE wildcards in user input and wrap it for substring matching."""
+    escaped = (text or '').replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
@@ -0,0 +1,169 @@
+"""
+Concurrency-safe reservation of tour schedule slots.
+
+Slots are taken with a single conditional UPDATE
+(... WHERE slots_available >= N RETURNING ...). Postgres re-checks the WHERE
+clause against the latest row version when concurrent transactions update the
+same schedule, so two checkouts can never both take the last slots.
+
+A hold reserves slots for a short time (BOOKING_HOLD_TTL_SECONDS) while the
+customer pays. Held slots are already counted in slots_booked; confirming the
+hold turns them into a booking, and releasing or expiring it gives them back.
+
+All functions take the caller's cursor and leave committing to the caller.
+"""
+
+import os
+import secrets
+
+HOLD_TTL_SECONDS = int(os.getenv("BOOKING_HOLD_TTL_SECONDS", 600))
+
+
+def slots_for_guests(number_of_guests):
+    """Slots needed for a party: each room holds 2 people, so slots = rooms x 2."""
+    rooms_needed = (int(number_of_guests) + 1) // 2  # Ceiling division
+    return rooms_needed * 2
+
+
+def reserve_slots(cur, schedule_id, tour_id, slots):
+    """
+    Atomically add `slots` to a bookable schedule.
+    Returns the remaining slots_available, or None if the schedule is not
+    bookable or does not have enough free slots.
+    """
+    cur.execute("""
+        UPDATE tour_schedules
+        SET slots_booked = slots_booked + %s,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND tour_id = %s AND is_active = TRUE
+            AND status NOT IN ('completed', 'cancelled')
+            AND departure_datetime > NOW()
+            AND slots_available >= %s
+        RETURNING slots_available
+    """, (slots, schedule_id, tour_id, slots))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def release_slots(cur, schedule_id, slots):
+    cur.execute("""
+        UPDATE tour_schedules
+        SET slots_booked = GREATEST(slots_booked - %s, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+    """, (slots, schedule_id))
+
+
+def describe_unavailable(cur, schedule_id, tour_id, slots):
+    """Explain why reserve_slots() failed, for the error response."""
+    cur.execute("""
+        SELECT slots_available
+        FROM tour_schedules
+        WHERE id = %s AND tour_id = %s AND is_active = TRUE
+            AND status NOT IN ('completed', 'cancelled')
+            AND departure_datetime > NOW()
+    """, (schedule_id, tour_id))
+    row = cur.fetchone()
+    if not row:
+        return 'Invalid, inactive, completed, or cancelled tour schedule'
+    return f'Not enough slots available. Requested: {slots}, Available: {row[0]}'
+
+
+def release_expired_holds(cur):
+    """Expire holds past their deadline and give their slots back. Returns the number expired."""
+    cur.execute("""
+        WITH expired AS (
+            UPDATE slot_holds
+            SET status = 'expired'
+            WHERE status = 'held' AND expires_at <= NOW()
+            RETURNING tour_schedule_id, slots
+        ),
+        released AS (
+            UPDATE tour_schedules ts
+            SET slots_booked = GREATEST(ts.slots_booked - e.total_slots, 0),
+                updated_at = CURRENT_TIMESTAMP
+            FROM (
+                SELECT tour_schedule_id, SUM(slots) AS total_slots
+                FROM expired
+                GROUP BY tour_schedule_id
+            ) e
+            WHERE ts.id = e.tour_schedule_id
+            RETURNING ts.id
+        )
+        SELECT (SELECT COUNT(*) FROM expired), (SELECT COUNT(*) FROM released)
+    """)
+    return cur.fetchone()[0]
+
+
+def create_hold(cur, schedule_id, tour_id, slots, ttl_seconds=HOLD_TTL_SECONDS):
+    """
+    Reserve slots for `ttl_seconds`.
+    Returns {'hold_token', 'expires_at', 'slots', 'slots_available'} or None if unavailable.
+    """
+    release_expired_holds(cur)
+    remaining = reserve_slots(cur, schedule_id, tour_id, slots)
+    if remaining is None:
+        return None
+
+    token = secrets.token_urlsafe(24)
+    cur.execute("""
+        INSERT INTO slot_holds (hold_token, tour_schedule_id, slots, expires_at)
+        VALUES (%s, %s, %s, NOW() + (%s * INTERVAL '1 second'))
+        RETURNING expires_at
+    """, (token, schedule_id, slots, ttl_seconds))
+    return {
+        'hold_token': token,
+        'expires_at': cur.fetchone()[0],
+        'slots': slots,
+        'slots_available': remaining,
+    }
+
+
+def confirm_hold(cur, hold_token, schedule_id, tour_id, slots):
+    """
+    Turn a live hold on one of `tour_id`'s schedules into a booking's slots.
+    If the hold covers more slots than needed the difference is released;
+    if it covers fewer, the missing slots are reserved atomically.
+    Returns True on success, False if the hold is missing/expired, belongs to
+    another tour's schedule, or the extra slots are not available (the caller
+    should then roll back).
+    """
+    cur.execute("""
+        UPDATE slot_holds sh
+        SET status = 'confirmed'
+        FROM tour_schedules ts
+        WHERE sh.hold_token = %s AND sh.tour_schedule_id = %s
+            AND ts.id = sh.tour_schedule_id AND ts.tour_id = %s
+            AND sh.status = 'held' AND sh.expires_at > NOW()
+        RETURNING sh.slots
+    """, (hold_token, schedule_id, tour_id))
+    row = cur.fetchone()
+    if not row:
+        return False
+
+    held = row[0]
+    if held > slots:
+        release_slots(cur, schedule_id, held - slots)
+    elif held < slots:
+        if reserve_slots(cur, schedule_id, tour_id, slots - held) is None:
+            return False
+    return True
+
+
+def attach_booking(cur, hold_token, booking_id):
+    cur.execute("UPDATE slot_holds SET booking_id = %s WHERE hold_token = %s", (booking_id, hold_token))
+
+
+def release_hold(cur, hold_token):
+    """Cancel a live hold. Returns True if a hold was released."""
+    cur.execute("""
+        UPDATE slot_holds
+        SET status = 'released'
+        WHERE hold_token = %s AND status = 'held'
+        RETURNING tour_schedule_id, slots
+    """, (hold_token,))
+    row = cur.fetchone()
+    if not row:
+        return False
+    release_slots(cur, row[0], row[1])
+    return True
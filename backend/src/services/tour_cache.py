@@ -0,0 +1,324 @@
+"""
+Tour detail document cache.
+
+The public tour detail payload (/api/tours/<id>) is assembled from many
+tables but only changes when an admin edits the tour, a partner edits a
+linked service, or a review changes the rating. This module stores the
+serialized JSON document per tour together with its ETag so repeat hits
+skip the database entirely and clients can revalidate with If-None-Match.
+
+The default backend is an in-process LRU. Set TOUR_CACHE_REDIS_URL to share
+documents (and invalidations) between worker processes; this requires the
+optional `redis` package. Any object implementing get/set/delete/clear and
+the generation methods (generation/bump_generation/set_if_generation) can be
+installed with set_backend(). Entries expire after TOUR_CACHE_TTL seconds
+(default 3600) in either backend, as a bound on staleness for changes that
+miss an explicit invalidation.
+
+Each backend keeps a generation counter that every invalidation bumps. A
+document is only written if the generation is still the one read before it
+was built, so a build that read the database before an invalidation (in any
+worker sharing the backend) cannot put the stale document back.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryLRUBackend:
+    """Thread-safe in-process LRU keyed by string, entries expiring after `ttl` seconds."""
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def generation(self):
+        return self._generation
+
+    def bump_generation(self):
+        with self._lock:
+            self._generation += 1
+
+    def set_if_generation(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._set(key, value)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Shared backend storing entries in Redis under a common key prefix."""
+
+    def __init__(self, url, prefix='tour_detail:', ttl=24 * 3600):
+        import redis  # optional dependency
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.prefix = prefix
+        # Outside the prefix so clear() does not reset it
+        self.generation_key = prefix.rstrip(':') + '_generation'
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+    def generation(self):
+        return int(self._client.get(self.generation_key) or 0)
+
+    def bump_generation(self):
+        self._client.incr(self.generation_key)
+
+    def set_if_generation(self, key, value, generation):
+        # WATCH makes the write fail if another worker bumps the generation meanwhile
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(self.generation_key)
+                if int(pipe.get(self.generation_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+
+def _create_default_backend():
+    ttl = int(os.getenv("TOUR_CACHE_TTL", 3600))
+    redis_url = os.getenv("TOUR_CACHE_REDIS_URL")
+    if redis_url:
+        try:
+            return RedisBackend(redis_url, ttl=ttl)
+        except Exception as e:
+            print(f"[WARNING] Tour cache: Redis unavailable ({e}), using in-process cache")
+    return MemoryLRUBackend(int(os.getenv("TOUR_CACHE_MAX_ENTRIES", 512)), ttl=ttl)
+
+
+_backend = _create_default_backend()
+
+# Process-local count of invalidations made by this worker, for in-memory
+# caches derived from tours (e.g. tour_highlights). Tour documents use the
+# backend's shared generation instead.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def current_generation():
+    return _generation
+
+
+def _bump_generation():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+    try:
+        _backend.bump_generation()
+    except Exception as e:
+        print(f"[WARNING] Tour cache generation bump failed: {e}")
+
+
+def document_generation():
+    """
+    The backend's generation, read before building a document and passed to
+    store_tour_document(). None if the backend cannot be read (the document is
+    then not cached).
+    """
+    try:
+        return _backend.generation()
+    except Exception as e:
+        print(f"[WARNING] Tour cache read failed: {e}")
+        return None
+
+
+def set_backend(backend):
+    """Install a different cache backend (e.g. a shared store)."""
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def _key(tour_id):
+    return str(int(tour_id))
+
+
+def make_entry(document):
+    """Serialize a tour document and compute its strong ETag."""
+    body = json.dumps(document, ensure_ascii=False, separators=(',', ':'), default=str)
+    etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return {'etag': etag, 'body': body}
+
+
+def get_tour_document(tour_id):
+    """Return the cached entry {'etag', 'body'} for a tour, or None."""
+    try:
+        return _backend.get(_key(tour_id))
+    except Exception as e:
+        print(f"[WARNING] Tour cache read failed: {e}")
+        return None
+
+
+def store_tour_document(tour_id, document, generation):
+    """
+    Cache a freshly built tour document and return its entry.
+    If `generation` (from document_generation() before the build) is stale or
+    None, the entry is returned to the caller but not cached.
+    """
+    entry = make_entry(document)
+    if generation is None:
+        return entry
+    try:
+        _backend.set_if_generation(_key(tour_id), entry, generation)
+    except Exception as e:
+        print(f"[WARNING] Tour cache write failed: {e}")
+    return entry
+
+
+def invalidate_tour(tour_id):
+    invalidate_tours([tour_id])
+
+
+def invalidate_tours(tour_ids):
+    _bump_generation()
+    for tour_id in set(tour_ids or []):
+        if tour_id is None:
+            continue
+        try:
+            _backend.delete(_key(tour_id))
+        except Exception as e:
+            print(f"[WARNING] Tour cache invalidation failed for tour {tour_id}: {e}")
+
+
+def invalidate_all_tours():
+    _bump_generation()
+    try:
+        _backend.clear()
+    except Exception as e:
+        print(f"[WARNING] Tour cache clear failed: {e}")
+
+
+def tour_ids_for_service(cur, service_type, service_id):
+    """
+    Find tours whose detail document embeds the given partner service.
+
+    Call this before modifying or deleting the service (cascades remove the
+    links), then pass the result to invalidate_tours() after committing.
+    service_type: 'accommodation', 'accommodation_room', 'restaurant',
+    'menu_item', 'set_meal' or 'transportation'.
+    """
+    if service_type == 'accommodation':
+        cur.execute("""
+            SELECT tour_id FROM tour_services WHERE accommodation_id = %s
+            UNION
+            SELECT trb.tour_id FROM tour_room_bookings trb
+            JOIN accommodation_rooms ar ON trb.room_id = ar.id
+            WHERE ar.accommodation_id = %s
+        """, (service_id, service_id))
+    elif service_type == 'accommodation_room':
+        cur.execute("""
+            SELECT tour_id FROM tour_room_bookings WHERE room_id = %s
+        """, (service_id,))
+    elif service_type == 'restaurant':
+        cur.execute("""
+            SELECT tour_id FROM tour_services WHERE restaurant_id = %s
+            UNION
+            SELECT tssm.tour_id FROM tour_selected_set_meals tssm
+            JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
+            WHERE rsm.restaurant_id = %s
+        """, (service_id, service_id))
+    elif service_type == 'set_meal':
+        cur.execute("""
+            SELECT tour_id FROM tour_selected_set_meals WHERE set_meal_id = %s
+        """, (service_id,))
+    elif service_type == 'menu_item':
+        cur.execute("""
+            SELECT DISTINCT tssm.tour_id FROM tour_selected_set_meals tssm
+            JOIN restaurant_set_meal_items rsmi ON rsmi.set_meal_id = tssm.set_meal_id
+            WHERE rsmi.menu_item_id = %s
+        """, (service_id,))
+    elif service_type == 'transportation':
+        cur.execute("""
+            SELECT tour_id FROM tour_services WHERE transportation_id = %s
+        """, (service_id,))
+    else:
+        return []
+    return [row[0] for row in cur.fetchall()]
+
+
+def tour_ids_for_user(cur, user_id):
+    """
+    Find tours whose detail document embeds the given user's name and contact
+    details: tours they created and tours using their services (directly or
+    through a booked room or selected set meal).
+
+    Call this before committing a change to the user row, then pass the
+    result to invalidate_tours() after committing.
+    """
+    cur.execute("""
+        SELECT id FROM tours_admin WHERE created_by = %s
+        UNION
+        SELECT tour_id FROM partner_tours WHERE partner_id = %s
+        UNION
+        SELECT trb.tour_id FROM tour_room_bookings trb
+        JOIN accommodation_rooms ar ON trb.room_id = ar.id
+        JOIN partner_service_map psm
+            ON psm.service_type = 'accommodation' AND psm.service_id = ar.accommodation_id
+        WHERE psm.partner_id = %s
+        UNION
+        SELECT tssm.tour_id FROM tour_selected_set_meals tssm
+        JOIN restaurant_set_meals rsm ON tssm.set_meal_id = rsm.id
+        JOIN partner_service_map psm
+            ON psm.service_type = 'restaurant' AND psm.service_id = rsm.restaurant_id
+        WHERE psm.partner_id = %s
+    """, (user_id, user_id, user_id, user_id))
+    return [row[0] for row in cur.fetchall()]
@@ -0,0 +1,93 @@
+"""
+In-memory top-K cache for GET /api/tours/highlights.
+
+The most booked published tours (tour_highlights.booking_count, kept current
+by a trigger on bookings) are read once and kept for HIGHLIGHTS_CACHE_TTL
+seconds. The cache is dropped early when this process creates or cancels
+bookings (invalidate_highlights) and whenever the tour detail cache is
+invalidated by tour edits or review changes (tour_cache generation), so
+other processes only lag by at most the TTL.
+"""
+
+import os
+import threading
+import time
+
+from config.database import get_connection
+from src.services.rating_stats import RATING_STATS_COLUMNS
+from src.services.tour_cache import current_generation
+
+HIGHLIGHTS_CACHE_TTL = int(os.getenv("HIGHLIGHTS_CACHE_TTL", 60))
+# Rows kept in memory, i.e. the largest `limit` served from the cache
+HIGHLIGHTS_TOP_K = 50
+
+HIGHLIGHTS_QUERY = """
+    SELECT
+        t.id, t.name, t.duration, t.description,
+        t.destination_city_id, dc.name as destination_city_name,
+        t.departure_city_id, dpc.name as departure_city_name,
+        t.total_price, t.currency, t.number_of_members,
+        COALESCE(th.booking_count, 0) as booking_count,
+        tls.primary_image,
+        COALESCE(tls.avg_rating, 0) as avg_rating,
+        COALESCE(tls.review_count, 0) as review_count,
+""" + RATING_STATS_COLUMNS + """
+    FROM tours_admin t
+    LEFT JOIN tour_highlights th ON th.tour_id = t.id
+    LEFT JOIN cities dc ON t.destination_city_id = dc.id
+    LEFT JOIN cities dpc ON t.departure_city_id = dpc.id
+    LEFT JOIN tour_listing_summary tls ON tls.tour_id = t.id
+    LEFT JOIN tour_rating_stats trs ON trs.tour_id = t.id
+    WHERE t.is_active = TRUE AND t.is_published = TRUE
+    ORDER BY booking_count DESC, avg_rating DESC, t.id
+    LIMIT %s
+"""
+
+_cache = None
+_version = 0
+_lock = threading.Lock()
+
+
+def invalidate_highlights():
+    """Drop the cached top-K; call after committing booking changes."""
+    global _cache, _version
+    with _lock:
+        _version += 1
+        _cache = None
+
+
+def _fetch(limit):
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Database connection failed")
+    cur = conn.cursor()
+    try:
+        cur.execute(HIGHLIGHTS_QUERY, (limit,))
+        rows = cur.fetchall()
+        conn.rollback()
+        return rows
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_highlight_rows(limit):
+    """The `limit` most booked published tours as HIGHLIGHTS_QUERY rows."""
+    global _cache
+    limit = max(1, limit)
+    if limit > HIGHLIGHTS_TOP_K:
+        return _fetch(limit)
+
+    cache = _cache
+    generation = current_generation()
+    if (cache is None or cache['generation'] != generation
+            or time.monotonic() - cache['loaded_at'] > HIGHLIGHTS_CACHE_TTL):
+        version = _version
+        rows = _fetch(HIGHLIGHTS_TOP_K)
+        cache = {'rows': rows, 'generation': generation, 'loaded_at': time.monotonic()}
+        with _lock:
+            # Do not cache rows read before a concurrent invalidation
+            if version == _version:
+                _cache = cache
+    return cache['rows'][:limit]
+
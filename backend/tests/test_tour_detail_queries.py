@@ -0,0 +1,136 @@
+"""
+Query-count regression test for tour_routes.build_tour_detail.
+
+The detail document used to issue queries per itinerary day and per service.
+A counting fake cursor answers each query with canned rows, so the number of
+round trips can be compared for short and long itineraries without a database.
+
+Run from backend/: python -m pytest tests
+"""
+
+from datetime import datetime, time
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("psycopg2")
+
+from src.routes.tour_routes import build_tour_detail  # noqa: E402
+from src.services.rating_stats import RATING_STATS_WIDTH  # noqa: E402
+
+TOUR_ID = 7
+PERIODS = ('morning', 'noon', 'evening')
+
+
+class CountingCursor:
+    """Fake cursor that counts execute() calls and returns rows by table."""
+
+    def __init__(self, days, restaurants_per_day):
+        self.queries = []
+        self._rows = []
+        self._tables = {
+            'FROM tours_admin t': [self._tour_row()],
+            'FROM tour_images': [
+                (1, '/api/blobs/a.jpg', None, 0, True),
+                (2, '/api/blobs/b.jpg', None, 1, False),
+            ],
+            'FROM tour_daily_itinerary': self._itinerary_rows(days),
+            'FROM tour_services ts': self._service_rows(days, restaurants_per_day),
+            'FROM tour_room_bookings': [self._room_row(room_id) for room_id in range(1, days + 1)],
+            'FROM tour_selected_set_meals': self._set_meal_rows(days, restaurants_per_day),
+        }
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        self._rows = next((rows for marker, rows in self._tables.items() if marker in sql), [])
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    @staticmethod
+    def _tour_row():
+        created = datetime(2026, 1, 1)
+        stats = (4, 18, 0, 0, 0, 2, 2, created)
+        assert len(stats) == RATING_STATS_WIDTH
+        return (
+            TOUR_ID, 'Ha Long Bay', '3 days', 'Cruise', 1, 'Hạ Long', 2, 'Hà Nội',
+            Decimal('9000000'), 'VND', 4, created, created, 10,
+            'partner', 'partner@example.com', '0900000000', 'accommodation',
+        ) + stats
+
+    @staticmethod
+    def _itinerary_rows(days):
+        rows = []
+        for day in range(1, days + 1):
+            for index, period in enumerate(PERIODS):
+                rows.append((
+                    day, day, f'Day {day}', None,
+                    day * 10 + index, period, time(8 + index * 5), f'Activity {index}',
+                    None, 'Hạ Long', index,
+                ))
+        return rows
+
+    @staticmethod
+    def _service_rows(days, restaurants_per_day):
+        partner = (20, 'partner', 'partner@example.com', '0900000000', 'restaurant')
+        rows = [
+            (1, 'accommodation', 1, Decimal('1000000'), None, None, None, 3, 'Hotel',
+             None, None, None, None, None, None, None, None) + partner,
+            (2, 'transportation', 1, Decimal('500000'), None, None, None, None, None,
+             4, 'bus - 29A', '29A', 'bus', 'Ford', 30, None, Decimal('100000')) + partner,
+        ]
+        for day in range(1, days + 1):
+            for meal in range(restaurants_per_day):
+                rows.append(
+                    (100 + day * 10 + meal, 'restaurant', day, Decimal('300000'), None,
+                     5 + meal, f'Restaurant {meal}', None, None,
+                     None, None, None, None, None, None, None, None) + partner
+                )
+        return rows
+
+    @staticmethod
+    def _room_row(room_id):
+        return (
+            room_id, f'Room {room_id}', 'double', None, 2, 1, Decimal('25'), 'queen',
+            'sea', ['wifi'], Decimal('800000'), 1,
+            'Hotel', 'Address', 4, None, '/api/blobs/room.jpg',
+        )
+
+    @staticmethod
+    def _set_meal_rows(days, restaurants_per_day):
+        return [
+            (meal + 1, day, 'lunch', f'Set {meal}', None, Decimal('400000'), 'VND',
+             f'Restaurant {meal}', 'Vietnamese', 'Address', [{'name': 'Phở'}])
+            for day in range(1, days + 1)
+            for meal in range(restaurants_per_day)
+        ]
+
+
+def _query_count(days, restaurants_per_day):
+    cur = CountingCursor(days, restaurants_per_day)
+    tour = build_tour_detail(cur, TOUR_ID)
+    assert tour is not None
+    assert len(tour['itinerary']) == days
+    assert len(tour['services']['restaurants']) == days * restaurants_per_day
+    assert len(tour['selectedSetMeals']) == days * restaurants_per_day
+    return len(cur.queries)
+
+
+def test_query_count_does_not_grow_with_itinerary_length():
+    assert _query_count(days=1, restaurants_per_day=1) == _query_count(days=10, restaurants_per_day=3)
+
+
+def test_query_count_is_constant():
+    # Tour row, images, itinerary, services, room bookings, set meals
+    assert _query_count(days=5, restaurants_per_day=2) == 6
+
+
+def test_missing_tour_stops_after_one_query():
+    cur = CountingCursor(days=1, restaurants_per_day=1)
+    cur._tables['FROM tours_admin t'] = []
+    assert build_tour_detail(cur, TOUR_ID) is None
+    assert len(cur.queries) == 1
@@ -121,12 +121,14 @@ export const partnerStatsAPI = {
 // =====================================================================
 
 /**
- * Get all reviews containing services belonging to a partner
+ * Get reviews containing services belonging to a partner, newest first
  * @param {number} partnerId - The partner's user ID
- * @returns {Promise<Object>} Response with reviews array
+ * @param {string} [before] - next_before cursor of the previous page
+ * @returns {Promise<Object>} Response with reviews array, totals and next_before
  */
-export const getPartnerReviews = async (partnerId) => {
-  const response = await fetch(`${API_BASE_URL}/api/partner/${partnerId}/reviews`, {
+export const getPartnerReviews = async (partnerId, before = null) => {
+  const params = before ? `?before=${encodeURIComponent(before)}` : '';
+  const response = await fetch(`${API_BASE_URL}/api/partner/${partnerId}/reviews${params}`, {
     headers: getAuthHeaders(),
   });
   if (!response.ok) throw new Error('Failed to fetch partner reviews');
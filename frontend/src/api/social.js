@@ -28,16 +28,21 @@ const getAuthHeaders = () => {
 };
 
 /**
- * Get all posts
+ * Get one page of posts, newest first
+ * @param {string} [before] - next_before cursor of the previous page
+ * @param {number} [limit] - page size (max 100)
+ * @returns {Promise<Object>} { posts, has_more, next_before }
  */
-export const getPosts = async () => {
+export const getPosts = async (before = null, limit = 20) => {
   const user = getCurrentUser();
   const headers = getAuthHeaders();
   if (user && user.email) {
     headers['X-User-Email'] = user.email;
   }
   
-  const response = await fetch(`${API_BASE_URL}/api/social/posts`, {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (before) params.set('before', before);
+  const response = await fetch(`${API_BASE_URL}/api/social/posts?${params}`, {
     headers: headers,
   });
   if (!response.ok) throw new Error('Failed to fetch posts');
@@ -16,6 +16,9 @@ export default function ServiceReviewsPage() {
   const [showDetailPanel, setShowDetailPanel] = useState(false);
   const [partnerId, setPartnerId] = useState(null);
   const [averageRating, setAverageRating] = useState(0);
+  const [totalReviews, setTotalReviews] = useState(0);
+  const [nextBefore, setNextBefore] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const currentUser = localStorage.getItem("user");
@@ -32,26 +35,20 @@ export default function ServiceReviewsPage() {
     }
   }, [navigate]);
 
-  const fetchReviews = async (partnerId) => {
+  const fetchReviews = async (partnerId, before = null) => {
     try {
-      setLoading(true);
-      const data = await getPartnerReviews(partnerId);
+      if (before) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
+      const data = await getPartnerReviews(partnerId, before);
       
       if (data.success) {
-        setReviews(data.reviews);
-        
-        // Calculate average rating from service reviews
-        let totalRating = 0;
-        let ratingCount = 0;
-        
-        data.reviews.forEach(review => {
-          review.service_reviews.forEach(svcReview => {
-            totalRating += svcReview.rating;
-            ratingCount++;
-          });
-        });
-        
-        setAverageRating(ratingCount > 0 ? (totalRating / ratingCount).toFixed(1) : 0);
+        setReviews(prev => (before ? [...prev, ...data.reviews] : data.reviews));
+        setNextBefore(data.next_before);
+        setTotalReviews(data.total_reviews);
+        setAverageRating(data.average_rating || 0);
       } else {
         toast.error(data.message || 'Failed to load reviews');
       }
@@ -60,6 +57,7 @@ export default function ServiceReviewsPage() {
       toast.error('Failed to load reviews');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -138,7 +136,7 @@ export default function ServiceReviewsPage() {
                   </span>
                 </div>
                 <p className="text-sm text-gray-600 dark:text-gray-400">
-                  {reviews.length} {reviews.length === 1 ? 'review' : 'reviews'}
+                  {totalReviews} {totalReviews === 1 ? 'review' : 'reviews'}
                 </p>
               </div>
             </div>
@@ -227,6 +225,18 @@ export default function ServiceReviewsPage() {
             ))}
           </div>
         )}
+
+        {nextBefore && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={() => fetchReviews(partnerId, nextBefore)}
+              disabled={loadingMore}
+              className="px-6 py-2 rounded-lg bg-blue-600 text-white hover:bg-blue-700 disabled:opacity-50 transition-colors"
+            >
+              {loadingMore ? 'Loading...' : 'Load more reviews'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Review Detail Panel */}
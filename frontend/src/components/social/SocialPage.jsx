@@ -84,6 +84,8 @@ export default function SocialPage() {
   const [isSidebarCollapsed, setIsSidebarCollapsed] = useState(false);
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextBefore, setNextBefore] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchResults, setSearchResults] = useState([]);
   const [isSearching, setIsSearching] = useState(false);
   const [translatedDialogCaption, setTranslatedDialogCaption] = useState("");
@@ -212,17 +214,23 @@ export default function SocialPage() {
     translateComments();
   }, [selectedPost?._apiData?.comments, language, showPostDialog]);
 
-  const fetchPosts = async () => {
+  const fetchPosts = async (before = null) => {
     try {
-      setLoading(true);
-      const apiPosts = await getPosts();
-      const transformedPosts = apiPosts.map(transformPost);
-      setPosts(transformedPosts);
+      if (before) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
+      const page = await getPosts(before);
+      const transformedPosts = page.posts.map(transformPost);
+      setPosts(prev => (before ? [...prev, ...transformedPosts] : transformedPosts));
+      setNextBefore(page.next_before);
     } catch (error) {
       console.error("Failed to fetch posts:", error);
       toast.error("Failed to load posts");
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -555,7 +563,22 @@ export default function SocialPage() {
       );
     }
 
-    return <div>{renderGrid(posts)}</div>;
+    return (
+      <div>
+        {renderGrid(posts)}
+        {nextBefore && (
+          <div className="mt-8 mb-8 text-center">
+            <button
+              onClick={() => fetchPosts(nextBefore)}
+              disabled={loadingMore}
+              className="px-6 py-2 rounded-lg bg-blue-600 text-white hover:bg-blue-700 disabled:opacity-50 transition-colors"
+            >
+              {loadingMore ? (translations.loading || "Loading...") : (translations.loadMore || "Load more posts")}
+            </button>
+          </div>
+        )}
+      </div>
+    );
   };
 
   return (